@@ -1,43 +1,159 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask, render_template, request, jsonify
+from flask import (
+    Flask,
+    Response,
+    g,
+    render_template,
+    request,
+    jsonify,
+    stream_with_context,
+)
+import atexit
+import multiprocessing
 import os
 import sys
-import math
+import time
+from typing import Callable
 
 # Ajouter le répertoire courant au PATH pour importer les modèles
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from models.calculator_model import CalculatorModel
-from models.scientific_model import ScientificModel
-from models.conversion_model import ConversionModel
+from web import api
+from web.api import conversion_model, sessions
+from web.http_cache import DATA_CACHE_CONTROL, PAGE_CACHE_CONTROL, CachedBody
+from web.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from web.sessions import SESSION_COOKIE, SESSION_HEADER
 
+# Routes Flask (WSGI) : la logique des routes de l'API est dans web/api.py,
+# partagée avec la variante asynchrone asgi_app.py
 app = Flask(__name__)
 
-# Instances des modèles
-calculator_model = CalculatorModel()
-scientific_model = ScientificModel()
-conversion_model = ConversionModel()
+
+def session_models() -> api.SessionModels:
+    """Retourne les modèles de la session du client (créée au besoin)."""
+    if "session_models" not in g:
+        session_id = request.headers.get(SESSION_HEADER) or request.cookies.get(
+            SESSION_COOKIE
+        )
+        g.session_id, g.session_models = sessions.get(session_id)
+    return g.session_models
+
+
+@app.after_request
+def _attach_session(response):
+    """Transmet l'identifiant de session et borne les historiques."""
+    if "session_models" in g:
+        response.headers[SESSION_HEADER] = g.session_id
+        if request.cookies.get(SESSION_COOKIE) != g.session_id:
+            response.set_cookie(
+                SESSION_COOKIE,
+                g.session_id,
+                max_age=int(sessions.idle_ttl),
+                httponly=True,
+                samesite="Lax",
+            )
+        api.end_request(g.session_models)
+    return response
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    """Compte la requête et mesure sa durée (voir /metrics)."""
+    if "request_start" in g:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        operation = ""
+        if request.is_json:
+            operation = api.operation_label(route, request.get_json(silent=True))
+        api.metrics.observe_request(
+            route,
+            request.method,
+            response.status_code,
+            time.perf_counter() - g.request_start,
+            operation,
+        )
+    return response
+
+
+@app.teardown_request
+def _count_unhandled_error(error):
+    if error is not None:
+        api.metrics.count_error("unhandled", type(error).__name__)
+
+
+def _reply(reply):
+    body, status = reply
+    return jsonify(body), status
+
+
+def _json_body():
+    return request.get_json(silent=True)
+
+
+def _cached_response(cached: CachedBody, mimetype: str, cache_control: str):
+    """Réponse gardée en mémoire, ou 304 si le client a déjà cette version."""
+    response = Response(cached.body, mimetype=mimetype)
+    response.set_etag(cached.etag)
+    response.headers["Cache-Control"] = cache_control
+    return response.make_conditional(request)
+
+
+def _page(template: str, context: Callable[[], dict] = dict):
+    """
+    Page rendue une fois par route, servie avec son ETag.
+
+    En développement (templates rechargés), la page est rendue à chaque
+    requête.
+
+    Args:
+        template: Le template de la page
+        context: Produit les variables du template (appelé au rendu)
+    """
+    if app.jinja_env.auto_reload:
+        return render_template(template, **context())
+    # url_for dépend du préfixe sous lequel l'application est servie
+    cached = api.page_cache.get(
+        (request.endpoint, request.script_root),
+        lambda: render_template(template, **context()).encode("utf-8"),
+    )
+    return _cached_response(cached, "text/html", PAGE_CACHE_CONTROL)
+
+
+atexit.register(api.batch_evaluator.shutdown)
+atexit.register(api.offload_pool.shutdown)
+api.load_expression_cache()
+atexit.register(api.save_expression_cache)
+# Processus des calculs lourds prêts avant la première requête, comme au
+# démarrage de asgi_app ; un processus de calcul réimporte ce module s'il
+# est le programme principal (python app.py) et ne démarre pas de pool
+if multiprocessing.parent_process() is None:
+    api.offload_pool.start()
 
 
 @app.route("/")
 def index():
     """Page d'accueil avec la calculatrice de base"""
-    return render_template("index.html")
+    return _page("index.html")
 
 
 @app.route("/scientific")
 def scientific():
     """Page de la calculatrice scientifique"""
-    return render_template("scientific.html")
+    return _page("scientific.html")
 
 
 @app.route("/converter")
 def converter():
     """Page du convertisseur d'unités"""
-    categories = conversion_model.get_categories()
-    return render_template("converter.html", categories=categories)
+    return _page(
+        "converter.html", lambda: {"categories": conversion_model.get_categories()}
+    )
 
 
 # === API Routes pour la calculatrice de base ===
@@ -45,37 +161,8 @@ def converter():
 
 @app.route("/api/calculate", methods=["POST"])
 def api_calculate():
-    """API pour les calculs de base"""
-    try:
-        data = request.get_json()
-        action = data.get("action")
-        value = data.get("value", "")
-
-        if action == "clear":
-            calculator_model.clear()
-        elif action == "number":
-            calculator_model.append_number(value)
-        elif action == "operator":
-            calculator_model.add_operator(value)
-        elif action == "equals":
-            calculator_model.calculate()
-        elif action == "decimal":
-            calculator_model.add_decimal()
-        elif action == "percentage":
-            calculator_model.percentage()
-        elif action == "toggle_sign":
-            calculator_model.toggle_sign()
-
-        return jsonify(
-            {
-                "success": True,
-                "current_value": calculator_model.current_value,
-                "expression": calculator_model.expression,
-            }
-        )
-
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
+    """API pour les calculs de base (une action ou une suite d'actions)"""
+    return _reply(api.calculate(session_models(), _json_body()))
 
 
 # === API Routes pour la calculatrice scientifique ===
@@ -84,71 +171,37 @@ def api_calculate():
 @app.route("/api/scientific/calculate", methods=["POST"])
 def api_scientific_calculate():
     """API pour les calculs scientifiques"""
-    try:
-        data = request.get_json()
-        expression = data.get("expression", "")
-        variables = data.get("variables", {})
-
-        result = scientific_model.evaluate_expression(expression, variables)
-
-        return jsonify(
-            {
-                "success": True,
-                "result": result,
-                "history": scientific_model.get_history()[-10:],  # Derniers 10 calculs
-            }
-        )
+    return _reply(api.scientific_calculate(session_models(), _json_body()))
 
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
+
+@app.route("/api/scientific/batch", methods=["POST"])
+def api_scientific_batch():
+    """API pour évaluer une liste d'expressions en une seule requête"""
+    return _reply(api.scientific_batch(session_models(), _json_body()))
 
 
 @app.route("/api/scientific/function", methods=["POST"])
 def api_scientific_function():
     """API pour les fonctions scientifiques spéciales"""
-    try:
-        data = request.get_json()
-        function = data.get("function")
-        value = data.get("value")
-
-        result = None
-
-        if function == "factorial":
-            result = scientific_model.factorial(int(value))
-        elif function == "sin":
-            result = scientific_model._wrap_angle_math(math.sin)(float(value))
-        elif function == "cos":
-            result = scientific_model._wrap_angle_math(math.cos)(float(value))
-        elif function == "tan":
-            result = scientific_model._wrap_angle_math(math.tan)(float(value))
-        elif function == "sqrt":
-            result = math.sqrt(float(value))
-        elif function == "log":
-            result = math.log10(float(value))
-        elif function == "ln":
-            result = math.log(float(value))
-        elif function == "exp":
-            result = math.exp(float(value))
-
-        return jsonify({"success": True, "result": result})
-
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
+    return _reply(api.scientific_function(session_models(), _json_body()))
 
 
 @app.route("/api/scientific/angle-mode", methods=["POST"])
 def api_set_angle_mode():
     """API pour changer le mode d'angle"""
-    try:
-        data = request.get_json()
-        mode = data.get("mode", "DEG")
+    return _reply(api.set_angle_mode(session_models(), _json_body()))
 
-        scientific_model.set_angle_mode(mode)
 
-        return jsonify({"success": True, "mode": scientific_model.angle_mode})
+@app.route("/api/scientific/cache-stats")
+def api_scientific_cache_stats():
+    """API pour dimensionner les caches du moteur scientifique"""
+    return _reply(api.scientific_cache_stats(session_models()))
 
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
+
+@app.route("/api/scientific/complex-mode", methods=["POST"])
+def api_set_complex_mode():
+    """API pour activer ou désactiver le calcul sur les nombres complexes"""
+    return _reply(api.set_complex_mode(session_models(), _json_body()))
 
 
 # === API Routes pour le convertisseur ===
@@ -157,38 +210,27 @@ def api_set_angle_mode():
 @app.route("/api/convert", methods=["POST"])
 def api_convert():
     """API pour les conversions d'unités"""
+    return _reply(api.convert(session_models(), _json_body()))
+
+
+@app.route("/api/convert/stream", methods=["POST"])
+def api_convert_stream():
+    """API pour convertir en flux un export de valeurs (NDJSON ou CSV)"""
     try:
-        data = request.get_json()
-        value = float(data.get("value", 0))
-        from_unit = data.get("from_unit")
-        to_unit = data.get("to_unit")
-        category = data.get("category")
-
-        result = conversion_model.convert(value, from_unit, to_unit, category)
-
-        return jsonify(
-            {
-                "success": True,
-                "result": result,
-                "history": conversion_model.get_conversion_history()[
-                    -5:
-                ],  # Dernières 5 conversions
-            }
+        # Le corps est lu à mesure que les lignes converties sont envoyées
+        chunks, mimetype = api.open_conversion_stream(
+            session_models(), request.args, request.content_type, request.stream
         )
-
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
+    return Response(stream_with_context(chunks), mimetype=mimetype)
 
 
 @app.route("/api/convert/units/<category>")
 def api_get_units(category):
     """API pour obtenir les unités d'une catégorie"""
-    try:
-        units = conversion_model.get_units_for_category(category)
-        return jsonify({"success": True, "units": units})
-
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
+    cached = api.convert_units(category)
+    return _cached_response(cached, "application/json", DATA_CACHE_CONTROL)
 
 
 # === API Routes pour l'historique ===
@@ -197,19 +239,7 @@ def api_get_units(category):
 @app.route("/api/history/clear", methods=["POST"])
 def api_clear_history():
     """API pour effacer l'historique"""
-    try:
-        data = request.get_json()
-        model_type = data.get("type", "scientific")
-
-        if model_type == "scientific":
-            scientific_model.clear_history()
-        elif model_type == "conversion":
-            conversion_model.clear_history()
-
-        return jsonify({"success": True, "message": "Historique effacé"})
-
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 400
+    return _reply(api.clear_history(session_models(), _json_body()))
 
 
 # === Route pour servir les ressources statiques ===
@@ -218,7 +248,25 @@ def api_clear_history():
 @app.route("/health")
 def health_check():
     """Point de santé pour Vercel"""
-    return jsonify({"status": "healthy", "message": "SmartCalc API is running"})
+    return _reply(api.health())
+
+
+@app.route("/api/diagnostics")
+def api_diagnostics():
+    """API pour observer les pools de calcul et les sessions"""
+    return _reply(api.diagnostics())
+
+
+@app.route("/metrics")
+def metrics():
+    """Métriques au format de Prometheus"""
+    return Response(api.metrics_text(), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route("/api/sessions/stats")
+def api_sessions_stats():
+    """API pour observer le magasin de sessions (taille, évictions)"""
+    return _reply(api.sessions_stats())
 
 
 if __name__ == "__main__":
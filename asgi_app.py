@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Variante asynchrone (ASGI) de l'API SmartCalc.
+
+Mêmes routes JSON, mêmes sessions et même logique que app.py (voir
+web/api.py), sans dépendance supplémentaire :
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 8000
+
+La boucle d'événements ne fait que les entrées/sorties (lecture des
+corps, envoi des réponses et des flux de conversion) ; les évaluations,
+limitées par le processeur, s'exécutent dans un pool de threads
+(``SMARTCALC_ASGI_THREADS``) pour ne jamais la bloquer. Un client lent
+n'occupe donc pas de thread, contrairement au serveur WSGI. Les pages
+HTML restent servies par app.py.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import CookieError, SimpleCookie
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl
+
+# Ajouter le répertoire courant au PATH pour importer les modèles
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from web import api  # noqa: E402
+from web.http_cache import DATA_CACHE_CONTROL, etag_matches  # noqa: E402
+from web.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE  # noqa: E402
+from web.sessions import SESSION_COOKIE, SESSION_HEADER  # noqa: E402
+
+# Taille maximale d'un corps JSON (les flux de conversion ne sont pas bornés)
+MAX_JSON_BODY = 16 * 1024 * 1024
+
+# Threads d'évaluation (par défaut : celui de ThreadPoolExecutor)
+THREADS = int(os.environ.get("SMARTCALC_ASGI_THREADS", 0)) or None
+
+# Routes liées à une session : (méthode, chemin) -> (fonction, lit le corps)
+SESSION_ROUTES = {
+    ("POST", "/api/calculate"): (api.calculate, True),
+    ("POST", "/api/scientific/calculate"): (api.scientific_calculate, True),
+    ("POST", "/api/scientific/batch"): (api.scientific_batch, True),
+    ("POST", "/api/scientific/function"): (api.scientific_function, True),
+    ("POST", "/api/scientific/angle-mode"): (api.set_angle_mode, True),
+    ("POST", "/api/scientific/complex-mode"): (api.set_complex_mode, True),
+    ("GET", "/api/scientific/cache-stats"): (api.scientific_cache_stats, False),
+    ("POST", "/api/convert"): (api.convert, True),
+    ("POST", "/api/history/clear"): (api.clear_history, True),
+}
+# Routes sans session, assez brèves pour la boucle d'événements
+LOOP_ROUTES = {
+    ("GET", "/health"): api.health,
+    ("GET", "/api/sessions/stats"): api.sessions_stats,
+    ("GET", "/api/diagnostics"): api.diagnostics,
+}
+STREAM_ROUTE = ("POST", "/api/convert/stream")
+METRICS_ROUTE = ("GET", "/metrics")
+UNITS_PREFIX = "/api/convert/units/"
+_PATHS = {
+    path for _, path in [*SESSION_ROUTES, *LOOP_ROUTES, STREAM_ROUTE, METRICS_ROUTE]
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(THREADS, thread_name_prefix="smartcalc")
+        return _executor
+
+
+def shutdown():
+    """Arrête les threads d'évaluation et les processus de calcul."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+    api.batch_evaluator.shutdown()
+    api.offload_pool.shutdown()
+
+
+class _Request:
+    """En-têtes et paramètres d'une requête ASGI."""
+
+    def __init__(self, scope: Dict[str, Any]):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        self.args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        self.content_type = self.headers.get("content-type", "")
+        # Opération de la requête, pour les métriques (voir api.operation_label)
+        self.operation = ""
+
+    @property
+    def route(self) -> str:
+        """Gabarit de la route (étiquette des métriques), comme pour Flask."""
+        if self.path in _PATHS:
+            return self.path
+        if self.path.startswith(UNITS_PREFIX):
+            return UNITS_PREFIX + "<category>"
+        return "unmatched"
+
+    @property
+    def cookie_session(self) -> Optional[str]:
+        try:
+            cookie = SimpleCookie(self.headers.get("cookie", ""))
+        except CookieError:
+            return None
+        morsel = cookie.get(SESSION_COOKIE)
+        return morsel.value if morsel else None
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.headers.get(SESSION_HEADER.lower()) or self.cookie_session
+
+    @property
+    def is_json(self) -> bool:
+        # Même règle que Flask : application/json ou application/*+json
+        mimetype = self.content_type.split(";")[0].strip().lower()
+        return mimetype == "application/json" or (
+            mimetype.startswith("application/") and mimetype.endswith("+json")
+        )
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class _RequestBody(io.RawIOBase):
+    """
+    Corps d'une requête ASGI, lu depuis un thread d'évaluation.
+
+    Chaque lecture demande le morceau suivant à la boucle d'événements :
+    un flux de conversion lit le corps à mesure qu'il convertit.
+    """
+
+    def __init__(self, receive, loop: asyncio.AbstractEventLoop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = memoryview(b"")
+        self._more = True
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self._buffer and self._more:
+            message = asyncio.run_coroutine_threadsafe(
+                self._receive(), self._loop
+            ).result()
+            if message["type"] == "http.disconnect":
+                self._more = False
+                break
+            self._buffer = memoryview(message.get("body", b""))
+            self._more = message.get("more_body", False)
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+async def _read_body(receive, limit: int) -> bytes:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            raise _BodyTooLarge()
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _session_headers(request: _Request, session_id: str) -> list:
+    """En-tête de session et, pour un nouveau cookie, Set-Cookie."""
+    headers = [(SESSION_HEADER.lower().encode(), session_id.encode())]
+    if request.cookie_session != session_id:
+        cookie = (
+            f"{SESSION_COOKIE}={session_id}; Max-Age={int(api.sessions.idle_ttl)}; "
+            "Path=/; HttpOnly; SameSite=Lax"
+        )
+        headers.append((b"set-cookie", cookie.encode()))
+    return headers
+
+
+async def _send_json(send, body: Dict[str, Any], status: int, headers=()):
+    content = json.dumps(body, separators=(",", ":")).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(content)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": content})
+
+
+async def _send_cached(send, request: _Request, cached, cache_control: str):
+    """Réponse gardée en mémoire, ou 304 si le client a déjà cette version."""
+    headers = [
+        (b"etag", f'"{cached.etag}"'.encode()),
+        (b"cache-control", cache_control.encode()),
+    ]
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cached.body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": cached.body})
+
+
+def _call_session_route(handler, reads_body, request: _Request, body: bytes):
+    """Traite une requête de session dans un thread d'évaluation."""
+    session_id, models = api.sessions.get(request.session_id)
+    try:
+        if not reads_body:
+            return session_id, handler(models)
+        try:
+            data = json.loads(body) if request.is_json else None
+        except ValueError:
+            data = None
+        request.operation = api.operation_label(request.path, data)
+        return session_id, handler(models, data)
+    finally:
+        api.end_request(models)
+
+
+def _open_stream(request: _Request, body: io.BufferedReader):
+    session_id, models = api.sessions.get(request.session_id)
+    try:
+        chunks, mimetype = api.open_conversion_stream(
+            models, request.args, request.content_type, body
+        )
+    except Exception as e:
+        api.end_request(models)
+        return session_id, models, None, ({"success": False, "error": str(e)}, 400)
+    return session_id, models, chunks, mimetype
+
+
+async def _stream_conversion(request: _Request, receive, send):
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    body = io.BufferedReader(_RequestBody(receive, loop))
+    session_id, models, chunks, result = await loop.run_in_executor(
+        executor, _open_stream, request, body
+    )
+    headers = _session_headers(request, session_id)
+    if chunks is None:
+        await _send_json(send, *result, headers=headers)
+        return
+
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", result.encode()), *headers],
+            }
+        )
+        while True:
+            # Conversion (et lecture du corps) dans le pool, envoi sur la boucle
+            chunk = await loop.run_in_executor(executor, next, chunks, None)
+            if chunk is None:
+                break
+            if chunk:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk.encode(),
+                        "more_body": True,
+                    }
+                )
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        await loop.run_in_executor(executor, chunks.close)
+        api.end_request(models)
+
+
+async def _send_metrics(send):
+    loop = asyncio.get_running_loop()
+    content = (await loop.run_in_executor(_get_executor(), api.metrics_text)).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", METRICS_CONTENT_TYPE.encode()),
+                (b"content-length", str(len(content)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": content})
+
+
+async def _handle_http(request: _Request, receive, send):
+    route = (request.method, request.path)
+
+    if route in LOOP_ROUTES:
+        await _send_json(send, *LOOP_ROUTES[route]())
+    elif request.method == "GET" and request.path.startswith(UNITS_PREFIX):
+        cached = api.convert_units(request.path[len(UNITS_PREFIX) :])
+        await _send_cached(send, request, cached, DATA_CACHE_CONTROL)
+    elif route == STREAM_ROUTE:
+        await _stream_conversion(request, receive, send)
+    elif route == METRICS_ROUTE:
+        await _send_metrics(send)
+    elif route in SESSION_ROUTES:
+        handler, reads_body = SESSION_ROUTES[route]
+        try:
+            body = await _read_body(receive, MAX_JSON_BODY) if reads_body else b""
+        except _BodyTooLarge:
+            await _send_json(
+                send, {"success": False, "error": "Corps de requête trop grand"}, 413
+            )
+            return
+        session_id, (reply, status) = await asyncio.get_running_loop().run_in_executor(
+            _get_executor(),
+            _call_session_route,
+            handler,
+            reads_body,
+            request,
+            body,
+        )
+        await _send_json(send, reply, status, _session_headers(request, session_id))
+    elif request.path in _PATHS:
+        error = {"success": False, "error": "Méthode non autorisée"}
+        await _send_json(send, error, 405)
+    else:
+        await _send_json(send, {"success": False, "error": "Route inconnue"}, 404)
+
+
+async def _observed_http(scope, receive, send):
+    """Traite une requête, la compte et mesure sa durée (voir /metrics)."""
+    request = _Request(scope)
+    start = time.perf_counter()
+    status = 500
+
+    async def observed_send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        await send(message)
+
+    try:
+        await _handle_http(request, receive, observed_send)
+    except Exception as e:
+        api.metrics.count_error("unhandled", type(e).__name__)
+        raise
+    finally:
+        api.metrics.observe_request(
+            request.route,
+            request.method,
+            status,
+            time.perf_counter() - start,
+            request.operation,
+        )
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            api.load_expression_cache()
+            # Processus des calculs lourds prêts avant la première requête
+            api.offload_pool.start()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            api.save_expression_cache()
+            shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """Application ASGI (HTTP et cycle de vie du serveur)."""
+    if scope["type"] == "http":
+        await _observed_http(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await _lifespan(receive, send)
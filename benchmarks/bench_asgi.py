@@ -0,0 +1,113 @@
+"""
+Compare les variantes WSGI (app.py) et ASGI (asgi_app.py) de l'API.
+
+CLIENTS clients simultanés enchaînent chacun REQUESTS calculs
+scientifiques ; chaque client met CLIENT_DELAY secondes à transmettre sa
+requête (réseau mobile, client lent). Côté WSGI, un thread sur
+WSGI_THREADS est occupé pendant toute la requête, attente comprise ; côté
+ASGI, l'attente se fait sur la boucle d'événements et seule l'évaluation
+occupe un thread. Les deux variantes sont appelées dans le processus, sans
+serveur ni réseau : seul le modèle d'exécution diffère.
+
+Usage : python benchmarks/bench_asgi.py
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asgi_app  # noqa: E402
+from app import app  # noqa: E402
+
+CLIENTS = 64
+REQUESTS = 20
+CLIENT_DELAY = 0.01
+WSGI_THREADS = 8
+ROUTE = "/api/scientific/calculate"
+
+
+def _payload(k):
+    return {"expression": "sin(x)*x + sqrt(x)", "variables": {"x": k % 50}}
+
+
+def _summary(name, latencies, elapsed):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name} : {len(latencies) / elapsed:8.0f} requêtes/s"
+        f"  médiane {statistics.median(latencies) * 1e3:6.1f} ms"
+        f"  p99 {p99 * 1e3:6.1f} ms"
+    )
+
+
+def bench_wsgi():
+    local = threading.local()
+
+    def handle(k, sent):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        time.sleep(CLIENT_DELAY)  # le thread attend le corps de la requête
+        local.client.post(ROUTE, json=_payload(k))
+        return time.perf_counter() - sent
+
+    latencies = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(WSGI_THREADS) as pool:
+        for batch in range(REQUESTS):
+            futures = [
+                pool.submit(handle, batch * CLIENTS + k, time.perf_counter())
+                for k in range(CLIENTS)
+            ]
+            latencies.extend(future.result() for future in futures)
+    _summary("WSGI", latencies, time.perf_counter() - start)
+
+
+async def _asgi_client(index, latencies):
+    for k in range(REQUESTS):
+        body = json.dumps(_payload(index * REQUESTS + k)).encode()
+
+        async def receive():
+            await asyncio.sleep(CLIENT_DELAY)  # la boucle sert d'autres clients
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            pass
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": ROUTE,
+            "query_string": b"",
+            "headers": [(b"content-type", b"application/json")],
+        }
+        sent = time.perf_counter()
+        await asgi_app.app(scope, receive, send)
+        latencies.append(time.perf_counter() - sent)
+
+
+async def _bench_asgi():
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_asgi_client(index, latencies) for index in range(CLIENTS)))
+    _summary("ASGI", latencies, time.perf_counter() - start)
+
+
+def main():
+    print(
+        f"{CLIENTS} clients x {REQUESTS} requêtes, "
+        f"{CLIENT_DELAY * 1e3:.0f} ms de transmission par requête"
+    )
+    bench_wsgi()
+    asyncio.run(_bench_asgi())
+    asgi_app.shutdown()
+
+
+if __name__ == "__main__":
+    main()
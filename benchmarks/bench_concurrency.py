@@ -0,0 +1,60 @@
+"""
+Mesure le débit de l'API scientifique selon le nombre de threads clients.
+
+Chaque thread est un client (sa propre session) qui enchaîne REQUESTS
+calculs via le client de test Flask ; le débit total est comparé à celui
+d'un seul thread. Les évaluations sont limitées par le GIL : le débit
+doit rester stable (pas d'effondrement dû aux verrous) plutôt que croître
+avec le nombre de threads.
+
+Usage : python benchmarks/bench_concurrency.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app  # noqa: E402
+
+REQUESTS = 500
+THREAD_COUNTS = (1, 2, 4, 8)
+
+
+def _client(index):
+    client = app.test_client()
+    client.post("/api/scientific/angle-mode", json={"mode": ("DEG", "RAD")[index % 2]})
+    for k in range(REQUESTS):
+        client.post(
+            "/api/scientific/calculate",
+            json={"expression": "sin(x)*x + sqrt(x)", "variables": {"x": k % 50}},
+        )
+
+
+def _throughput(thread_count):
+    threads = [
+        threading.Thread(target=_client, args=(index,)) for index in range(thread_count)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return thread_count * REQUESTS / (time.perf_counter() - start)
+
+
+def main():
+    baseline = None
+    for thread_count in THREAD_COUNTS:
+        rate = _throughput(thread_count)
+        baseline = baseline or rate
+        print(
+            f"{thread_count} thread(s) : {rate:8.0f} requêtes/s"
+            f"  (x{rate / baseline:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
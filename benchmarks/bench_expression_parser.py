@@ -0,0 +1,46 @@
+"""
+Compare l'analyseur de Pratt à eval() sur des expressions courtes.
+
+Usage : python benchmarks/bench_expression_parser.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.expression_parser import (
+    Parser,
+    evaluate,
+    evaluate_expression,
+    tokenize,
+)  # noqa: E402,E501
+
+EXPRESSIONS = ["12+7", "15÷3", "2×3+4×5", "1.5+2.25×(3-1)", "125×8-999÷3+42"]
+NUMBER = 20000
+
+
+def main():
+    for expression in EXPRESSIONS:
+        python_expression = expression.replace("×", "*").replace("÷", "/")
+        cold_time = timeit.timeit(
+            lambda: evaluate(Parser(tokenize(expression)).parse(), {}), number=NUMBER
+        )
+        parser_time = timeit.timeit(
+            lambda: evaluate_expression(expression), number=NUMBER
+        )
+        eval_time = timeit.timeit(
+            lambda: eval(python_expression, {"__builtins__": None}, {}),
+            number=NUMBER,
+        )
+        print(
+            f"{expression:<20} sans cache {cold_time / NUMBER * 1e6:7.2f} µs"
+            f"   parser {parser_time / NUMBER * 1e6:7.2f} µs"
+            f"   eval {eval_time / NUMBER * 1e6:7.2f} µs"
+            f"   x{eval_time / parser_time:4.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Mesure le coût de l'instrumentation de /metrics.
+
+- coût d'une observation (Metrics.observe_request), seule ;
+- débit de l'API scientifique via le client de test Flask, métriques
+  actives puis désactivées (SMARTCALC_METRICS=0), par tours alternés pour
+  lisser le bruit de la machine ;
+- durée d'une collecte de /metrics avec SESSIONS sessions vivantes.
+
+Usage : python benchmarks/bench_metrics.py
+"""
+
+import os
+import statistics
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import app  # noqa: E402
+from web import api  # noqa: E402
+from web.metrics import Metrics  # noqa: E402
+
+REQUESTS = 2000
+ROUNDS = 5
+SESSIONS = 1000
+
+
+def _observation_cost():
+    metrics = Metrics()
+    number = 200_000
+    elapsed = timeit.timeit(
+        lambda: metrics.observe_request("/api/calculate", "POST", 200, 0.003, "number"),
+        number=number,
+    )
+    return elapsed / number
+
+
+def _throughput(client, enabled):
+    api.metrics.enabled = enabled
+    start = time.perf_counter()
+    for k in range(REQUESTS):
+        client.post(
+            "/api/scientific/calculate",
+            json={"expression": "sin(x)*x + sqrt(x)", "variables": {"x": k % 50}},
+        )
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def main():
+    print(f"Observation : {_observation_cost() * 1e9:6.0f} ns")
+
+    client = app.test_client()
+    _throughput(client, True)  # caches chauds
+    rates = {True: [], False: []}
+    for _ in range(ROUNDS):
+        for enabled in (False, True):
+            rates[enabled].append(_throughput(client, enabled))
+    api.metrics.enabled = True
+    off = statistics.median(rates[False])
+    on = statistics.median(rates[True])
+    print(f"Sans métriques : {off:8.0f} requêtes/s")
+    print(f"Avec métriques : {on:8.0f} requêtes/s  (surcoût {(off / on - 1):+.1%})")
+
+    for _ in range(SESSIONS):
+        api.sessions.get()
+    start = time.perf_counter()
+    text = api.metrics_text()
+    elapsed = time.perf_counter() - start
+    print(
+        f"Collecte de /metrics ({len(api.sessions)} sessions, "
+        f"{len(text.splitlines())} lignes) : {elapsed * 1e3:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Mesure le coût par évaluation du moteur scientifique.
+
+Compare evaluate_expression (cache d'expressions compilées) à la fonction
+produite par ScientificModel.compile sur un balayage de valeurs scalaires.
+
+Usage : python benchmarks/bench_scientific_engine.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.scientific_model import ScientificModel  # noqa: E402
+
+EXPRESSION = "sin(x)*x + sin(x)*x**2 + sqrt(2)*sqrt(2) + y"
+POINTS = 50000
+
+
+def main():
+    model = ScientificModel()
+    values = [i * 0.01 for i in range(POINTS)]
+
+    start = time.perf_counter()
+    for x in values:
+        model.evaluate_expression(EXPRESSION, {"x": x, "y": 1.0})
+    evaluate_time = time.perf_counter() - start
+    model.clear_history()
+
+    function = model.compile(EXPRESSION, ["x", "y"])
+    start = time.perf_counter()
+    for x in values:
+        function(x, 1.0)
+    compiled_time = time.perf_counter() - start
+
+    print(f"evaluate_expression : {evaluate_time / POINTS * 1e6:7.2f} µs/point")
+    print(f"compile()           : {compiled_time / POINTS * 1e6:7.2f} µs/point")
+    print(f"accélération        : x{evaluate_time / compiled_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Mesure le coût des sommes indicées du moteur scientifique.
+
+Compare, sur TERMS termes, une forme close (somme de puissances), la
+somme évaluée par blocs NumPy et une boucle Python sur la fonction
+compilée du corps.
+
+Usage : python benchmarks/bench_series.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.scientific_model import ScientificModel  # noqa: E402
+
+TERMS = 10**6
+
+
+def main():
+    model = ScientificModel()
+    model.set_angle_mode("RAD")
+
+    start = time.perf_counter()
+    model.evaluate_expression(f"sum(k^3 + 2*k, k, 1, {TERMS})")
+    closed_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.evaluate_expression(f"sum(sin(k)/k, k, 1, {TERMS})")
+    chunked_time = time.perf_counter() - start
+
+    body = model.compile("sin(k)/k", ["k"])
+    start = time.perf_counter()
+    total = 0.0
+    for k in range(1, TERMS + 1):
+        total += body(k)
+    loop_time = time.perf_counter() - start
+
+    print(f"forme close      : {closed_time * 1e3:8.2f} ms")
+    print(f"blocs NumPy      : {chunked_time * 1e3:8.2f} ms")
+    print(f"boucle Python    : {loop_time * 1e3:8.2f} ms")
+    print(f"accélération     : x{loop_time / chunked_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
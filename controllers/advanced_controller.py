@@ -98,12 +98,14 @@ class AdvancedController(QObject):
         except Exception as e:
             self.error_occurred.emit(f"Erreur de résolution: {str(e)}")
 
-    def differentiate_expression(self, expression, variable, order=1):
-        """Calcule la dérivée d'une expression."""
+    def differentiate_expression(self, expression, variable, order=1, point=None):
+        """Calcule la dérivée d'une expression (en un point si point est donné)."""
         try:
-            derivative = self.model.differentiate(expression, variable, order)
+            derivative = self.model.differentiate(expression, variable, order, point)
+            at = "" if point is None else f" en {variable} = {point}"
             self.calculation_complete.emit(
-                f"Dérivée d'ordre {order} de {expression} par rapport à {variable}",
+                f"Dérivée d'ordre {order} de {expression} "
+                f"par rapport à {variable}{at}",
                 f"Résultat: {derivative}",
             )
             # Option B: appel direct spécifique
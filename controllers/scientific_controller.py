@@ -1,6 +1,8 @@
 from PyQt6.QtCore import QObject, pyqtSignal
 import math
 
+from models.expression_parser import evaluate_expression
+
 
 class ScientificController(QObject):
     """
@@ -118,29 +120,12 @@ class ScientificController(QObject):
         try:
             expression = self.view.get_display_text()
 
-            # Remplace les symboles spéciaux
-            expression = expression.replace("^", "**")
-
-            # Crée un dictionnaire de fonctions et constantes disponibles
-            math_funcs = {
-                "sin": math.sin,
-                "cos": math.cos,
-                "tan": math.tan,
-                "asin": math.asin,
-                "acos": math.acos,
-                "atan": math.atan,
-                "log": math.log10,
-                "ln": math.log,
-                "exp": math.exp,
-                "sqrt": math.sqrt,
-                "pi": math.pi,
-                "e": math.e,
-                "radians": math.radians,
-                "degrees": math.degrees,
-            }
-
-            # Évalue l'expression de manière sécurisée
-            result = eval(expression, {"__builtins__": None}, math_funcs)
+            # Analyse et évalue l'expression sans passer par eval, avec les
+            # fonctions du registre préconstruites pour l'unité d'angle courante
+            namespace = self.model.registry.namespace(self.angle_unit)
+            result = evaluate_expression(
+                expression, namespace, self.model.budget.operators
+            )
 
             # Affiche le résultat
             self.view.set_display_text(str(result))
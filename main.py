@@ -51,6 +51,9 @@ class MainWindow(QMainWindow):
         self.currency_model = CurrencyModel()
         self.discrete_model = DiscreteModel()
 
+        # Expressions compilées lors des sessions précédentes
+        self.scientific_model.load_cache()
+
         # Création des vues
         self.calculator_view = CalculatorView()
         self.scientific_view = ScientificView()
@@ -166,6 +169,12 @@ class MainWindow(QMainWindow):
         if hasattr(self, "currency_controller"):
             self.currency_controller.save_data()
 
+        if hasattr(self, "scientific_model"):
+            try:
+                self.scientific_model.save_cache()
+            except OSError:
+                pass
+
         # Nettoyage des contrôleurs
         if hasattr(self, "calculator_controller"):
             self.calculator_controller.cleanup()
@@ -7,6 +7,7 @@ Ce package inclut les modèles suivants :
 - currency_model : Modèle pour la conversion de devises
 - conversion_model : Modèle pour la conversion d'unités
 - advanced_model : Modèle pour les fonctionnalités avancées
+- worksheet_model : Feuille de définitions avec recalcul incrémental
 """
 
 # Import des modèles pour les rendre disponibles au niveau du package
@@ -15,6 +16,7 @@ from .scientific_model import ScientificModel
 from .currency_model import CurrencyModel
 from .conversion_model import ConversionModel
 from .advanced_model import AdvancedCalculatorModel
+from .worksheet_model import WorksheetModel
 
 __all__ = [
     "CalculatorModel",
@@ -22,4 +24,5 @@ __all__ = [
     "CurrencyModel",
     "ConversionModel",
     "AdvancedCalculatorModel",
+    "WorksheetModel",
 ]
@@ -1,6 +1,8 @@
 import numpy as np
 from datetime import datetime
 
+from models.scientific_model import ScientificModel
+
 
 class AdvancedCalculatorModel:
     """Modèle pour la calculatrice avancée (graphiques, matrices, factorisation)"""
@@ -29,6 +31,48 @@ class AdvancedCalculatorModel:
         self.current_matrix_b = None
         self.current_expression = ""
 
+        # Évaluateur partagé (tracé en radians, évaluation vectorisée)
+        self.evaluator = ScientificModel()
+        self.evaluator.set_angle_mode("RAD")
+
+    def evaluate_expression(self, expression, variables=None):
+        """
+        Évalue une expression, scalaire ou sur des tableaux NumPy.
+
+        Args:
+            expression: L'expression à évaluer
+            variables: Variables de l'expression (ex. {"x": np.linspace(...)})
+
+        Returns:
+            Un float, ou un tableau si une variable est un tableau
+        """
+        return self.evaluator.evaluate_expression(expression, variables)
+
+    def differentiate(self, expression, variable="x", order=1, point=None):
+        """
+        Dérive une expression.
+
+        En un point (ou un tableau de points), la dérivée est calculée
+        numériquement par différentiation automatique, sans sympy. Sans
+        point, la dérivée symbolique est calculée avec sympy.
+
+        Args:
+            expression: L'expression à dériver
+            variable: Variable de dérivation
+            order: Ordre de la dérivée
+            point: Point de dérivation (None pour la dérivée symbolique)
+
+        Returns:
+            La valeur de la dérivée, ou son expression symbolique (texte)
+        """
+        if point is not None:
+            return self.evaluator.differentiate(expression, point, variable, order)
+
+        # Importer sympy uniquement si nécessaire
+        from sympy import diff, symbols, sympify
+
+        return str(diff(sympify(expression), symbols(variable), order))
+
     # Méthodes pour les graphiques
     def plot_function(self, expression, x_min, x_max, num_points=1000):
         """Évalue une fonction mathématique pour le tracé"""
@@ -0,0 +1,308 @@
+"""
+Différentiation automatique en mode direct pour le moteur scientifique.
+
+Un Jet porte les coefficients de Taylor ``u_0, u_1, ..., u_n`` d'une valeur
+par rapport à la variable de dérivation : à l'ordre 1, c'est un nombre
+dual ``u + u' ε``. Les opérateurs et les fonctions du registre propagent
+ces coefficients par les récurrences usuelles (produit de Cauchy,
+``w' = f'(u) u'``...), si bien qu'une seule évaluation de l'expression
+donne toutes les dérivées jusqu'à l'ordre n, sans calcul symbolique.
+
+Les coefficients peuvent être des flottants ou des tableaux NumPy : une
+évaluation dérive alors l'expression en tous les points à la fois.
+"""
+
+import math
+from typing import Any, Callable, List, Sequence
+
+import numpy as np
+
+# Ordre de dérivation maximal (le coût croît comme le carré de l'ordre)
+MAX_ORDER = 100
+
+
+def _is_scalar(value: Any) -> bool:
+    return type(value) in (int, float)
+
+
+def _exp(x):
+    return math.exp(x) if _is_scalar(x) else np.exp(x)
+
+
+def _log(x):
+    return math.log(x) if _is_scalar(x) else np.log(x)
+
+
+def _sin(x):
+    return math.sin(x) if _is_scalar(x) else np.sin(x)
+
+
+def _cos(x):
+    return math.cos(x) if _is_scalar(x) else np.cos(x)
+
+
+class Jet:
+    """
+    Développement de Taylor tronqué d'une valeur (nombre dual généralisé).
+
+    Args:
+        coefficients: Coefficients de Taylor ``u_k = u^(k) / k!``
+    """
+
+    __slots__ = ("coefficients",)
+
+    def __init__(self, coefficients: Sequence[Any]):
+        self.coefficients = list(coefficients)
+
+    @classmethod
+    def variable(cls, point: Any, order: int = 1) -> "Jet":
+        """
+        Crée la variable de dérivation en un point (ou un tableau de points).
+
+        Args:
+            point: Valeur de la variable
+            order: Ordre de dérivation maximal
+
+        Returns:
+            Le jet ``point + ε``
+        """
+        return cls([point, 1.0] + [0.0] * (order - 1))
+
+    def _constant(self, value: Any) -> "Jet":
+        return Jet([value] + [0.0] * (len(self.coefficients) - 1))
+
+    def derivatives(self) -> List[Any]:
+        """Retourne la valeur et les dérivées successives ``[f, f', f'', ...]``."""
+        return [
+            coefficient * math.factorial(k)
+            for k, coefficient in enumerate(self.coefficients)
+        ]
+
+    def __repr__(self):
+        return f"Jet({self.coefficients!r})"
+
+    def __pos__(self):
+        return self
+
+    def __neg__(self):
+        return Jet([-u for u in self.coefficients])
+
+    def __add__(self, other):
+        if isinstance(other, Jet):
+            return Jet([u + v for u, v in zip(self.coefficients, other.coefficients)])
+        return Jet([self.coefficients[0] + other] + self.coefficients[1:])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Jet):
+            return Jet([u - v for u, v in zip(self.coefficients, other.coefficients)])
+        return Jet([self.coefficients[0] - other] + self.coefficients[1:])
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if not isinstance(other, Jet):
+            return Jet([u * other for u in self.coefficients])
+        u, v = self.coefficients, other.coefficients
+        return Jet([sum(u[j] * v[k - j] for j in range(k + 1)) for k in range(len(u))])
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if not isinstance(other, Jet):
+            return Jet([u / other for u in self.coefficients])
+        u, v = self.coefficients, other.coefficients
+        w = []
+        for k in range(len(u)):
+            w.append((u[k] - sum(v[j] * w[k - j] for j in range(1, k + 1))) / v[0])
+        return Jet(w)
+
+    def __rtruediv__(self, other):
+        return self._constant(other) / self
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Jet):
+            return exp(exponent * log(self))
+        if isinstance(exponent, float) and exponent.is_integer():
+            exponent = int(exponent)
+        if isinstance(exponent, int):
+            if exponent < 0:
+                return 1.0 / (self**-exponent)
+            # Exponentiation rapide : exacte même lorsque u_0 = 0
+            result, base = self._constant(1.0), self
+            while exponent:
+                if exponent & 1:
+                    result = result * base
+                exponent >>= 1
+                if exponent:
+                    base = base * base
+            return result
+        # u w' = a u' w
+        u = self.coefficients
+        w = [u[0] ** exponent]
+        for k in range(1, len(u)):
+            total = sum(
+                (exponent * j - (k - j)) * u[j] * w[k - j] for j in range(1, k + 1)
+            )
+            w.append(total / (k * u[0]))
+        return Jet(w)
+
+    def __rpow__(self, base):
+        return exp(self * _log(base))
+
+
+def _integrate(u: Jet, w0: Any, derivative: Jet) -> Jet:
+    """Coefficients de w tel que w(0) = w0 et w' = derivative · u'."""
+    u, g = u.coefficients, derivative.coefficients
+    w = [w0]
+    for k in range(1, len(u)):
+        w.append(sum(j * u[j] * g[k - j] for j in range(1, k + 1)) / k)
+    return Jet(w)
+
+
+def exp(u):
+    """Exponentielle (w' = w u')."""
+    if not isinstance(u, Jet):
+        return _exp(u)
+    u = u.coefficients
+    w = [_exp(u[0])]
+    for k in range(1, len(u)):
+        w.append(sum(j * u[j] * w[k - j] for j in range(1, k + 1)) / k)
+    return Jet(w)
+
+
+def log(u):
+    """Logarithme népérien (u w' = u')."""
+    if not isinstance(u, Jet):
+        return _log(u)
+    u = u.coefficients
+    w = [_log(u[0])]
+    for k in range(1, len(u)):
+        total = sum(j * w[j] * u[k - j] for j in range(1, k))
+        w.append((u[k] - total / k) / u[0])
+    return Jet(w)
+
+
+def log10(u):
+    """Logarithme décimal."""
+    return log(u) / math.log(10)
+
+
+def _sin_cos(u: Jet):
+    u = u.coefficients
+    s, c = [_sin(u[0])], [_cos(u[0])]
+    for k in range(1, len(u)):
+        s.append(sum(j * u[j] * c[k - j] for j in range(1, k + 1)) / k)
+        c.append(-sum(j * u[j] * s[k - j] for j in range(1, k + 1)) / k)
+    return Jet(s), Jet(c)
+
+
+def sin(u):
+    """Sinus (argument en radians)."""
+    return _sin_cos(u)[0] if isinstance(u, Jet) else _sin(u)
+
+
+def cos(u):
+    """Cosinus (argument en radians)."""
+    return _sin_cos(u)[1] if isinstance(u, Jet) else _cos(u)
+
+
+def tan(u):
+    """Tangente (argument en radians)."""
+    if not isinstance(u, Jet):
+        return math.tan(u) if _is_scalar(u) else np.tan(u)
+    s, c = _sin_cos(u)
+    return s / c
+
+
+def sqrt(u):
+    """Racine carrée."""
+    if not isinstance(u, Jet):
+        return math.sqrt(u) if _is_scalar(u) else np.sqrt(u)
+    return u**0.5
+
+
+def asin(u):
+    """Arc sinus (w' = u' / sqrt(1 - u²))."""
+    if not isinstance(u, Jet):
+        return math.asin(u) if _is_scalar(u) else np.arcsin(u)
+    return _integrate(u, asin(u.coefficients[0]), (1 - u * u) ** -0.5)
+
+
+def acos(u):
+    """Arc cosinus (w' = -u' / sqrt(1 - u²))."""
+    if not isinstance(u, Jet):
+        return math.acos(u) if _is_scalar(u) else np.arccos(u)
+    return _integrate(u, acos(u.coefficients[0]), -((1 - u * u) ** -0.5))
+
+
+def atan(u):
+    """Arc tangente (w' = u' / (1 + u²))."""
+    if not isinstance(u, Jet):
+        return math.atan(u) if _is_scalar(u) else np.arctan(u)
+    return _integrate(u, atan(u.coefficients[0]), 1 / (1 + u * u))
+
+
+def absolute(u):
+    """Valeur absolue (dérivée du signe de u, nulle en 0)."""
+    if not isinstance(u, Jet):
+        return abs(u)
+    return u * np.sign(u.coefficients[0])
+
+
+def radians(u):
+    """Conversion degrés -> radians."""
+    return u * (math.pi / 180)
+
+
+def degrees(u):
+    """Conversion radians -> degrés."""
+    return u * (180 / math.pi)
+
+
+def derivatives(
+    function: Callable[[Any], Any], point: Any, order: int = 1
+) -> List[Any]:
+    """
+    Calcule une fonction et ses dérivées successives en un point.
+
+    Args:
+        function: Fonction d'une variable, composée d'opérations et de
+            fonctions de ce module (par exemple une expression compilée
+            par ScientificModel avec l'espace de noms "jet")
+        point: Point de dérivation (nombre ou tableau NumPy)
+        order: Ordre de dérivation maximal
+
+    Returns:
+        La liste ``[f(point), f'(point), ..., f^(order)(point)]``
+    """
+    if not isinstance(order, int) or not 0 <= order <= MAX_ORDER:
+        raise ValueError(f"L'ordre de dérivation doit être entre 0 et {MAX_ORDER}")
+    if isinstance(point, (list, tuple)):
+        point = np.asarray(point, dtype=float)
+    result = function(Jet.variable(point, max(order, 1)))
+    if isinstance(result, Jet):
+        values = result.derivatives()[: order + 1]
+    else:
+        # Expression indépendante de la variable
+        values = [result] + [0.0] * order
+    if isinstance(point, np.ndarray):
+        values = [np.array(np.broadcast_to(value, point.shape)) for value in values]
+    return values
+
+
+def derivative(function: Callable[[Any], Any], point: Any, order: int = 1) -> Any:
+    """
+    Calcule la dérivée d'ordre ``order`` d'une fonction en un point.
+
+    Args:
+        function: Fonction d'une variable (voir derivatives)
+        point: Point de dérivation (nombre ou tableau NumPy)
+        order: Ordre de dérivation
+
+    Returns:
+        La valeur de la dérivée (tableau si point est un tableau)
+    """
+    return derivatives(function, point, order)[order]
@@ -0,0 +1,123 @@
+"""
+Sauvegarde sur disque du cache d'expressions compilées (démarrage à chaud).
+
+Un instantané contient les arbres optimisés et les objets code des
+expressions compilées, sérialisés avec ``marshal`` (le format des .pyc).
+Il n'est relu que par le même interpréteur (même format de bytecode), la
+même version de SmartCalc et un registre de fonctions identique ; un
+fichier absent, tronqué, corrompu ou périmé est simplement ignoré.
+
+Comme un .pyc, un instantané contient du code exécutable : il ne doit être
+lu que depuis un emplacement contrôlé par l'application.
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import tempfile
+from typing import Any, List, Sequence
+
+from smartcalc import __version__
+
+# Incrémenté à chaque changement de la structure des entrées
+FORMAT_VERSION = 1
+
+_MAGIC = b"SMARTCALC-EXPRESSIONS\n"
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+def _header(fingerprint: Any) -> tuple:
+    return (
+        FORMAT_VERSION,
+        sys.implementation.cache_tag,
+        importlib.util.MAGIC_NUMBER,
+        __version__,
+        fingerprint,
+    )
+
+
+def dumps(entries: Sequence[tuple], fingerprint: Any) -> bytes:
+    """
+    Sérialise des entrées de cache.
+
+    Args:
+        entries: Tuples composés de types supportés par marshal
+        fingerprint: Empreinte de la configuration (registre, budget...)
+
+    Returns:
+        Le contenu du fichier d'instantané
+    """
+    payload = marshal.dumps((_header(fingerprint), tuple(entries)))
+    return _MAGIC + hashlib.sha256(payload).digest() + payload
+
+
+def loads(data: bytes, fingerprint: Any) -> List[tuple]:
+    """
+    Relit des entrées de cache sérialisées par dumps().
+
+    Args:
+        data: Le contenu du fichier
+        fingerprint: Empreinte de la configuration courante
+
+    Returns:
+        Les entrées
+
+    Raises:
+        ValueError: Si le contenu est corrompu ou a été produit par une
+            autre version (Python, SmartCalc, registre)
+    """
+    if not data.startswith(_MAGIC):
+        raise ValueError("Fichier de cache non reconnu")
+    start = len(_MAGIC) + _DIGEST_SIZE
+    digest, payload = data[len(_MAGIC) : start], data[start:]
+    if hashlib.sha256(payload).digest() != digest:
+        raise ValueError("Fichier de cache corrompu")
+    try:
+        header, entries = marshal.loads(payload)
+    except (EOFError, ValueError, TypeError) as e:
+        raise ValueError(f"Fichier de cache illisible: {e}")
+    if header != _header(fingerprint):
+        raise ValueError("Fichier de cache périmé")
+    return list(entries)
+
+
+def save(path: str, entries: Sequence[tuple], fingerprint: Any):
+    """
+    Écrit un instantané de façon atomique (fichier temporaire puis renommage).
+
+    Args:
+        path: Chemin du fichier
+        entries: Entrées à sauvegarder (voir dumps)
+        fingerprint: Empreinte de la configuration
+    """
+    data = dumps(entries, fingerprint)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load(path: str, fingerprint: Any) -> List[tuple]:
+    """
+    Lit un instantané ; retourne une liste vide s'il est absent ou invalide.
+
+    Args:
+        path: Chemin du fichier
+        fingerprint: Empreinte de la configuration courante
+
+    Returns:
+        Les entrées sauvegardées
+    """
+    try:
+        with open(path, "rb") as f:
+            return loads(f.read(), fingerprint)
+    except (OSError, ValueError):
+        return []
@@ -1,14 +1,131 @@
+import operator
+
+from models.evaluation_budget import EvaluationBudget
+from models.expression_optimizer import count_nodes
+from models.expression_parser import evaluate, parse
+from models.function_registry import default_registry
+
+# Precedence and implementation of the keypad operators
+_PRECEDENCE = {"+": 1, "-": 1, "×": 2, "*": 2, "÷": 2, "/": 2}
+_OPERATIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "×": operator.mul,
+    "*": operator.mul,
+    "÷": operator.truediv,
+    "/": operator.truediv,
+}
+
+
+def _parse_operand(text):
+    """Convert a display value to a number, keeping integers exact."""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _reduce(operands, operators, min_precedence=0):
+    """Apply stacked operators while they bind at least as tightly as min_precedence."""
+    while operators and _PRECEDENCE[operators[-1]] >= min_precedence:
+        right = operands.pop()
+        operands[-1] = _OPERATIONS[operators.pop()](operands[-1], right)
+
+
 class CalculatorModel:
-    def __init__(self):
+    # Mode d'angle des fonctions du registre utilisées dans les expressions
+    ANGLE_MODE = "DEG"
+
+    # Keypad actions (web API protocol) -> (method, takes the button value)
+    ACTIONS = {
+        "clear": ("clear", False),
+        "number": ("append_number", True),
+        "operator": ("add_operator", True),
+        "equals": ("calculate", False),
+        "decimal": ("add_decimal", False),
+        "percentage": ("percentage", False),
+        "toggle_sign": ("toggle_sign", False),
+    }
+
+    def __init__(self, budget=None, registry=None):
+        # Limites de ressources appliquées à chaque calcul
+        self.budget = budget or EvaluationBudget()
+        # Fonctions et constantes utilisables dans les expressions
+        self.registry = registry or default_registry
         self.current_value = "0"
         self.expression = ""
         self.memory = 0
         self.waiting_for_operand = True
 
+        # Shunting-yard state of the committed part of the expression.
+        # The trailing operator stays pending (it can still be replaced)
+        # until the operand that follows it is committed. With two
+        # precedence levels the stacks never hold more than two operators,
+        # so the running value costs O(1) per keystroke.
+        self._operands = []
+        self._operators = []
+        self._pending_operator = None
+        # Expression the stacks stand for (None when out of sync)
+        self._synced_expression = ""
+        self.running_value = "0"
+
+    def apply_action(self, action, value=""):
+        """Apply one keypad action by name (see ACTIONS)."""
+        try:
+            method, takes_value = self.ACTIONS[action]
+        except (KeyError, TypeError):
+            raise ValueError(f"Action inconnue: {action!r}") from None
+        if takes_value:
+            getattr(self, method)(value)
+        else:
+            getattr(self, method)()
+
+    def get_state(self):
+        """Display state sent back to the web client."""
+        return {
+            "current_value": self.current_value,
+            "expression": self.expression,
+            "running_value": self.running_value,
+        }
+
     def clear(self):
         self.current_value = "0"
         self.expression = ""
         self.waiting_for_operand = True
+        self._reset_stacks()
+        self._update_running_value()
+
+    def _reset_stacks(self):
+        self._operands = []
+        self._operators = []
+        self._pending_operator = None
+        self._synced_expression = ""
+
+    def _push_operand(self, operands, operators, value):
+        """Commit the pending operator and the operand that follows it."""
+        pending = self._pending_operator
+        if pending is not None:
+            _reduce(operands, operators, _PRECEDENCE[pending])
+            operators.append(pending)
+        operands.append(value)
+
+    def _update_running_value(self):
+        """Preview the result of the expression typed so far without parsing it."""
+        if self._synced_expression != self.expression:
+            self.running_value = None
+            return
+        operands = list(self._operands)
+        operators = list(self._operators)
+        try:
+            if not self.waiting_for_operand and self.current_value:
+                value = _parse_operand(self.current_value)
+                self._push_operand(operands, operators, value)
+            if not operands:
+                operands.append(_parse_operand(self.current_value))
+            _reduce(operands, operators)
+            self.running_value = str(operands[-1])
+        except (ValueError, ArithmeticError):
+            self.running_value = None
 
     def append_number(self, number):
         if self.waiting_for_operand:
@@ -16,34 +133,80 @@ class CalculatorModel:
             self.waiting_for_operand = False
         else:
             self.current_value += str(number)
+        self._update_running_value()
 
     def add_operator(self, operator):
         if not self.expression and not self.current_value:
             return
 
-        # If we're starting a new expression, use the current value
-        if not self.expression and self.current_value:
-            self.expression = self.current_value
-        # If we already have an expression and a current value, append it
-        elif not self.waiting_for_operand and self.current_value:
-            self.expression += self.current_value
-        # If we're replacing an operator, remove the last one
-        elif (
-            self.waiting_for_operand
-            and self.expression
-            and self.expression[-1] in "+-×÷"
-        ):
-            self.expression = self.expression[:-1]
+        # Operators the stacks cannot apply (e.g. "^") are left to the parser
+        synced = self._synced_expression == self.expression and operator in _PRECEDENCE
+        try:
+            # If we're starting a new expression, use the current value
+            if not self.expression and self.current_value:
+                self.expression = self.current_value
+                self._reset_stacks()
+                self._operands.append(_parse_operand(self.current_value))
+                synced = operator in _PRECEDENCE
+            # If we already have an expression and a current value, append it
+            elif not self.waiting_for_operand and self.current_value:
+                self.expression += self.current_value
+                if synced:
+                    value = _parse_operand(self.current_value)
+                    self._push_operand(self._operands, self._operators, value)
+            # If we're replacing an operator, remove the last one
+            elif (
+                self.waiting_for_operand
+                and self.expression
+                and self.expression[-1] in "+-×÷"
+            ):
+                self.expression = self.expression[:-1]
+            else:
+                synced = False
+            self._pending_operator = operator
+        except (ValueError, KeyError, IndexError, ArithmeticError):
+            # Fall back to parsing the whole expression on "="
+            synced = False
 
         # Add the new operator
         self.expression += operator
         self.waiting_for_operand = True
         self.current_value = ""
+        self._synced_expression = self.expression if synced else None
+        self._update_running_value()
 
     def calculate(self):
         if not self.expression and not self.current_value:
             return
 
+        if self._synced_expression == self.expression:
+            self._calculate_incremental()
+        else:
+            self._calculate_full()
+        self._reset_stacks()
+        self._update_running_value()
+
+    def _calculate_incremental(self):
+        """Finish the expression from the operator/operand stacks (no re-parse)."""
+        try:
+            operands = self._operands
+            operators = self._operators
+            if not self.waiting_for_operand and self.current_value:
+                value = _parse_operand(self.current_value)
+                self._push_operand(operands, operators, value)
+            # Otherwise the trailing (pending) operator is dropped
+            if not operands:
+                operands.append(_parse_operand(self.current_value))
+            _reduce(operands, operators)
+            self.expression = ""
+            self.current_value = str(operands[-1])
+            self.waiting_for_operand = True
+
+        except (ValueError, ArithmeticError):
+            self._show_error()
+
+    def _calculate_full(self):
+        """Parse and evaluate the whole expression (used when it was edited directly)."""
         try:
             # Build the complete expression
             if not self.waiting_for_operand and self.current_value:
@@ -57,16 +220,32 @@ class CalculatorModel:
                 eval_expr = eval_expr[:-1]
 
             if eval_expr:
-                result = str(eval(eval_expr))
+                tree = parse(eval_expr)
+                self.budget.check_nodes(count_nodes(tree))
+                previous = self.budget.start()
+                try:
+                    namespace = self.registry.namespace(self.ANGLE_MODE)
+                    result = str(evaluate(tree, namespace, self.budget.operators))
+                finally:
+                    self.budget.stop(previous)
                 self.expression = ""
                 self.current_value = result
                 self.waiting_for_operand = True
 
-        except (SyntaxError, NameError, TypeError, ZeroDivisionError) as e:
-            print(f"Error in calculation: {e}")
-            self.current_value = "Error"
-            self.expression = ""
-            self.waiting_for_operand = True
+        except (
+            SyntaxError,
+            NameError,
+            TypeError,
+            ValueError,
+            ArithmeticError,
+        ):
+            self._show_error()
+
+    def _show_error(self):
+        """Display "Error" and start a new expression (failed calculation)."""
+        self.current_value = "Error"
+        self.expression = ""
+        self.waiting_for_operand = True
 
     def add_decimal(self):
         if self.waiting_for_operand:
@@ -74,6 +253,7 @@ class CalculatorModel:
             self.waiting_for_operand = False
         elif "." not in self.current_value:
             self.current_value += "."
+        self._update_running_value()
 
     def percentage(self):
         try:
@@ -82,9 +262,11 @@ class CalculatorModel:
             self.waiting_for_operand = False
         except (ValueError, TypeError):
             self.current_value = "Error"
+        self._update_running_value()
 
     def toggle_sign(self):
         if self.current_value.startswith("-"):
             self.current_value = self.current_value[1:]
         elif self.current_value != "0":
             self.current_value = "-" + self.current_value
+        self._update_running_value()
@@ -1,6 +1,8 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List
 from datetime import datetime
 
+import numpy as np
+
 
 class ConversionModel:
     """
@@ -114,12 +116,86 @@ class ConversionModel:
         except Exception as e:
             raise ValueError(f"Erreur de conversion: {str(e)}")
 
+    def check_units(self, from_unit: str, to_unit: str, conv_type: str):
+        """
+        Vérifie que deux unités appartiennent à une catégorie.
+
+        Args:
+            from_unit: Unité source
+            to_unit: Unité cible
+            conv_type: Type de conversion
+
+        Raises:
+            ValueError: Si une unité n'est pas prise en charge
+        """
+        units = self.CONVERSION_FACTORS.get(conv_type, {})
+        if from_unit not in units or to_unit not in units:
+            raise ValueError(
+                "Erreur de conversion: "
+                "Unités non prises en charge pour cette catégorie"
+            )
+
+    def convert_many(
+        self,
+        values: Iterable[float],
+        from_unit: str,
+        to_unit: str,
+        conv_type: str,
+    ) -> np.ndarray:
+        """
+        Convertit un ensemble de valeurs en une seule opération vectorisée.
+
+        Destiné aux conversions en masse (exports de capteurs) : rien n'est
+        ajouté à l'historique, voir record_bulk.
+
+        Args:
+            values: Les valeurs à convertir (liste ou tableau NumPy)
+            from_unit: Unité source
+            to_unit: Unité cible
+            conv_type: Type de conversion
+
+        Returns:
+            Le tableau des valeurs converties
+        """
+        self.check_units(from_unit, to_unit, conv_type)
+        values = np.asarray(values, dtype=float)
+        if conv_type == "Température":
+            return self._convert_temperature(values, from_unit, to_unit)
+        factors = self.CONVERSION_FACTORS[conv_type]
+        # Mêmes opérations que convert(), donc mêmes arrondis
+        return values * factors[from_unit] / factors[to_unit]
+
+    def record_bulk(
+        self, count: int, from_unit: str, to_unit: str, conv_type: str, errors: int = 0
+    ):
+        """
+        Ajoute à l'historique le résumé d'une conversion en masse.
+
+        Args:
+            count: Nombre de valeurs converties
+            from_unit: Unité source
+            to_unit: Unité cible
+            conv_type: Type de conversion
+            errors: Nombre de lignes rejetées
+        """
+        self.history.append(
+            {
+                "count": count,
+                "errors": errors,
+                "from_unit": from_unit,
+                "to_unit": to_unit,
+                "type": conv_type,
+                "timestamp": self._get_timestamp(),
+                "bulk": True,
+            }
+        )
+
     def _convert_temperature(self, value: float, from_unit: str, to_unit: str) -> float:
         """
         Convertit une température entre différentes unités.
 
         Args:
-            value: La température à convertir
+            value: La température à convertir (nombre ou tableau NumPy)
             from_unit: Unité source (C, F, K)
             to_unit: Unité cible (C, F, K)
 
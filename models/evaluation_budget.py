@@ -0,0 +1,155 @@
+"""
+Budgets de ressources pour l'évaluation des expressions.
+
+Une expression comme ``9**9**9`` ou ``factorial(10**6)`` peut bloquer un
+processus pendant des minutes. Les opérations dont le coût n'est pas borné
+(puissance entière, factorielle, combinaisons) passent par un
+EvaluationBudget qui vérifie la taille des résultats et l'échéance de
+l'évaluation en cours, et lève BudgetExceededError au lieu de bloquer.
+"""
+
+import math
+import threading
+import time
+import types
+from typing import Dict, Optional
+
+from models.expression_parser import BINARY_OPERATORS
+
+
+class BudgetExceededError(ValueError):
+    """Levée lorsqu'une évaluation dépasse l'un de ses budgets."""
+
+
+class EvaluationBudget:
+    """
+    Limites appliquées à une évaluation et compteurs de dépassements.
+
+    Args:
+        max_exponent: Valeur absolue maximale d'un exposant entier
+        max_int_bits: Taille maximale (en bits) d'un entier produit
+        max_nodes: Nombre maximal de nœuds d'une expression
+        time_limit: Durée maximale d'une évaluation, en secondes
+    """
+
+    MAX_EXPONENT = 100_000
+    MAX_INT_BITS = 100_000
+    MAX_NODES = 500
+    TIME_LIMIT = 2.0
+
+    def __init__(
+        self,
+        max_exponent: Optional[int] = None,
+        max_int_bits: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        time_limit: Optional[float] = None,
+    ):
+        self.max_exponent = max_exponent or self.MAX_EXPONENT
+        self.max_int_bits = max_int_bits or self.MAX_INT_BITS
+        self.max_nodes = max_nodes or self.MAX_NODES
+        self.time_limit = time_limit or self.TIME_LIMIT
+        self.violations = {"exponent": 0, "int_bits": 0, "nodes": 0, "time": 0}
+
+        # Échéance propre à chaque thread (None hors évaluation)
+        self._local = threading.local()
+
+        # Opérateurs et module math dont les opérations coûteuses sont bornées
+        self.operators = dict(BINARY_OPERATORS, **{"**": self.power})
+        self.math = types.SimpleNamespace(
+            **{name: getattr(math, name) for name in dir(math) if name[0] != "_"}
+        )
+        self.math.factorial = self.factorial
+        self.math.comb = self.comb
+        self.math.perm = self.perm
+
+    def _exceeded(self, kind: str, message: str):
+        self.violations[kind] += 1
+        raise BudgetExceededError(message)
+
+    def start(self, time_limit: Optional[float] = None) -> Optional[float]:
+        """
+        Arme l'échéance de l'évaluation du thread courant.
+
+        Args:
+            time_limit: Durée autorisée (par défaut self.time_limit)
+
+        Returns:
+            L'échéance précédente, à rendre à stop()
+        """
+        previous = getattr(self._local, "deadline", None)
+        limit = self.time_limit if time_limit is None else time_limit
+        deadline = time.perf_counter() + limit
+        if previous is not None:
+            deadline = min(deadline, previous)
+        self._local.deadline = deadline
+        return previous
+
+    def stop(self, previous: Optional[float] = None):
+        """Désarme l'échéance (ou restaure celle d'une évaluation englobante)."""
+        self._local.deadline = previous
+
+    def check_time(self):
+        """Lève BudgetExceededError si l'échéance de l'évaluation est dépassée."""
+        deadline = getattr(self._local, "deadline", None)
+        if deadline is not None and time.perf_counter() > deadline:
+            self._exceeded("time", "Temps de calcul dépassé")
+
+    def check_nodes(self, count: int):
+        """Vérifie la taille (en nœuds) d'une expression."""
+        if count > self.max_nodes:
+            self._exceeded(
+                "nodes", f"Expression trop longue ({count} > {self.max_nodes} nœuds)"
+            )
+
+    def _check_bits(self, bits: float):
+        if bits > self.max_int_bits:
+            self._exceeded("int_bits", "Résultat entier trop grand")
+
+    def power(self, base, exponent):
+        """Puissance dont la taille du résultat entier est bornée."""
+        self.check_time()
+        if type(exponent) is int and type(base) is int:
+            if abs(exponent) > self.max_exponent:
+                self._exceeded("exponent", f"Exposant trop grand ({exponent})")
+            if exponent > 0 and abs(base) > 1:
+                self._check_bits(math.log2(abs(base)) * exponent)
+        return base**exponent
+
+    def factorial(self, n):
+        """Factorielle dont la taille du résultat est bornée."""
+        self.check_time()
+        if isinstance(n, float) and n.is_integer():
+            n = int(n)
+        if not isinstance(n, int) or n < 0:
+            raise ValueError(
+                "La factorielle n'est définie que pour les entiers positifs"
+            )
+        self._check_bits(math.lgamma(n + 1) / math.log(2))
+        return math.factorial(n)
+
+    def comb(self, n: int, k: int) -> int:
+        """Coefficient binomial dont la taille du résultat est bornée."""
+        self.check_time()
+        self._check_bits(n)
+        return math.comb(n, k)
+
+    def perm(self, n: int, k: Optional[int] = None) -> int:
+        """Nombre d'arrangements dont la taille du résultat est bornée."""
+        self.check_time()
+        self._check_bits(n.bit_length() * (n if k is None else k))
+        return math.perm(n, k)
+
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Retourne les limites configurées et le nombre de dépassements.
+
+        Returns:
+            Dictionnaire des limites et des compteurs par type de budget
+        """
+        return {
+            "max_exponent": self.max_exponent,
+            "max_int_bits": self.max_int_bits,
+            "max_nodes": self.max_nodes,
+            "time_limit": self.time_limit,
+            "violations": dict(self.violations),
+        }
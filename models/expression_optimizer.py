@@ -0,0 +1,153 @@
+"""
+Optimisation des arbres d'expressions du moteur scientifique.
+
+S'intercale entre l'analyse (expression_parser.parse) et la génération
+du code : les sous-arbres constants sont précalculés et les
+sous-expressions répétées repérées pour n'être évaluées qu'une fois.
+"""
+
+import cmath
+from typing import Any, Callable, Dict, FrozenSet, Iterable
+
+from models.evaluation_budget import BudgetExceededError
+from models.expression_parser import BINARY_OPERATORS, Node, resolve_name
+from models.precision import exceeds_str_digits
+
+
+def _is_number(value: Any) -> bool:
+    if isinstance(value, complex):
+        # Un complexe infini ou NaN n'a pas de littéral Python : non précalculé
+        return cmath.isfinite(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        # Trop long pour repr (sys.get_int_max_str_digits) : calculé à
+        # l'évaluation plutôt qu'écrit en littéral
+        return not exceeds_str_digits(value)
+    return isinstance(value, float)
+
+
+def fold_constants(
+    node: Node,
+    namespace: Dict[str, Any],
+    variables: Iterable[str] = (),
+    operators: Dict[str, Callable[[Any, Any], Any]] = BINARY_OPERATORS,
+) -> Node:
+    """
+    Remplace les sous-arbres constants par leur valeur.
+
+    Les constantes et fonctions sont résolues dans ``namespace`` (qui
+    porte donc le mode d'angle courant). Un nom listé dans ``variables``
+    n'est jamais considéré comme constant. Un sous-arbre dont le calcul
+    échoue (division par zéro, domaine...) est laissé tel quel pour que
+    l'erreur survienne à l'évaluation ; seul un dépassement de budget
+    interrompt l'optimisation.
+
+    Args:
+        node: L'arbre à optimiser
+        namespace: Constantes et fonctions pures disponibles
+        variables: Noms fournis à l'évaluation
+        operators: Implémentation des opérateurs binaires
+
+    Returns:
+        L'arbre avec ses sous-arbres constants précalculés
+    """
+    variables = frozenset(variables)
+
+    def resolve(name: str):
+        if name.partition(".")[0] in variables:
+            raise NameError(name)
+        return resolve_name(name, namespace)
+
+    def fold(node: Node) -> Node:
+        tag = node[0]
+        if tag == "num":
+            return node
+        try:
+            if tag == "name":
+                value = resolve(node[1])
+                return ("num", value) if _is_number(value) else node
+            if tag == "neg":
+                operand = fold(node[1])
+                if operand[0] == "num":
+                    return ("num", -operand[1])
+                return ("neg", operand)
+            if tag == "call":
+                arguments = tuple(fold(argument) for argument in node[2])
+                node = ("call", node[1], arguments)
+                if all(argument[0] == "num" for argument in arguments):
+                    value = resolve(node[1])(*[argument[1] for argument in arguments])
+                    if _is_number(value):
+                        return ("num", value)
+                return node
+            left, right = fold(node[1]), fold(node[2])
+            node = (tag, left, right)
+            if left[0] == "num" and right[0] == "num":
+                value = operators[tag](left[1], right[1])
+                if _is_number(value):
+                    return ("num", value)
+            return node
+        except BudgetExceededError:
+            raise
+        except (ArithmeticError, ValueError, TypeError, NameError):
+            return node
+
+    return fold(node)
+
+
+def find_common_subexpressions(node: Node) -> FrozenSet[Node]:
+    """
+    Repère les sous-expressions (opérations et appels) qui se répètent.
+
+    Les occurrences répétées ne sont pas parcourues : une sous-expression
+    qui n'apparaît qu'à l'intérieur d'une répétition n'est comptée qu'une fois.
+
+    Args:
+        node: L'arbre (de préférence déjà simplifié par fold_constants)
+
+    Returns:
+        L'ensemble des sous-arbres apparaissant au moins deux fois
+    """
+    counts: Dict[Node, int] = {}
+
+    def visit(node: Node):
+        tag = node[0]
+        if tag in ("num", "name"):
+            return
+        if node in counts:
+            counts[node] += 1
+            return
+        counts[node] = 1
+        children = node[2] if tag == "call" else node[1:]
+        for child in children:
+            visit(child)
+
+    visit(node)
+    return frozenset(subtree for subtree, count in counts.items() if count > 1)
+
+
+def count_nodes(node: Node, unique: bool = False) -> int:
+    """
+    Compte les nœuds d'un arbre (parcours itératif, sans limite de profondeur).
+
+    Args:
+        node: L'arbre à mesurer
+        unique: Si True, les sous-arbres identiques ne comptent qu'une fois
+
+    Returns:
+        Le nombre de nœuds
+    """
+    seen = set()
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if unique:
+            if node in seen:
+                continue
+            seen.add(node)
+        count += 1
+        tag = node[0]
+        if tag == "call":
+            stack.extend(node[2])
+        elif tag not in ("num", "name"):
+            stack.extend(node[1:])
+    return count
@@ -0,0 +1,467 @@
+"""
+Analyseur d'expressions mathématiques de SmartCalc.
+
+Ce module remplace ``eval`` pour la grammaire de la calculatrice :
+un tokeniseur à base d'expression régulière et un analyseur de Pratt
+(précédence d'opérateurs) produisent un arbre compact de tuples, évalué
+ensuite sans passer par le compilateur Python.
+
+Forme des nœuds :
+- ``("num", valeur)`` : littéral numérique (int ou float)
+- ``("name", nom)`` : constante ou variable (éventuellement pointée, ``math.pi``)
+- ``("neg", opérande)`` : moins unaire
+- ``(op, gauche, droite)`` : opération binaire, ``op`` parmi ``+ - * / // % **``
+- ``("call", nom, (arguments, ...))`` : appel de fonction
+"""
+
+import keyword
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# Profondeur maximale de l'arbre (imbrication et longues chaînes d'opérations) :
+# les parcours récursifs (evaluate, to_source...) restent sous la limite de
+# récursion de Python
+MAX_DEPTH = 200
+
+# Taille maximale (en bits) d'un entier produit par la puissance par défaut ;
+# EvaluationBudget.operators ajoute des limites configurables et une échéance
+MAX_POWER_BITS = 100_000
+
+# Nombre, nom (éventuellement pointé), puissance ou tout autre caractère isolé
+_TOKEN_RE = re.compile(
+    r"(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+    r"|[A-Za-z_][A-Za-z_0-9]*(?:\.[A-Za-z_][A-Za-z_0-9]*)*"
+    r"|\*\*|//|\S"
+)
+_DIGITS = frozenset("0123456789.")
+
+# Symboles d'affichage ramenés aux opérateurs canoniques
+_OPERATORS = {op: op for op in ("**", "+", "-", "*", "/", "//", "%", "(", ")", ",")}
+_OPERATORS.update({"×": "*", "÷": "/", "^": "**", "−": "-"})
+
+# Puissance de liaison à gauche des opérateurs binaires
+_BINDING_POWER = {"+": 10, "-": 10, "*": 20, "/": 20, "//": 20, "%": 20, "**": 40}
+_UNARY_BINDING_POWER = 30
+_IMPLICIT_BINDING_POWER = _BINDING_POWER["*"]
+
+
+def _power(base: Any, exponent: Any) -> Any:
+    """Puissance dont le résultat entier est borné (``2^2^2^2^2^2`` échoue vite)."""
+    if type(base) is int and type(exponent) is int and exponent > 0 and abs(base) > 1:
+        if (
+            exponent > MAX_POWER_BITS
+            or math.log2(abs(base)) * exponent > MAX_POWER_BITS
+        ):
+            raise OverflowError("Résultat entier trop grand")
+    return base**exponent
+
+
+BINARY_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+    "**": _power,
+}
+
+Token = Tuple[str, Any]
+Node = Tuple[Any, ...]
+
+
+def tokenize(expression: str) -> List[Token]:
+    """
+    Découpe une expression en jetons.
+
+    Args:
+        expression: L'expression à découper
+
+    Returns:
+        Liste de jetons ``(type, valeur)`` avec type parmi
+        ``num``, ``name`` et ``op``
+    """
+    tokens = []
+    append = tokens.append
+    for text in _TOKEN_RE.findall(expression):
+        first = text[0]
+        if first in _DIGITS:
+            if text == ".":
+                raise SyntaxError("Point décimal isolé")
+            if "." in text or "e" in text or "E" in text:
+                append(("num", float(text)))
+            else:
+                append(("num", int(text)))
+        elif first.isalpha() or first == "_":
+            append(("name", text))
+        elif text in _OPERATORS:
+            append(("op", _OPERATORS[text]))
+        else:
+            raise SyntaxError(f"Caractère inattendu '{text}'")
+    return tokens
+
+
+class Parser:
+    """
+    Analyseur de Pratt pour la grammaire de la calculatrice.
+
+    Gère la précédence usuelle, l'associativité à droite de la puissance,
+    le moins unaire, la multiplication implicite (``2pi``, ``3(1+2)``)
+    et les appels de fonction à plusieurs arguments.
+    """
+
+    def __init__(self, tokens: List[Token]):
+        # Sentinelle de fin pour éviter les tests de longueur à chaque jeton
+        self.tokens = tokens + [("end", None)]
+        self.position = 0
+        self.depth = 0
+        # Profondeur de l'arbre du dernier nœud produit
+        self.node_depth = 0
+
+    def parse(self) -> Node:
+        """Analyse l'ensemble des jetons et retourne l'arbre."""
+        if len(self.tokens) == 1:
+            raise SyntaxError("Expression vide")
+        node = self.expression(0)
+        kind, value = self.tokens[self.position]
+        if kind != "end":
+            raise SyntaxError(f"Jeton inattendu '{value}'")
+        return node
+
+    def expression(self, right_binding_power: int) -> Node:
+        """Analyse une sous-expression dont les opérateurs lient plus fort que le seuil."""
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise SyntaxError("Expression trop profondément imbriquée")
+
+        tokens = self.tokens
+        left = self._prefix()
+        left_depth = self.node_depth
+        while True:
+            kind, value = tokens[self.position]
+            if kind == "op":
+                binding_power = _BINDING_POWER.get(value)
+                if binding_power is None:
+                    if value != "(":
+                        break
+                    binding_power = _IMPLICIT_BINDING_POWER
+                    if binding_power <= right_binding_power:
+                        break
+                    # Multiplication implicite : 3(1+2)
+                    left = ("*", left, self.expression(binding_power))
+                    left_depth = self._deeper(left_depth)
+                    continue
+                if binding_power <= right_binding_power:
+                    break
+                self.position += 1
+                # La puissance est associative à droite
+                if value == "**":
+                    binding_power -= 1
+                left = (value, left, self.expression(binding_power))
+                left_depth = self._deeper(left_depth)
+            elif kind == "name":
+                # Multiplication implicite : 2pi, 3 sin(x)
+                if _IMPLICIT_BINDING_POWER <= right_binding_power:
+                    break
+                left = ("*", left, self.expression(_IMPLICIT_BINDING_POWER))
+                left_depth = self._deeper(left_depth)
+            else:
+                break
+
+        self.depth -= 1
+        self.node_depth = left_depth
+        return left
+
+    def _deeper(self, depth: int) -> int:
+        """Profondeur d'un nœud dont les enfants ont ``depth`` et node_depth."""
+        depth = max(depth, self.node_depth) + 1
+        if depth > MAX_DEPTH:
+            raise SyntaxError("Expression trop longue ou trop imbriquée")
+        return depth
+
+    def _prefix(self) -> Node:
+        kind, value = self.tokens[self.position]
+        self.position += 1
+        if kind == "num":
+            self.node_depth = 1
+            return ("num", value)
+        if kind == "name":
+            if self.tokens[self.position] == ("op", "("):
+                self.position += 1
+                return ("call", value, self._arguments())
+            self.node_depth = 1
+            return ("name", value)
+        if value == "(":
+            node = self.expression(0)
+            kind, value = self.tokens[self.position]
+            if value != ")":
+                raise SyntaxError(f"')' attendu au lieu de '{value or 'fin'}'")
+            self.position += 1
+            return node
+        if value == "-":
+            operand = self.expression(_UNARY_BINDING_POWER)
+            if operand[0] == "num":
+                return ("num", -operand[1])
+            self.node_depth = self._deeper(0)
+            return ("neg", operand)
+        if value == "+":
+            return self.expression(_UNARY_BINDING_POWER)
+        if kind == "end":
+            raise SyntaxError("Fin d'expression inattendue")
+        raise SyntaxError(f"Jeton inattendu '{value}'")
+
+    def _arguments(self) -> Tuple[Node, ...]:
+        if self.tokens[self.position] == ("op", ")"):
+            self.position += 1
+            self.node_depth = 1
+            return ()
+        arguments = []
+        depth = 0
+        while True:
+            arguments.append(self.expression(0))
+            depth = max(depth, self.node_depth)
+            kind, value = self.tokens[self.position]
+            self.position += 1
+            if value == ")":
+                self.node_depth = self._deeper(depth)
+                return tuple(arguments)
+            if value != ",":
+                raise SyntaxError(f"',' ou ')' attendu au lieu de '{value or 'fin'}'")
+
+
+@lru_cache(maxsize=1024)
+def parse(expression: str) -> Node:
+    """
+    Analyse une expression et retourne son arbre.
+
+    Les arbres étant immuables, les derniers résultats sont conservés en
+    cache : une expression déjà vue n'est pas ré-analysée.
+
+    Args:
+        expression: L'expression à analyser
+
+    Returns:
+        L'arbre de l'expression (tuples imbriqués)
+    """
+    return Parser(tokenize(expression)).parse()
+
+
+def resolve_name(name: str, namespace: Dict[str, Any]) -> Any:
+    """
+    Résout un nom (éventuellement pointé) dans l'espace de noms.
+
+    Les attributs commençant par '_' sont refusés pour empêcher l'accès
+    aux attributs internes des objets.
+
+    Args:
+        name: Le nom à résoudre
+        namespace: Les constantes, variables et fonctions disponibles
+
+    Returns:
+        La valeur associée au nom
+    """
+    head, _, rest = name.partition(".")
+    if head not in namespace or head.startswith("_"):
+        raise NameError(f"Nom inconnu: '{name}'")
+    value = namespace[head]
+    if rest:
+        for attribute in rest.split("."):
+            if attribute.startswith("_") or not hasattr(value, attribute):
+                raise NameError(f"Nom inconnu: '{name}'")
+            value = getattr(value, attribute)
+    return value
+
+
+def evaluate(
+    node: Node,
+    namespace: Dict[str, Any],
+    operators: Dict[str, Callable[[Any, Any], Any]] = BINARY_OPERATORS,
+) -> Any:
+    """
+    Évalue un arbre d'expression.
+
+    Args:
+        node: L'arbre produit par parse()
+        namespace: Les constantes, variables et fonctions disponibles
+        operators: Implémentation des opérateurs binaires (permet par
+            exemple de borner la puissance)
+
+    Returns:
+        Le résultat de l'évaluation
+    """
+    tag = node[0]
+    binary = operators.get(tag)
+    if binary is not None:
+        return binary(
+            evaluate(node[1], namespace, operators),
+            evaluate(node[2], namespace, operators),
+        )
+    if tag == "num":
+        return node[1]
+    if tag == "name":
+        return resolve_name(node[1], namespace)
+    if tag == "neg":
+        return -evaluate(node[1], namespace, operators)
+    function = resolve_name(node[1], namespace)
+    if not callable(function):
+        raise TypeError(f"'{node[1]}' n'est pas une fonction")
+    return function(*[evaluate(argument, namespace, operators) for argument in node[2]])
+
+
+def evaluate_expression(
+    expression: str,
+    namespace: Optional[Dict[str, Any]] = None,
+    operators: Dict[str, Callable[[Any, Any], Any]] = BINARY_OPERATORS,
+) -> Any:
+    """
+    Analyse puis évalue une expression.
+
+    Args:
+        expression: L'expression à évaluer
+        namespace: Les constantes, variables et fonctions disponibles
+        operators: Implémentation des opérateurs binaires
+
+    Returns:
+        Le résultat de l'évaluation
+    """
+    return evaluate(parse(expression), namespace or {}, operators)
+
+
+def _check_name(name: str) -> str:
+    """
+    Refuse les noms (ou attributs) commençant par '_' dans le code généré.
+
+    Un nom qui est un mot-clé Python (l'unité ``in``) est émis sous la
+    forme ``_kw_in`` : l'espace de noms d'évaluation doit le fournir.
+    """
+    if any(part.startswith("_") for part in name.split(".")):
+        raise NameError(f"Nom inconnu: '{name}'")
+    head, dot, rest = name.partition(".")
+    if keyword.iskeyword(head):
+        return f"_kw_{head}{dot}{rest}"
+    return name
+
+
+# Précédence des opérateurs dans le code Python généré
+_ATOM_PRECEDENCE = 100
+_NEG_PRECEDENCE = _UNARY_BINDING_POWER
+
+
+def _number_source(value: Any) -> Tuple[str, int]:
+    """Représentation Python d'un littéral (y compris inf et nan) et sa précédence."""
+    if isinstance(value, float) and value != value:
+        return "(1e999 - 1e999)", _ATOM_PRECEDENCE
+    if value in (float("inf"), float("-inf")):
+        return ("1e999", _ATOM_PRECEDENCE) if value > 0 else ("-1e999", _NEG_PRECEDENCE)
+    text = repr(value)
+    if text.startswith("-"):
+        return text, _NEG_PRECEDENCE
+    return text, _ATOM_PRECEDENCE
+
+
+def to_source(
+    node: Node,
+    shared: Optional[FrozenSet[Node]] = None,
+    power: Optional[str] = None,
+    number: Optional[str] = None,
+    helpers: FrozenSet[str] = frozenset(),
+) -> str:
+    """
+    Traduit un arbre en source Python équivalente.
+
+    Seules les parenthèses nécessaires sont émises, afin que les longues
+    chaînes d'opérations restent sous la limite d'imbrication du
+    compilateur Python. Les sous-arbres de ``shared`` ne sont calculés
+    qu'une fois : leur première occurrence est affectée à une variable
+    temporaire (``_t0``, ``_t1``...) via l'opérateur morse, les suivantes
+    la réutilisent.
+
+    Args:
+        node: L'arbre à traduire
+        shared: Sous-expressions communes à mutualiser
+        power: Nom de la fonction à appeler à la place de ``**``
+        number: Nom de la fonction appliquée au texte des littéraux
+            (``_mpf('0.1')``), pour les évaluer sans passer par un flottant
+        helpers: Fonctions internes (préfixées par '_', comme ``_series``)
+            que le code peut appeler
+
+    Returns:
+        Le code source de l'expression
+    """
+    temporaries: Dict[Node, str] = {}
+
+    def emit(node: Node, share: bool = True) -> Tuple[str, int]:
+        if share and shared and node in shared:
+            name = temporaries.get(node)
+            if name is not None:
+                return name, _ATOM_PRECEDENCE
+            name = temporaries[node] = f"_t{len(temporaries)}"
+            text = emit(node, share=False)[0]
+            return f"({name} := {text})", _ATOM_PRECEDENCE
+
+        tag = node[0]
+        if tag == "num":
+            if number:
+                return f"{number}('{node[1]!r}')", _ATOM_PRECEDENCE
+            return _number_source(node[1])
+        if tag == "name":
+            return _check_name(node[1]), _ATOM_PRECEDENCE
+        if tag == "call":
+            arguments = ", ".join(emit(argument)[0] for argument in node[2])
+            name = node[1] if node[1] in helpers else _check_name(node[1])
+            return f"{name}({arguments})", _ATOM_PRECEDENCE
+        if tag == "neg":
+            text, child = emit(node[1])
+            if child < _NEG_PRECEDENCE:
+                text = f"({text})"
+            return f"-{text}", _NEG_PRECEDENCE
+
+        left, left_precedence = emit(node[1])
+        right, right_precedence = emit(node[2])
+        if tag == "**":
+            if power:
+                return f"{power}({left}, {right})", _ATOM_PRECEDENCE
+            # Associative à droite : l'opérande gauche doit lier plus fort
+            precedence = _BINDING_POWER["**"]
+            if left_precedence <= precedence:
+                left = f"({left})"
+            if right_precedence < _NEG_PRECEDENCE:
+                right = f"({right})"
+            return f"{left} ** {right}", precedence
+
+        precedence = _BINDING_POWER[tag]
+        if left_precedence < precedence:
+            left = f"({left})"
+        if right_precedence <= precedence:
+            right = f"({right})"
+        return f"{left} {tag} {right}", precedence
+
+    return emit(node)[0]
+
+
+def format_tree(node: Node, indent: str = "") -> str:
+    """
+    Représentation indentée d'un arbre, un nœud par ligne.
+
+    Args:
+        node: L'arbre à représenter
+        indent: Préfixe de la ligne courante
+
+    Returns:
+        Le texte de l'arbre
+    """
+    tag = node[0]
+    if tag in ("num", "name"):
+        return f"{indent}{node[1]!r}" if tag == "num" else f"{indent}{node[1]}"
+    if tag == "call":
+        children = node[2]
+        label = f"{node[1]}()"
+    else:
+        children = node[1:]
+        label = "neg" if tag == "neg" else tag
+    lines = [f"{indent}{label}"]
+    lines.extend(format_tree(child, indent + "  ") for child in children)
+    return "\n".join(lines)
@@ -0,0 +1,384 @@
+"""
+Registre des fonctions et constantes disponibles dans les expressions.
+
+Chaque fonction déclare une implémentation scalaire (``math``) et,
+si possible, une implémentation vectorisée (ufunc NumPy), une
+implémentation en haute précision (mpmath, importé à la demande), une
+implémentation sur les jets de la différentiation automatique et des
+implémentations complexes (cmath, numpy.emath). Les fonctions
+trigonométriques déclarent en plus la façon dont elles dépendent du mode
+d'angle. Les espaces de noms sont construits une seule fois par mode
+d'angle et par implémentation, puis réutilisés jusqu'à la prochaine
+modification du registre.
+"""
+
+import cmath
+import hashlib
+import math
+import threading
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+
+from models import autodiff
+
+ANGLE_MODES = ("DEG", "RAD", "GRAD")
+
+# Implémentation utilisée lorsqu'une fonction n'en déclare pas pour un backend
+_FALLBACK_BACKENDS = {"complex_vector": "vector"}
+
+
+def _describe(implementation: Any) -> str:
+    """Nom qualifié d'une implémentation (identique d'un processus à l'autre)."""
+    if implementation is None or isinstance(implementation, str):
+        return implementation or ""
+    module = getattr(implementation, "__module__", None) or ""
+    name = getattr(implementation, "__qualname__", None) or getattr(
+        implementation, "__name__", type(implementation).__name__
+    )
+    return f"{module}.{name}"
+
+
+# Facteurs de conversion vers les radians (entrée) et depuis les radians (sortie)
+_TO_RADIANS = {"DEG": math.pi / 180, "GRAD": math.pi / 200}
+_FROM_RADIANS = {"DEG": 180 / math.pi, "GRAD": 200 / math.pi}
+
+
+def _angle_input(func: Callable, mode: str) -> Callable:
+    """Convertit l'argument de la fonction (sin, cos, tan) en radians."""
+    factor = _TO_RADIANS.get(mode)
+    if factor is None:
+        return func
+    return lambda x: func(x * factor)
+
+
+def _angle_output(func: Callable, mode: str) -> Callable:
+    """Convertit le résultat de la fonction (asin, acos, atan) depuis les radians."""
+    factor = _FROM_RADIANS.get(mode)
+    if factor is None:
+        return func
+    return lambda x: func(x) * factor
+
+
+# Demi-tour exprimé dans l'unité du mode d'angle (pi radians)
+_HALF_TURN = {"DEG": 180, "GRAD": 200}
+
+
+def _precise_angle_input(func: Callable, mode: str) -> Callable:
+    """Comme _angle_input, avec pi calculé à la précision courante de mpmath."""
+    import mpmath
+
+    half_turn = _HALF_TURN.get(mode)
+    if half_turn is None:
+        return func
+    return lambda x: func(x * mpmath.pi / half_turn)
+
+
+def _precise_angle_output(func: Callable, mode: str) -> Callable:
+    """Comme _angle_output, avec pi calculé à la précision courante de mpmath."""
+    import mpmath
+
+    half_turn = _HALF_TURN.get(mode)
+    if half_turn is None:
+        return func
+    return lambda x: func(x) * half_turn / mpmath.pi
+
+
+def _resolve_precise(implementation: Union[str, Callable, Any]) -> Any:
+    """Résout un nom d'attribut de mpmath ("sin", "pi"...) en son objet."""
+    if isinstance(implementation, str):
+        import mpmath
+
+        return getattr(mpmath, implementation)
+    return implementation
+
+
+class FunctionRegistry:
+    """
+    Registre des fonctions (scalaires et vectorisées) et des constantes.
+
+    Attributes:
+        version: Incrémentée à chaque modification ; permet aux modèles
+            d'invalider leurs caches dépendant du registre
+    """
+
+    def __init__(self):
+        self._functions: Dict[str, Dict[str, Any]] = {}
+        self._constants: Dict[str, Any] = {}
+        self._namespaces: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def register(
+        self,
+        name: str,
+        scalar: Callable,
+        vector: Optional[Callable] = None,
+        angle: Optional[str] = None,
+        precise: Optional[Union[str, Callable]] = None,
+        jet: Optional[Callable] = None,
+        complex_scalar: Optional[Callable] = None,
+        complex_vector: Optional[Callable] = None,
+    ):
+        """
+        Enregistre (ou remplace) une fonction.
+
+        Args:
+            name: Nom utilisé dans les expressions
+            scalar: Implémentation sur des nombres
+            vector: Implémentation sur des tableaux NumPy (par défaut,
+                np.vectorize de l'implémentation scalaire)
+            angle: "input" si l'argument est un angle, "output" si le
+                résultat en est un, None sinon
+            precise: Implémentation en haute précision, ou nom d'une
+                fonction de mpmath (par défaut, l'implémentation scalaire)
+            jet: Implémentation sur les autodiff.Jet (dérivation
+                automatique) ; sans elle, la fonction n'est pas dérivable
+            complex_scalar: Implémentation sur les complexes (par défaut,
+                l'implémentation scalaire)
+            complex_vector: Implémentation sur des tableaux complexes (par
+                défaut, l'implémentation vectorisée)
+        """
+        if not name.isidentifier() or name.startswith("_"):
+            raise ValueError(f"Nom de fonction invalide: '{name}'")
+        if angle not in (None, "input", "output"):
+            raise ValueError("angle doit valoir None, 'input' ou 'output'")
+        if vector is None:
+            vector = np.vectorize(scalar, otypes=[float])
+        with self._lock:
+            self._constants.pop(name, None)
+            self._functions[name] = {
+                "scalar": scalar,
+                "vector": vector,
+                "precise": precise,
+                "jet": jet,
+                "complex": complex_scalar,
+                "complex_vector": complex_vector,
+                "angle": angle,
+            }
+            self._invalidate()
+
+    def register_constant(
+        self, name: str, value: Any, precise: Optional[Union[str, Any]] = None
+    ):
+        """
+        Enregistre (ou remplace) une constante.
+
+        Args:
+            name: Nom utilisé dans les expressions
+            value: Valeur de la constante
+            precise: Valeur en haute précision, ou nom d'une constante de
+                mpmath (par défaut, la valeur)
+        """
+        if not name.isidentifier() or name.startswith("_"):
+            raise ValueError(f"Nom de constante invalide: '{name}'")
+        with self._lock:
+            self._functions.pop(name, None)
+            self._constants[name] = (value, precise)
+            self._invalidate()
+
+    def unregister(self, name: str):
+        """Retire une fonction ou une constante du registre."""
+        with self._lock:
+            if self._functions.pop(name, None) is None:
+                if self._constants.pop(name, None) is None:
+                    raise KeyError(name)
+            self._invalidate()
+
+    def _invalidate(self):
+        self._namespaces = {}
+        self.version += 1
+
+    def names(self):
+        """Retourne les noms des fonctions et constantes enregistrées."""
+        return sorted(list(self._functions) + list(self._constants))
+
+    def fingerprint(self) -> str:
+        """
+        Empreinte du contenu du registre (noms, implémentations, constantes).
+
+        Contrairement à ``version``, elle est identique d'un processus à
+        l'autre tant que le registre contient les mêmes fonctions : elle
+        permet de valider un cache sauvegardé sur disque.
+
+        Returns:
+            L'empreinte, en hexadécimal
+        """
+        with self._lock:
+            lines = [
+                f"{name}:" + ",".join(f"{key}={_describe(spec[key])}" for key in spec)
+                for name, spec in sorted(self._functions.items())
+            ]
+            lines += [
+                f"{name}={value!r}" for name, value in sorted(self._constants.items())
+            ]
+        return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+    def namespace(
+        self, angle_mode: str = "RAD", backend: str = "scalar"
+    ) -> Dict[str, Any]:
+        """
+        Retourne l'espace de noms prêt à l'emploi pour un mode d'angle.
+
+        Le dictionnaire retourné est partagé : il ne doit pas être modifié
+        (le copier avant d'y ajouter des variables).
+
+        Args:
+            angle_mode: DEG, RAD ou GRAD
+            backend: "scalar" (math), "vector" (NumPy), "precise" (mpmath),
+                "jet" (dérivation automatique), "complex" (cmath) ou
+                "complex_vector" (NumPy sur des complexes)
+
+        Returns:
+            Dictionnaire nom -> fonction ou constante
+        """
+        key = (angle_mode, backend)
+        namespace = self._namespaces.get(key)
+        if namespace is None:
+            version = self.version
+            namespace = self._build(angle_mode, backend)
+            with self._lock:
+                # Registre modifié pendant la construction : pas mis en cache
+                if self.version == version:
+                    self._namespaces[key] = namespace
+        return namespace
+
+    def _build(self, angle_mode: str, backend: str) -> Dict[str, Any]:
+        if angle_mode not in ANGLE_MODES:
+            raise ValueError(f"Mode d'angle non reconnu: '{angle_mode}'")
+        precise = backend == "precise"
+        namespace = {
+            name: _resolve_precise(value[1]) if precise and value[1] else value[0]
+            for name, value in list(self._constants.items())
+        }
+        angle_input = _precise_angle_input if precise else _angle_input
+        angle_output = _precise_angle_output if precise else _angle_output
+        fallback = _FALLBACK_BACKENDS.get(backend, "scalar")
+        for name, spec in list(self._functions.items()):
+            func = spec.get(backend) or spec.get(fallback) or spec["scalar"]
+            func = _resolve_precise(func)
+            if spec["angle"] == "input":
+                func = angle_input(func, angle_mode)
+            elif spec["angle"] == "output":
+                func = angle_output(func, angle_mode)
+            namespace[name] = func
+        return namespace
+
+
+def _create_default_registry() -> FunctionRegistry:
+    registry = FunctionRegistry()
+    register = registry.register
+    emath = np.emath
+    register(
+        "sin",
+        math.sin,
+        np.sin,
+        angle="input",
+        precise="sin",
+        jet=autodiff.sin,
+        complex_scalar=cmath.sin,
+    )
+    register(
+        "cos",
+        math.cos,
+        np.cos,
+        angle="input",
+        precise="cos",
+        jet=autodiff.cos,
+        complex_scalar=cmath.cos,
+    )
+    register(
+        "tan",
+        math.tan,
+        np.tan,
+        angle="input",
+        precise="tan",
+        jet=autodiff.tan,
+        complex_scalar=cmath.tan,
+    )
+    register(
+        "asin",
+        math.asin,
+        np.arcsin,
+        angle="output",
+        precise="asin",
+        jet=autodiff.asin,
+        complex_scalar=cmath.asin,
+        complex_vector=emath.arcsin,
+    )
+    register(
+        "acos",
+        math.acos,
+        np.arccos,
+        angle="output",
+        precise="acos",
+        jet=autodiff.acos,
+        complex_scalar=cmath.acos,
+        complex_vector=emath.arccos,
+    )
+    register(
+        "atan",
+        math.atan,
+        np.arctan,
+        angle="output",
+        precise="atan",
+        jet=autodiff.atan,
+        complex_scalar=cmath.atan,
+    )
+    register(
+        "sqrt",
+        math.sqrt,
+        np.sqrt,
+        precise="sqrt",
+        jet=autodiff.sqrt,
+        complex_scalar=cmath.sqrt,
+        complex_vector=emath.sqrt,
+    )
+    register(
+        "log",
+        math.log10,
+        np.log10,
+        precise="log10",
+        jet=autodiff.log10,
+        complex_scalar=cmath.log10,
+        complex_vector=emath.log10,
+    )
+    register(
+        "ln",
+        math.log,
+        np.log,
+        precise="ln",
+        jet=autodiff.log,
+        complex_scalar=cmath.log,
+        complex_vector=emath.log,
+    )
+    register(
+        "exp",
+        math.exp,
+        np.exp,
+        precise="exp",
+        jet=autodiff.exp,
+        complex_scalar=cmath.exp,
+    )
+    register("abs", abs, np.abs, jet=autodiff.absolute)
+    register("round", round, np.round)
+    register("int", int, np.trunc)
+    register("float", float, np.asarray)
+    register(
+        "radians", math.radians, np.radians, precise="radians", jet=autodiff.radians
+    )
+    register(
+        "degrees", math.degrees, np.degrees, precise="degrees", jet=autodiff.degrees
+    )
+    # Parties et argument d'un nombre complexe (circuits en régime sinusoïdal)
+    register("re", lambda z: z.real, np.real, precise="re")
+    register("im", lambda z: z.imag, np.imag, precise="im")
+    register("conj", lambda z: z.conjugate(), np.conj, precise="conj")
+    register("arg", cmath.phase, np.angle, angle="output", precise="arg")
+    registry.register_constant("pi", math.pi, precise="pi")
+    registry.register_constant("e", math.e, precise="e")
+    return registry
+
+
+# Registre partagé par la calculatrice, le moteur scientifique et les tracés
+default_registry = _create_default_registry()
@@ -0,0 +1,112 @@
+"""
+Détection des résultats flottants peu fiables du moteur scientifique.
+
+Le calcul se fait d'abord en flottants double précision. Il est repris en
+haute précision (mpmath) lorsque le résultat déborde, n'est pas fini, ou
+lorsqu'une addition/soustraction a annulé la plupart des chiffres
+significatifs de ses opérandes (expression mal conditionnée, par exemple
+``(1e16 + 1) - 1e16``). Les entiers exacts trop longs pour être écrits en
+décimal sont eux aussi signalés (voir exceeds_str_digits).
+"""
+
+import math
+import sys
+from typing import Any, Callable, Dict
+
+# Nombre de chiffres significatifs utilisés lors d'une bascule automatique
+DEFAULT_DIGITS = 50
+
+# Bits significatifs perdus (sur 53) à partir desquels une addition ou une
+# soustraction est considérée comme une annulation catastrophique
+CANCELLATION_BITS = 26
+
+
+def cancels(left: Any, right: Any, result: Any) -> bool:
+    """
+    Indique si ``result = left ± right`` a perdu trop de chiffres significatifs.
+
+    Seuls les flottants sont concernés : les entiers sont exacts.
+
+    Args:
+        left: Opérande gauche
+        right: Opérande droit
+        result: Résultat de l'addition ou de la soustraction
+
+    Returns:
+        True si le résultat est très petit devant les opérandes
+    """
+    if type(result) is not float or not (type(left) is float or type(right) is float):
+        return False
+    magnitude = max(abs(left), abs(right))
+    if magnitude == 0 or not math.isfinite(magnitude):
+        return False
+    return abs(result) < math.ldexp(magnitude, -CANCELLATION_BITS)
+
+
+class CancellationProbe:
+    """
+    Opérateurs binaires qui signalent les annulations catastrophiques.
+
+    Utilisés avec expression_parser.evaluate pour décider si une expression
+    doit être calculée en haute précision. Un résultat nul n'est une
+    annulation que si une addition ou soustraction précédente a arrondi son
+    résultat : ``x - y`` avec x == y est exact.
+
+    Args:
+        operators: Opérateurs de base (par exemple ceux du budget)
+
+    Attributes:
+        cancelled: True si une annulation a été observée
+        rounded: True si une addition ou soustraction a arrondi son résultat
+    """
+
+    def __init__(self, operators: Dict[str, Callable[[Any, Any], Any]]):
+        self.cancelled = False
+        self.rounded = False
+        self.operators = dict(operators)
+        for symbol, sign in (("+", 1), ("-", -1)):
+            self.operators[symbol] = self._checked(operators[symbol], sign)
+
+    def _checked(self, operation: Callable[[Any, Any], Any], sign: int) -> Callable:
+        def checked(left, right):
+            result = operation(left, right)
+            if self.cancelled or type(result) is not float:
+                return result
+            if not self.rounded and math.isfinite(result):
+                # Somme exacte des opérandes et du résultat : nulle sans arrondi
+                try:
+                    self.rounded = math.fsum((left, sign * right, -result)) != 0
+                except (TypeError, OverflowError):
+                    self.rounded = True
+            if cancels(left, right, result) and (result != 0 or self.rounded):
+                self.cancelled = True
+            return result
+
+        return checked
+
+
+def exceeds_str_digits(value: int) -> bool:
+    """
+    Indique si un entier a trop de chiffres pour être écrit en décimal.
+
+    Au-delà de sys.get_int_max_str_digits() (Python 3.11+), str et repr
+    lèvent ValueError : le résultat doit alors être affiché autrement.
+
+    Args:
+        value: Entier à écrire
+
+    Returns:
+        True si str(value) échouerait
+    """
+    limit = getattr(sys, "get_int_max_str_digits", lambda: 0)()
+    # 10**limit compte environ 3.32 * limit bits : test exact seulement au-delà
+    return limit > 0 and value.bit_length() > 3 * limit and abs(value) >= 10**limit
+
+
+def is_unreliable_float(result: Any) -> bool:
+    """Indique si un résultat flottant (ou complexe) est infini ou NaN."""
+    if isinstance(result, float):
+        return not math.isfinite(result)
+    if isinstance(result, complex):
+        return not (math.isfinite(result.real) and math.isfinite(result.imag))
+    return False
@@ -1,5 +1,101 @@
+import keyword
 import math
-from typing import Dict, Optional, List
+import re
+import threading
+import time
+import types
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, List, Tuple, Union
+
+import numpy as np
+
+from models import autodiff, cache_snapshot
+from models.evaluation_budget import BudgetExceededError, EvaluationBudget
+from models.expression_parser import evaluate, format_tree, parse, to_source
+from models.function_registry import FunctionRegistry, default_registry
+from models.expression_optimizer import (
+    count_nodes,
+    find_common_subexpressions,
+    fold_constants,
+)
+from models.precision import (
+    DEFAULT_DIGITS,
+    CancellationProbe,
+    exceeds_str_digits,
+    is_unreliable_float,
+)
+from models.series import SERIES_HELPER, SeriesSpec, evaluate_series, lower_series
+from models.units import (
+    DIMENSIONLESS,
+    UNITS,
+    Quantity,
+    has_quantities,
+    normalize_units,
+    split_conversion,
+)
+
+# Espaces entourant un opérateur ou une ponctuation (supprimés à la normalisation)
+_SPACES_AROUND_SYMBOLS = re.compile(r"\s*([^\w\s.])\s*")
+_SPACES = re.compile(r"\s+")
+
+# Espaces de noms utilisés à la place des espaces réels en mode complexe
+_COMPLEX_BACKENDS = {
+    "scalar": "complex",
+    "vector": "complex_vector",
+    "precise": "complex_precise",
+    "units": "complex_units",
+}
+
+# Unités des grandeurs, y compris sous le nom des mots-clés Python (unité
+# "in", voir to_source)
+_UNIT_NAMESPACE = dict(UNITS)
+_UNIT_NAMESPACE.update(
+    (f"_kw_{name}", value) for name, value in UNITS.items() if keyword.iskeyword(name)
+)
+
+# Modes d'une évaluation (angle, réel ou complexe, version du registre) et
+# espaces de noms correspondants, construits à la première utilisation. Un
+# contexte n'est jamais modifié : changer de mode en installe un autre, si
+# bien qu'une évaluation en cours garde les modes de son début (voir
+# ScientificModel._pin_context)
+EvaluationContext = namedtuple(
+    "EvaluationContext",
+    ["angle_mode", "complex_mode", "registry_version", "namespaces"],
+)
+
+# Absence de résultat mémorisé (None pourrait être un résultat)
+_MISSING = object()
+
+# Entrée du cache : arbre analysé, arbre optimisé, sous-expressions
+# communes, source Python générée, objet code compilé et sommes/produits
+# indicés (voir series.lower_series)
+CompiledExpression = namedtuple(
+    "CompiledExpression", ["tree", "optimized", "shared", "source", "code", "series"]
+)
+
+
+def _is_number(value: Any) -> bool:
+    """Indique si une valeur de variable est un nombre (booléens exclus)."""
+    return isinstance(value, (int, float, complex, np.number)) and not isinstance(
+        value, bool
+    )
+
+
+def _is_result(value: Any) -> bool:
+    """Indique si un résultat d'évaluation scalaire est numérique."""
+    return (
+        _is_number(value)
+        or isinstance(value, (bool, Quantity))
+        or type(value).__module__.startswith("mpmath")
+    )
+
+
+def _error_message(error: Exception) -> str:
+    """Message d'une erreur d'évaluation (ZeroDivisionError de mpmath : vide)."""
+    if isinstance(error, ZeroDivisionError):
+        return "Division par zéro"
+    return str(error)
 
 
 class ScientificModel:
@@ -8,55 +104,515 @@ class ScientificModel:
     Gère les calculs mathématiques avancés.
     """
 
-    def __init__(self):
+    # Nombre maximal d'expressions compilées conservées en cache (LRU)
+    COMPILED_CACHE_SIZE = 2048
+
+    # Instantané du cache d'expressions compilées (voir save_cache)
+    CACHE_FILE = "expression_cache.bin"
+
+    # Nombre maximal de résultats mémorisés (0 pour désactiver la mémoïsation)
+    RESULT_CACHE_SIZE = 1024
+
+    # Chiffres significatifs utilisés quand un résultat flottant est peu fiable
+    PRECISION_DIGITS = DEFAULT_DIGITS
+
+    def __init__(
+        self,
+        cache_size: Optional[int] = None,
+        budget: Optional[EvaluationBudget] = None,
+        registry: Optional[FunctionRegistry] = None,
+        precision_digits: Optional[int] = None,
+        result_cache_size: Optional[int] = None,
+        result_ttl: Optional[float] = None,
+    ):
+        # Ajouts atomiques (list.append) : sans verrou entre threads
         self.history = []
         self.memory = 0.0
-        self.angle_mode = "DEG"  # DEG, RAD, GRAD
+
+        # Limites de ressources appliquées à chaque évaluation
+        self.budget = budget or EvaluationBudget()
+
+        # Fonctions disponibles ; les contextes (modes et espaces de noms)
+        # sont construits une fois par mode et reconstruits si le registre
+        # change
+        self.registry = registry or default_registry
+        self._contexts: Dict[tuple, EvaluationContext] = {}
+        self._mode_lock = threading.Lock()
+        # Mode d'angle DEG ; mode complexe (sqrt(-1), ln(-2)... définis, voir
+        # set_complex_mode) désactivé
+        self._active = self._new_context("DEG", False)
+        # Contexte figé par l'évaluation en cours, propre à chaque thread
+        self._local = threading.local()
+
+        # Cache LRU des expressions compilées, indexé par l'expression
+        # normalisée, le mode d'angle, les noms de variables et la version
+        # du registre
+        self.cache_size = cache_size or self.COMPILED_CACHE_SIZE
+        self._compiled_cache: "OrderedDict[tuple, CompiledExpression]" = OrderedDict()
+        # Protège ce cache et _needs_precision (partagés entre threads)
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
+        # Expressions sans variables sondées sans annulation (même clé que le
+        # cache) ; avec des variables, le résultat dépend de leurs valeurs
+        self.precision_digits = precision_digits or self.PRECISION_DIGITS
+        self._needs_precision: "OrderedDict[tuple, bool]" = OrderedDict()
+        self.precision_escalations = 0
+
+        # Résultats mémorisés (LRU, durée de vie optionnelle en secondes),
+        # indexés par l'expression, les valeurs des variables, le mode
+        # d'angle, le mode complexe et la version du registre
+        if result_cache_size is None:
+            result_cache_size = self.RESULT_CACHE_SIZE
+        self.result_cache_size = result_cache_size
+        self.result_ttl = result_ttl
+        self._results: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._results_lock = threading.Lock()
+        self.result_hits = 0
+        self.result_misses = 0
+        self.result_expirations = 0
+        self.result_evictions = 0
 
     def evaluate_expression(
-        self, expression: str, variables: Optional[Dict[str, float]] = None
-    ) -> float:
+        self,
+        expression: str,
+        variables: Optional[Dict[str, float]] = None,
+        digits: Optional[int] = None,
+    ) -> Union[float, int, np.ndarray, Any]:
         """
         Évalue une expression mathématique.
 
+        Si une variable est un tableau NumPy, l'expression est évaluée une
+        seule fois en mode tableau (voir evaluate_array).
+
+        Les unités de ConversionModel (``5 km + 300 m``) produisent des
+        grandeurs (units.Quantity), qu'un suffixe ``to``/``in`` convertit.
+        Elles ne sont connues que si l'expression écrit une grandeur (un
+        nombre suivi d'une unité) ou a un tel suffixe.
+
+        Le calcul se fait en flottants ; il est repris en haute précision
+        (voir evaluate_precise) si le résultat déborde, n'est pas fini ou
+        si l'expression est mal conditionnée. Un entier trop grand pour un
+        flottant est retourné exactement.
+
+        Les résultats sont mémorisés : une requête identique (expression,
+        valeurs des variables, mode d'angle) ne réévalue pas l'expression
+        (voir get_result_cache_stats).
+
+        Les modes (angle, complexe) sont lus une fois, au début de l'appel :
+        un autre thread qui les change n'affecte pas un calcul en cours.
+
         Args:
             expression: L'expression à évaluer
             variables: Dictionnaire des variables et leurs valeurs
+            digits: Nombre de chiffres significatifs demandés (force le
+                calcul en haute précision)
 
         Returns:
-            Le résultat de l'évaluation
+            Le résultat de l'évaluation (float, int exact, ou mpf de mpmath
+            après une bascule en haute précision)
         """
+        self.validate_variables(variables)
+        if variables and any(
+            isinstance(value, (np.ndarray, list, tuple)) for value in variables.values()
+        ):
+            return self.evaluate_array(expression, variables)
+
+        outer = self._pin_context()
         try:
-            # Crée un espace de noms sécurisé pour l'évaluation
-            safe_dict = {
-                "__builtins__": None,
-                "math": math,
-                "sin": self._wrap_angle_math(math.sin),
-                "cos": self._wrap_angle_math(math.cos),
-                "tan": self._wrap_angle_math(math.tan),
-                "asin": self._wrap_angle_math(math.asin, inverse=True),
-                "acos": self._wrap_angle_math(math.acos, inverse=True),
-                "atan": self._wrap_angle_math(math.atan, inverse=True),
-                "sqrt": math.sqrt,
-                "log": math.log10,
-                "ln": math.log,
-                "exp": math.exp,
-                "pi": math.pi,
-                "e": math.e,
-                "abs": abs,
-                "round": round,
-                "int": int,
-                "float": float,
-            }
+            result = self._evaluate_memoized(expression, variables, digits)
+            self.add_history(expression, result, variables)
+            return self._public_result(result)
+
+        except BudgetExceededError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Erreur d'évaluation: {_error_message(e)}")
+        finally:
+            self._unpin_context(outer)
 
-            # Ajoute les variables à l'espace de noms
-            if variables:
-                safe_dict.update(variables)
+    def evaluate_batch(
+        self,
+        items: Iterable[Tuple[str, Optional[Dict[str, Any]]]],
+        digits: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Évalue une série d'expressions en un seul appel.
 
-            # Évalue l'expression de manière sécurisée
-            result = eval(expression, {"__builtins__": None}, safe_dict)
+        Toutes les expressions sont évaluées dans les mêmes modes (ceux du
+        début de l'appel) et profitent du cache d'expressions compilées et
+        des résultats mémorisés : une expression répétée avec d'autres
+        valeurs de variables n'est compilée qu'une fois. Une erreur ne
+        concerne que son expression ; l'historique n'est pas modifié.
+
+        Args:
+            items: Couples (expression, variables ou None)
+            digits: Nombre de chiffres significatifs demandés (force le
+                calcul en haute précision)
+
+        Returns:
+            Pour chaque expression, dans l'ordre, ``{"result": ...}`` ou
+            ``{"error": "..."}``
+        """
+        results = []
+        outer = self._pin_context()
+        try:
+            for expression, variables in items:
+                try:
+                    self.validate_variables(variables)
+                    if variables and any(
+                        isinstance(value, (np.ndarray, list, tuple))
+                        for value in variables.values()
+                    ):
+                        result = self._evaluate_vectorized(expression, variables)
+                    else:
+                        result = self._public_result(
+                            self._evaluate_memoized(expression, variables, digits)
+                        )
+                except BudgetExceededError as e:
+                    results.append({"error": str(e)})
+                except Exception as e:
+                    message = _error_message(e)
+                    results.append({"error": f"Erreur d'évaluation: {message}"})
+                else:
+                    results.append({"result": result})
+        finally:
+            self._unpin_context(outer)
+        return results
+
+    def _evaluate_memoized(self, expression: str, variables, digits):
+        """Évalue une expression scalaire, en réutilisant un résultat mémorisé."""
+        key = self._result_key(expression, variables, digits)
+        result = self._recall_result(key)
+        if result is _MISSING:
+            # Suffixe de conversion d'unités : "2 h * 90 km/h to km"
+            source, target = split_conversion(expression)
+            if digits is not None:
+                result = self._evaluate_precise(source, variables, digits)
+            elif target is not None or has_quantities(source):
+                result = self._evaluate_adaptive(source, variables, "units")
+            else:
+                result = self._evaluate_adaptive(source, variables)
+            if target is not None:
+                result = self._convert_units(result, target)
+            if not _is_result(result):
+                # Fonction ou module nommé seul ("sin", "math")
+                raise ValueError("Le résultat n'est pas un nombre")
+            self._memorize_result(key, result)
+        return result
+
+    @staticmethod
+    def validate_variables(variables: Optional[Dict[str, Any]]):
+        """
+        Vérifie que les variables d'une évaluation sont des nombres.
+
+        Chaque valeur doit être un nombre (int, float ou complex, booléens
+        exclus) ou, pour l'évaluation sur des tableaux, une liste plate ou
+        un tableau NumPy de nombres.
+
+        Args:
+            variables: Dictionnaire des variables et leurs valeurs (ou None)
+
+        Raises:
+            ValueError: Si une valeur n'est pas numérique
+        """
+        if variables is None:
+            return
+        if not isinstance(variables, dict):
+            raise ValueError("Les variables doivent être un dictionnaire")
+        for name, value in variables.items():
+            if isinstance(value, np.ndarray):
+                valid = value.dtype.kind in "iufc"
+            elif isinstance(value, (list, tuple)):
+                valid = all(_is_number(item) for item in value)
+            else:
+                valid = _is_number(value)
+            if not valid:
+                raise ValueError(f"Valeur non numérique pour la variable '{name}'")
+
+    @staticmethod
+    def _public_result(result: Any) -> Any:
+        """Type du résultat retourné à l'appelant (float sauf cas exacts)."""
+        if type(result) is int and result.bit_length() > 53:
+            # Trop grand pour être représenté exactement en flottant
+            return result
+        if isinstance(result, (int, float)):
+            return float(result)
+        if isinstance(result, complex) and result.imag == 0:
+            # Résultat réel d'un calcul complexe
+            return result.real
+        return result
+
+    def fork(self) -> "ScientificModel":
+        """
+        Crée un modèle à l'état neuf (historique, mémoire, modes) qui
+        partage les caches de celui-ci.
+
+        Les clés des caches portent le mode d'angle, le mode complexe et la
+        version du registre : plusieurs modèles (une session web chacun)
+        peuvent donc profiter des mêmes expressions compilées et résultats
+        mémorisés, y compris depuis des threads différents (les caches sont
+        protégés par des verrous partagés). Les compteurs de statistiques
+        restent propres à chaque modèle.
+
+        Returns:
+            Le nouveau modèle
+        """
+        model = ScientificModel(
+            cache_size=self.cache_size,
+            budget=self.budget,
+            registry=self.registry,
+            precision_digits=self.precision_digits,
+            result_cache_size=self.result_cache_size,
+            result_ttl=self.result_ttl,
+        )
+        model._contexts = self._contexts
+        model._compiled_cache = self._compiled_cache
+        model._needs_precision = self._needs_precision
+        model._cache_lock = self._cache_lock
+        model._results = self._results
+        model._results_lock = self._results_lock
+        return model
+
+    @property
+    def angle_mode(self) -> str:
+        """Mode d'angle courant : DEG, RAD ou GRAD (voir set_angle_mode)."""
+        return self._active.angle_mode
+
+    @property
+    def complex_mode(self) -> bool:
+        """True si le mode complexe est actif (voir set_complex_mode)."""
+        return self._active.complex_mode
+
+    def _new_context(self, angle_mode: str, complex_mode: bool) -> EvaluationContext:
+        """Contexte des modes donnés pour la version courante du registre."""
+        version = self.registry.version
+        key = (angle_mode, complex_mode, version)
+        context = self._contexts.get(key)
+        if context is None:
+            if any(other[2] != version for other in list(self._contexts)):
+                # Registre modifié : les contextes précédents sont périmés
+                self._contexts.clear()
+            context = self._contexts.setdefault(
+                key, EvaluationContext(angle_mode, complex_mode, version, {})
+            )
+        return context
+
+    def _context(self) -> EvaluationContext:
+        """
+        Contexte de l'évaluation en cours sur ce thread, ou à défaut celui
+        des modes courants.
+        """
+        context = getattr(self._local, "context", None)
+        if context is None:
+            context = self._active
+            if context.registry_version != self.registry.version:
+                with self._mode_lock:
+                    self._active = self._new_context(
+                        self._active.angle_mode, self._active.complex_mode
+                    )
+                    context = self._active
+        return context
+
+    def _pin_context(self) -> Optional[EvaluationContext]:
+        """
+        Fige les modes pour l'évaluation qui commence sur ce thread.
+
+        Returns:
+            Le contexte précédent (évaluation englobante), à rendre à
+            _unpin_context()
+        """
+        previous = getattr(self._local, "context", None)
+        self._local.context = self._context()
+        return previous
+
+    def _unpin_context(self, previous: Optional[EvaluationContext] = None):
+        """Libère les modes figés (ou restaure ceux d'une évaluation englobante)."""
+        self._local.context = previous
+
+    def _result_key(
+        self, expression: str, variables: Optional[Dict[str, Any]], digits
+    ) -> Optional[tuple]:
+        """Clé de mémoïsation d'un résultat (None s'il ne peut être mémorisé)."""
+        if not self.result_cache_size:
+            return None
+        try:
+            # Le type distingue 2**60 (exact) de 2.0**60
+            bindings = frozenset(
+                (name, type(value), value) for name, value in (variables or {}).items()
+            )
+            hash(bindings)
+        except TypeError:
+            return None
+        context = self._context()
+        return (
+            self.normalize_expression(expression),
+            bindings,
+            context.angle_mode,
+            context.complex_mode,
+            context.registry_version,
+            digits,
+            self.precision_digits,
+        )
+
+    def _recall_result(self, key: Optional[tuple]) -> Any:
+        """Retourne le résultat mémorisé pour la clé, ou _MISSING."""
+        if key is None:
+            return _MISSING
+        with self._results_lock:
+            entry = self._results.get(key)
+            if entry is None:
+                self.result_misses += 1
+                return _MISSING
+            result, expires = entry
+            if expires is not None and time.monotonic() >= expires:
+                del self._results[key]
+                self.result_expirations += 1
+                self.result_misses += 1
+                return _MISSING
+            self._results.move_to_end(key)
+            self.result_hits += 1
+            return result
+
+    def _memorize_result(self, key: Optional[tuple], result: Any):
+        # Les grandeurs (dont l'unité d'affichage est modifiable) ne sont pas
+        # mémorisées
+        if key is None or isinstance(result, (Quantity, np.ndarray)):
+            return
+        expires = None
+        if self.result_ttl is not None:
+            expires = time.monotonic() + self.result_ttl
+        with self._results_lock:
+            self._results[key] = (result, expires)
+            self._results.move_to_end(key)
+            if len(self._results) > self.result_cache_size:
+                self._results.popitem(last=False)
+                self.result_evictions += 1
+
+    def get_result_cache_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques de la mémoïsation des résultats.
+
+        Returns:
+            Dictionnaire avec la taille, la capacité, la durée de vie, les
+            succès, les échecs, le taux de succès, les expirations et les
+            évictions
+        """
+        lookups = self.result_hits + self.result_misses
+        return {
+            "size": len(self._results),
+            "capacity": self.result_cache_size,
+            "ttl": self.result_ttl,
+            "hits": self.result_hits,
+            "misses": self.result_misses,
+            "hit_rate": self.result_hits / lookups if lookups else 0.0,
+            "expirations": self.result_expirations,
+            "evictions": self.result_evictions,
+        }
+
+    def _convert_units(self, result: Any, target: str) -> Quantity:
+        """Exprime un résultat dans l'unité cible (suffixe ``to``/``in``)."""
+        unit = self._evaluate(target, None, "units")
+        if not isinstance(result, Quantity):
+            result = Quantity(result, DIMENSIONLESS)
+        return result.to(unit, target)
+
+    def evaluate_precise(
+        self,
+        expression: str,
+        variables: Optional[Dict[str, float]] = None,
+        digits: Optional[int] = None,
+    ) -> Any:
+        """
+        Évalue une expression en haute précision avec mpmath.
+
+        Les littéraux sont lus depuis leur texte décimal (``0.1`` vaut
+        exactement un dixième) et les fonctions du registre sont remplacées
+        par leurs implémentations mpmath.
+
+        Args:
+            expression: L'expression à évaluer
+            variables: Dictionnaire des variables et leurs valeurs
+            digits: Nombre de chiffres significatifs (par défaut
+                self.precision_digits)
+
+        Returns:
+            Le résultat (mpf de mpmath, ou entier exact)
+        """
+        return self.evaluate_expression(
+            expression, variables, digits or self.precision_digits
+        )
+
+    def format_result(self, result: Any, digits: Optional[int] = None) -> Any:
+        """
+        Prépare un résultat pour l'affichage ou la sérialisation JSON.
+
+        Les flottants et les entiers sont retournés tels quels ; les
+        valeurs mpmath, et les entiers trop longs pour être écrits en
+        décimal (sys.get_int_max_str_digits), sont converties en texte avec
+        ``digits`` chiffres. Les complexes et les grandeurs physiques sont
+        écrits en texte ; un tableau NumPy devient une liste (imbriquée
+        selon sa forme) d'éléments formatés de la même façon.
+
+        Args:
+            result: Résultat de evaluate_expression
+            digits: Chiffres significatifs affichés (par défaut
+                self.precision_digits)
+
+        Returns:
+            Un nombre, une liste, ou le texte du résultat
+
+        Raises:
+            ValueError: Si le résultat n'est pas numérique
+        """
+        digits = digits or self.precision_digits
+        if isinstance(result, np.ndarray):
+            result = result.tolist()
+        elif isinstance(result, np.generic):
+            result = result.item()
+        if isinstance(result, list):
+            return [self.format_result(item, digits) for item in result]
+        if type(result) is int and exceeds_str_digits(result):
+            import mpmath
+
+            # Arrondi aux chiffres affichés, pas à la précision courante
+            with mpmath.workdps(digits):
+                return mpmath.nstr(mpmath.mpf(result), digits)
+        if isinstance(result, (int, float)):
+            return result
+        if type(result).__module__.startswith("mpmath"):
+            import mpmath
+
+            return mpmath.nstr(result, digits)
+        if isinstance(result, (complex, Quantity)):
+            return str(result)
+        raise ValueError("Le résultat n'est pas un nombre")
+
+    def evaluate_array(
+        self, expression: str, variables: Optional[Dict[str, object]] = None
+    ) -> np.ndarray:
+        """
+        Évalue une expression une seule fois sur des tableaux NumPy.
+
+        Les fonctions sont remplacées par leurs ufuncs NumPy et la
+        conversion d'angle est appliquée de façon vectorisée. Un seul
+        élément est ajouté à l'historique. En mode complexe, les tableaux
+        sont de type complex.
+
+        Args:
+            expression: L'expression à évaluer
+            variables: Variables scalaires ou tableaux (diffusés entre eux)
+
+        Returns:
+            Le tableau des résultats, à la forme commune des variables
+        """
+        self.validate_variables(variables)
+        outer = self._pin_context()
+        try:
+            result = self._evaluate_vectorized(expression, variables)
 
-            # Ajoute à l'historique
             self.history.append(
                 {
                     "expression": expression,
@@ -65,61 +621,692 @@ class ScientificModel:
                 }
             )
 
-            return float(result)
+            return result
+
+        except BudgetExceededError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Erreur d'évaluation: {_error_message(e)}")
+        finally:
+            self._unpin_context(outer)
+
+    def _evaluate_vectorized(self, expression: str, variables) -> np.ndarray:
+        """Évalue une expression sur des tableaux (voir evaluate_array)."""
+        dtype = complex if self._context().complex_mode else float
+        arrays = {
+            name: np.asarray(value, dtype=dtype)
+            for name, value in (variables or {}).items()
+        }
+        # Les divisions par zéro et domaines invalides donnent inf ou nan
+        # élément par élément, sans avertissement sur stderr
+        with np.errstate(all="ignore"):
+            result = self._evaluate(expression, arrays, "vector")
+
+        # Une expression constante est diffusée à la forme des variables
+        shape = np.broadcast(*arrays.values()).shape if arrays else ()
+        return np.array(np.broadcast_to(result, shape), dtype=dtype)
+
+    def _evaluate(self, expression: str, variables, backend: str = "scalar"):
+        """
+        Évalue l'expression compilée (mise en cache) dans une copie de l'espace
+        de noms de l'implémentation donnée, sous l'échéance du budget.
+        """
+        # Ajoute les variables à une copie de l'espace de noms partagé
+        namespace = dict(self._namespace(backend))
+        if variables:
+            namespace.update(variables)
+
+        previous = self.budget.start()
+        try:
+            compiled = self._compile_expression(
+                expression, variables or (), backend == "precise"
+            )
+            if compiled.series:
+                namespace[SERIES_HELPER] = self._series_function(
+                    compiled.series, backend
+                )
+            return eval(compiled.code, {"__builtins__": {}}, namespace)
+        finally:
+            self.budget.stop(previous)
+
+    def _evaluate_adaptive(self, expression: str, variables, backend: str = "scalar"):
+        """
+        Chemin rapide en flottants, repris en haute précision si nécessaire.
+
+        L'arbre est réévalué avec des opérateurs qui détectent les
+        annulations catastrophiques. Une annulation dépend des valeurs : le
+        contrôle est refait à chaque évaluation d'une expression à
+        variables, et seule l'absence d'annulation d'une expression sans
+        variables est conservée (elle ne paie alors plus aucun contrôle).
+        """
+        key = self._cache_key(expression, variables or ())
+        try:
+            result = self._evaluate(expression, variables, backend)
+        except OverflowError:
+            needs_precision = True
+        else:
+            needs_precision = is_unreliable_float(result)
+            if not needs_precision and key not in self._needs_precision:
+                needs_precision = self._probe_cancellation(key, variables, backend)
+                if needs_precision is False and not variables:
+                    with self._cache_lock:
+                        self._needs_precision[key] = False
+                        if len(self._needs_precision) > self.cache_size:
+                            self._needs_precision.popitem(last=False)
+        if not needs_precision:
+            return result
 
+        self.precision_escalations += 1
+        return self._evaluate_precise(expression, variables, self.precision_digits)
+
+    def _probe_cancellation(
+        self, key: tuple, variables, backend: str = "scalar"
+    ) -> Optional[bool]:
+        """Réévalue l'arbre analysé une fois en surveillant les annulations."""
+        with self._cache_lock:
+            compiled = self._compiled_cache.get(key)
+        if compiled is None:
+            # Évincée entre-temps par un autre thread : sondée à la prochaine
+            return None
+        if compiled.series:
+            # Les sommes et produits sont évalués par blocs, hors de l'arbre
+            return False
+        namespace = dict(self._namespace(backend))
+        if variables:
+            namespace.update(variables)
+        probe = CancellationProbe(self.budget.operators)
+        previous = self.budget.start()
+        try:
+            evaluate(compiled.tree, namespace, probe.operators)
+        except (ArithmeticError, ValueError, TypeError):
+            return False
+        finally:
+            self.budget.stop(previous)
+        return probe.cancelled
+
+    def _evaluate_precise(self, expression: str, variables, digits: int):
+        """Évalue l'expression avec mpmath à ``digits`` chiffres significatifs."""
+        import mpmath
+
+        if not isinstance(digits, int) or digits < 1:
+            raise ValueError("Le nombre de chiffres doit être un entier positif")
+        if variables:
+            variables = {
+                # Lu depuis son texte décimal, comme un littéral
+                name: mpmath.mpf(repr(value)) if isinstance(value, float) else value
+                for name, value in variables.items()
+            }
+        with mpmath.workdps(digits):
+            result = self._evaluate(expression, variables, "precise")
+            # Arrondi au nombre de chiffres demandé
+            if isinstance(result, (mpmath.mpf, mpmath.mpc)):
+                result = +result
+        return result
+
+    def _namespace(self, backend: str = "scalar") -> Dict[str, object]:
+        """
+        Retourne l'espace de noms sécurisé du mode d'angle courant (celui de
+        l'évaluation en cours, voir _pin_context).
+
+        Les fonctions du registre sont complétées par les opérations bornées
+        du budget. Le dictionnaire est partagé : le copier avant modification.
+
+        En mode complexe, les espaces "scalar", "vector" et "precise" sont
+        remplacés par leurs équivalents complexes (cmath, NumPy, mpmath),
+        qui définissent en plus l'unité imaginaire ``i`` (ou ``j``).
+
+        Args:
+            backend: "scalar" (math), "vector" (NumPy), "precise" (mpmath),
+                "units" ("scalar" et les unités des grandeurs) ou "jet"
+                (dérivation automatique)
+
+        Returns:
+            Dictionnaire des fonctions et constantes disponibles
+        """
+        context = self._context()
+        if context.complex_mode:
+            backend = _COMPLEX_BACKENDS.get(backend, backend)
+        return self._context_namespace(context, backend)
+
+    def _context_namespace(
+        self, context: EvaluationContext, backend: str
+    ) -> Dict[str, object]:
+        """Espace de noms d'un contexte, construit à la première utilisation."""
+        namespace = context.namespaces.get(backend)
+        if namespace is None:
+            angle_mode = context.angle_mode
+            if backend in ("units", "complex_units"):
+                # Les unités ne masquent pas les fonctions et constantes
+                namespace = dict(_UNIT_NAMESPACE)
+                scalar = "complex" if backend == "complex_units" else "scalar"
+                namespace.update(self._context_namespace(context, scalar))
+            elif backend in ("scalar", "vector"):
+                namespace = self._real_namespace(angle_mode, backend)
+            elif backend == "precise":
+                namespace = self._precise_namespace(angle_mode)
+            elif backend in _COMPLEX_BACKENDS.values():
+                namespace = self._complex_namespace(context, backend)
+            elif backend == "jet":
+                namespace = dict(self.registry.namespace(angle_mode, "jet"))
+                namespace.update(math=self.budget.math, _pow=self.budget.power)
+            else:
+                raise ValueError(f"Implémentation inconnue: '{backend}'")
+            # Deux threads peuvent construire le même espace : le second
+            # remplace le premier, identique
+            context.namespaces[backend] = namespace
+        return namespace
+
+    def _series_function(self, specs: tuple, backend: str) -> Callable:
+        """
+        Fonction ``_series`` du code généré, qui calcule les sommes et
+        produits indicés d'une expression compilée (voir series).
+        """
+        # Le corps est compilé dans les modes de l'expression englobante,
+        # même si la fonction est appelée plus tard (voir compile)
+        context = self._context()
+        namespace = self._namespace(backend)
+
+        def series(index, lower, upper, *arguments):
+            spec = specs[int(index)]
+
+            def compile_body(body_backend):
+                return self._compile_function(
+                    spec.source, (spec.variable,) + spec.parameters, body_backend
+                )
+
+            outer = getattr(self._local, "context", None)
+            self._local.context = context
+            try:
+                return evaluate_series(
+                    spec,
+                    lower,
+                    upper,
+                    arguments,
+                    compile_body,
+                    namespace,
+                    self.budget,
+                    backend,
+                )
+            finally:
+                self._unpin_context(outer)
+
+        return series
+
+    def _precise_namespace(self, angle_mode: str) -> Dict[str, object]:
+        """Construit l'espace de noms mpmath (importé à la première bascule)."""
+        import mpmath
+
+        budget = self.budget
+
+        def factorial(n):
+            # Les entiers restent exacts ; les autres valeurs passent par gamma
+            if isinstance(n, mpmath.mpf) and mpmath.isint(n):
+                n = int(n)
+            if isinstance(n, int):
+                return budget.factorial(n)
+            return mpmath.factorial(n)
+
+        namespace = dict(self.registry.namespace(angle_mode, "precise"))
+        namespace.update(
+            math=budget.math, _pow=budget.power, _mpf=mpmath.mpf, factorial=factorial
+        )
+        return namespace
+
+    def _complex_namespace(
+        self, context: EvaluationContext, backend: str
+    ) -> Dict[str, object]:
+        """Construit un espace de noms complexe (voir set_complex_mode)."""
+        if backend == "complex_precise":
+            import mpmath
+
+            namespace = self._context_namespace(context, "precise").copy()
+            unit = mpmath.mpc(0, 1)
+        else:
+            real = "scalar" if backend == "complex" else "vector"
+            namespace = self._context_namespace(context, real).copy()
+            namespace.update(self.registry.namespace(context.angle_mode, backend))
+            unit = 1j
+        namespace.update(i=unit, j=unit)
+        return namespace
+
+    def _real_namespace(self, angle_mode: str, backend: str) -> Dict[str, object]:
+        """Construit l'espace de noms "scalar" (math) ou "vector" (NumPy)."""
+        budget = self.budget
+        if backend == "vector":
+            namespace = dict(self.registry.namespace(angle_mode, "vector"))
+            namespace.update(
+                math=budget.math,
+                _pow=budget.power,
+                factorial=np.vectorize(budget.factorial, otypes=[float]),
+            )
+            return namespace
+        namespace = dict(self.registry.namespace(angle_mode, "scalar"))
+        namespace.update(
+            math=budget.math, _pow=budget.power, factorial=budget.factorial
+        )
+        return namespace
+
+    def apply_function(self, name: str, value: float) -> float:
+        """
+        Applique une fonction du registre à une valeur (mode d'angle courant).
+
+        Args:
+            name: Nom de la fonction (sin, sqrt, ...)
+            value: L'argument
+
+        Returns:
+            Le résultat de la fonction, du même type que celui de
+            evaluate_expression (réel si la partie imaginaire est nulle)
+        """
+        function = self._namespace().get(name)
+        if not callable(function) or name.startswith("_"):
+            raise ValueError(f"Fonction inconnue: {name}")
+        return self._public_result(function(value))
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def normalize_expression(expression: str) -> str:
+        """
+        Normalise une expression pour l'indexation du cache.
+
+        Les espaces autour des opérateurs sont supprimés et les autres
+        séquences d'espaces réduites à un seul, sans changer le sens. Les
+        symboles d'unités (``m³``) sont réécrits en opérateurs. Les
+        expressions récentes sont mémorisées (appelé à chaque évaluation).
+
+        Args:
+            expression: L'expression brute
+
+        Returns:
+            L'expression normalisée
+        """
+        expression = normalize_units(expression)
+        expression = _SPACES_AROUND_SYMBOLS.sub(r"\1", expression.strip())
+        return _SPACES.sub(" ", expression)
+
+    def _cache_key(
+        self, expression: str, variable_names: Iterable[str] = (), precise: bool = False
+    ) -> tuple:
+        """
+        Clé du cache : expression normalisée, mode d'angle, variables,
+        registre et mode de calcul (réel, complexe, haute précision).
+        """
+        context = self._context()
+        return (
+            self.normalize_expression(expression),
+            context.angle_mode,
+            frozenset(variable_names),
+            context.registry_version,
+            precise,
+            context.complex_mode,
+        )
+
+    def _compile_expression(
+        self,
+        expression: str,
+        variable_names: Iterable[str] = (),
+        precise: bool = False,
+    ) -> CompiledExpression:
+        """
+        Retourne l'expression compilée, en l'analysant et l'optimisant au besoin.
+
+        L'arbre est simplifié (constantes précalculées selon le mode d'angle,
+        sous-expressions communes mutualisées) avant d'être traduit en code
+        Python puis compilé. Le résultat est conservé dans le cache LRU.
+        En haute précision, les constantes ne sont pas précalculées (elles
+        le seraient en flottants) et les littéraux sont lus par mpmath.
+
+        Args:
+            expression: L'expression à compiler
+            variable_names: Noms des variables fournis à l'évaluation
+            precise: Si True, compile pour l'espace de noms mpmath
+
+        Returns:
+            L'expression compilée prête à être évaluée
+        """
+        key = self._cache_key(expression, variable_names, precise)
+        variable_names = key[2]
+        with self._cache_lock:
+            compiled = self._compiled_cache.get(key)
+            if compiled is not None:
+                self.cache_hits += 1
+                self._compiled_cache.move_to_end(key)
+                return compiled
+            self.cache_misses += 1
+
+        # Compilée hors du verrou : deux threads peuvent compiler la même
+        # expression, le second résultat remplace le premier, identique
+        tree = parse(key[0])
+        self.budget.check_nodes(count_nodes(tree))
+        # sum(...) et prod(...) deviennent des appels à _series
+        optimized, series = lower_series(tree, variable_names, self._namespace())
+        if not precise:
+            optimized = fold_constants(
+                optimized, self._namespace(), variable_names, self.budget.operators
+            )
+        shared = find_common_subexpressions(optimized)
+        source = to_source(
+            optimized,
+            shared,
+            power="_pow",
+            number="_mpf" if precise else None,
+            helpers=frozenset([SERIES_HELPER]),
+        )
+        code = compile(source, "<expression>", "eval")
+        compiled = CompiledExpression(tree, optimized, shared, source, code, series)
+
+        with self._cache_lock:
+            self._compiled_cache[key] = compiled
+            if len(self._compiled_cache) > self.cache_size:
+                self._compiled_cache.popitem(last=False)
+                self.cache_evictions += 1
+        return compiled
+
+    def compile(
+        self,
+        expression: str,
+        variables: Iterable[str] = (),
+        vectorized: bool = False,
+    ):
+        """
+        Compile une expression en fonction Python réutilisable.
+
+        L'arbre optimisé est traduit en ``lambda`` dont les paramètres sont
+        les variables, dans l'ordre donné : chaque appel ne coûte qu'un appel
+        de fonction, sans espace de noms à construire ni ``eval``. Le mode
+        d'angle est figé au moment de la compilation ; les limites de taille
+        du budget s'appliquent, mais pas son échéance.
+
+        Args:
+            expression: L'expression à compiler
+            variables: Noms des variables, dans l'ordre des arguments
+            vectorized: Si True, la fonction accepte des tableaux NumPy
+
+        Returns:
+            Une fonction ``f(*valeurs)`` retournant le résultat de l'expression
+        """
+        return self._compile_function(
+            expression, variables, "vector" if vectorized else "scalar"
+        )
+
+    def _compile_function(
+        self, expression: str, variables: Iterable[str], backend: str
+    ):
+        """Compile une expression en ``lambda`` liée à un espace de noms."""
+        variables = list(variables)
+        for name in variables:
+            if not name.isidentifier() or keyword.iskeyword(name) or name[0] == "_":
+                raise ValueError(f"Nom de variable invalide: '{name}'")
+        if len(set(variables)) != len(variables):
+            raise ValueError("Noms de variables en double")
+
+        outer = self._pin_context()
+        try:
+            compiled = self._compile_expression(
+                expression, variables, backend == "precise"
+            )
+            source = f"lambda {', '.join(variables)}: {compiled.source}"
+            namespace = dict(self._namespace(backend))
+            namespace["__builtins__"] = {}
+            if compiled.series:
+                namespace[SERIES_HELPER] = self._series_function(
+                    compiled.series, backend
+                )
+            function = eval(compile(source, "<expression>", "eval"), namespace)
+        except BudgetExceededError:
+            raise
         except Exception as e:
-            raise ValueError(f"Erreur d'évaluation: {str(e)}")
+            raise ValueError(f"Erreur de compilation: {str(e)}")
+        finally:
+            self._unpin_context(outer)
 
-    def _wrap_angle_math(self, func, inverse=False):
+        function.expression = expression
+        function.variables = tuple(variables)
+        function.source = compiled.source
+        return function
+
+    def derivative_function(
+        self, expression: str, variable: str = "x", order: int = 1
+    ) -> Callable[[Any], Any]:
         """
-        Enveloppe une fonction mathématique pour gérer les angles.
+        Compile la dérivée d'une expression (différentiation automatique).
+
+        L'expression est compilée une fois pour les jets (voir autodiff) ;
+        la fonction retournée calcule la dérivée en un point ou en un
+        tableau de points, sans calcul symbolique. Elle peut servir telle
+        quelle à la recherche de racines ou à l'optimisation.
 
         Args:
-            func: La fonction à envelopper
-            inverse: Si True, c'est une fonction inverse (comme asin, acos, atan)
+            expression: L'expression à dériver
+            variable: Variable de dérivation
+            order: Ordre de la dérivée
 
         Returns:
-            Une fonction qui gère automatiquement les conversions d'angle
+            Une fonction ``f(point)`` retournant la dérivée en ce point
         """
+        function = self._compile_function(expression, [variable], "jet")
 
-        def wrapper(x):
-            # Conversion avant l'application de la fonction
-            if not inverse:
-                if self.angle_mode == "DEG":
-                    x = math.radians(x)
-                elif self.angle_mode == "GRAD":
-                    x = math.radians(x * 0.9)
+        def derivative(point):
+            return autodiff.derivative(function, point, order)
 
-                result = func(x)
-                return result
-            else:
-                # Pour les fonctions inverses, on applique d'abord la fonction
-                result = func(x)
+        derivative.expression = expression
+        derivative.variables = (variable,)
+        derivative.order = order
+        return derivative
+
+    def differentiate(
+        self, expression: str, point: Any, variable: str = "x", order: int = 1
+    ) -> Any:
+        """
+        Calcule la dérivée d'une expression en un point.
+
+        Args:
+            expression: L'expression à dériver
+            point: Point de dérivation (nombre, liste ou tableau NumPy)
+            variable: Variable de dérivation
+            order: Ordre de la dérivée
+
+        Returns:
+            La valeur de la dérivée (tableau si point est un tableau)
+        """
+        try:
+            result = self.derivative_function(expression, variable, order)(point)
+        except BudgetExceededError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Erreur de dérivation: {str(e)}")
+        if isinstance(result, np.ndarray):
+            return result
+        return float(result)
+
+    def explain(
+        self, expression: str, variables: Optional[Iterable[str]] = None
+    ) -> Dict[str, object]:
+        """
+        Décrit l'optimisation appliquée à une expression (aide au débogage).
+
+        Args:
+            expression: L'expression à analyser
+            variables: Noms (ou dictionnaire) des variables de l'expression
+
+        Returns:
+            Dictionnaire avec les arbres avant/après, leur nombre de nœuds,
+            les sous-expressions communes et le code Python généré
+        """
+        outer = self._pin_context()
+        try:
+            compiled = self._compile_expression(expression, variables or ())
+            angle_mode = self._context().angle_mode
+        finally:
+            self._unpin_context(outer)
+        return {
+            "expression": expression,
+            "angle_mode": angle_mode,
+            "tree": format_tree(compiled.tree),
+            "optimized_tree": format_tree(compiled.optimized),
+            "nodes": count_nodes(compiled.tree),
+            "optimized_nodes": count_nodes(compiled.optimized, unique=True),
+            "common_subexpressions": sorted(
+                to_source(node) for node in compiled.shared
+            ),
+            "source": compiled.source,
+        }
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Retourne les statistiques du cache d'expressions compilées.
+
+        Returns:
+            Dictionnaire avec la taille, la capacité, les succès, les échecs
+            et les évictions du cache
+        """
+        return {
+            "size": len(self._compiled_cache),
+            "capacity": self.cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "evictions": self.cache_evictions,
+            "precision_escalations": self.precision_escalations,
+        }
+
+    def clear_cache(self):
+        """
+        Vide les caches (expressions compilées, résultats mémorisés) et remet
+        les compteurs à zéro.
+        """
+        with self._cache_lock:
+            self._compiled_cache.clear()
+            self._needs_precision.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        self.precision_escalations = 0
+        with self._results_lock:
+            self._results.clear()
+        self.result_hits = 0
+        self.result_misses = 0
+        self.result_expirations = 0
+        self.result_evictions = 0
+
+    def _cache_fingerprint(self) -> tuple:
+        """Configuration dont dépendent les expressions compilées."""
+        budget = self.budget
+        return (
+            self.registry.fingerprint(),
+            budget.max_exponent,
+            budget.max_int_bits,
+            budget.max_nodes,
+        )
+
+    def save_cache(self, path: Optional[str] = None) -> int:
+        """
+        Sauvegarde le cache d'expressions compilées sur disque.
+
+        Relu par load_cache au démarrage d'un autre processus, il évite de
+        recompiler les expressions courantes (voir cache_snapshot).
+
+        Args:
+            path: Chemin du fichier (par défaut CACHE_FILE)
+
+        Returns:
+            Le nombre d'expressions sauvegardées
+        """
+        version = self.registry.version
+        with self._cache_lock:
+            items = list(self._compiled_cache.items())
+        entries = [
+            # La version du registre est propre au processus : retirée de la clé
+            (
+                key[:3] + key[4:],
+                compiled.tree,
+                compiled.optimized,
+                compiled.shared,
+                compiled.source,
+                compiled.code,
+                tuple(tuple(spec) for spec in compiled.series),
+            )
+            for key, compiled in items
+            if key[3] == version
+        ]
+        cache_snapshot.save(path or self.CACHE_FILE, entries, self._cache_fingerprint())
+        return len(entries)
+
+    def load_cache(self, path: Optional[str] = None) -> int:
+        """
+        Recharge un cache sauvegardé par save_cache.
 
-                # Puis on convertit le résultat si nécessaire
-                if self.angle_mode == "DEG":
-                    return math.degrees(result)
-                elif self.angle_mode == "GRAD":
-                    return math.degrees(result) * 10 / 9
-                else:  # RAD
-                    return result
+        Un fichier absent, corrompu ou produit par une autre version
+        (Python, SmartCalc, registre de fonctions, budget) est ignoré.
 
-        return wrapper
+        Args:
+            path: Chemin du fichier (par défaut CACHE_FILE)
+
+        Returns:
+            Le nombre d'expressions ajoutées au cache
+        """
+        fingerprint = self._cache_fingerprint()
+        entries = cache_snapshot.load(path or self.CACHE_FILE, fingerprint)
+        version = self.registry.version
+        loaded = 0
+        for entry in entries[-self.cache_size :]:
+            try:
+                key, tree, optimized, shared, source, code, series = entry
+                if not isinstance(code, types.CodeType):
+                    raise TypeError("objet code attendu")
+                key = key[:3] + (version,) + key[3:]
+                series = tuple(SeriesSpec(*spec) for spec in series)
+                compiled = CompiledExpression(
+                    tree, optimized, shared, source, code, series
+                )
+            except (TypeError, ValueError):
+                # Entrée mal formée : ignorée
+                continue
+            with self._cache_lock:
+                if key not in self._compiled_cache:
+                    self._compiled_cache[key] = compiled
+                    loaded += 1
+        with self._cache_lock:
+            while len(self._compiled_cache) > self.cache_size:
+                self._compiled_cache.popitem(last=False)
+        return loaded
 
     def set_angle_mode(self, mode: str):
         """
         Définit le mode d'angle (DEG, RAD, GRAD).
 
+        Les évaluations en cours (autres threads) gardent le mode de leur
+        début ; les suivantes utilisent le nouveau mode.
+
         Args:
             mode: Le mode à définir ('DEG', 'RAD' ou 'GRAD')
         """
         if mode.upper() in ["DEG", "RAD", "GRAD"]:
-            self.angle_mode = mode.upper()
+            # Bascule d'un bloc sur le contexte (espaces de noms) du nouveau mode
+            with self._mode_lock:
+                self._active = self._new_context(
+                    mode.upper(), self._active.complex_mode
+                )
         else:
             raise ValueError(
                 "Mode d'angle non reconnu. Utilisez 'DEG', 'RAD' ou 'GRAD'."
             )
 
+    def set_complex_mode(self, enabled: bool):
+        """
+        Active ou désactive le calcul sur les nombres complexes.
+
+        En mode complexe, les fonctions du registre sont remplacées par
+        leurs versions cmath (et numpy.emath pour les tableaux), si bien que
+        ``sqrt(-1)`` ou ``ln(-2)`` sont définis, et ``i`` (ou ``j``) désigne
+        l'unité imaginaire : ``(3 + 4i) * conj(3 + 4i)``. Hors mode
+        complexe, le chemin réel est inchangé.
+
+        Args:
+            enabled: True pour activer le mode complexe
+        """
+        with self._mode_lock:
+            self._active = self._new_context(self._active.angle_mode, bool(enabled))
+
     def memory_add(self, value: float):
         """Ajoute une valeur à la mémoire."""
         self.memory += value
@@ -145,6 +1332,21 @@ class ScientificModel:
         """
         return self.history
 
+    def add_history(
+        self, expression: str, result: Any, variables: Optional[Dict] = None
+    ):
+        """
+        Ajoute un calcul à l'historique.
+
+        Args:
+            expression: L'expression évaluée
+            result: Son résultat
+            variables: Les variables de l'évaluation
+        """
+        self.history.append(
+            {"expression": expression, "result": result, "variables": variables or {}}
+        )
+
     def clear_history(self):
         """Efface l'historique des calculs."""
         self.history = []
@@ -163,7 +1365,7 @@ class ScientificModel:
             raise ValueError(
                 "La factorielle n'est définie que pour les entiers positifs"
             )
-        return math.factorial(n)
+        return self.budget.factorial(n)
 
     def permutation(self, n: int, k: int) -> int:
         """
@@ -178,7 +1380,9 @@ class ScientificModel:
         """
         if n < 0 or k < 0 or k > n:
             return 0
-        return math.perm(n, k) if hasattr(math, "perm") else self._fallback_perm(n, k)
+        if hasattr(math, "perm"):
+            return self.budget.perm(n, k)
+        return self._fallback_perm(n, k)
 
     def combination(self, n: int, k: int) -> int:
         """
@@ -193,7 +1397,9 @@ class ScientificModel:
         """
         if n < 0 or k < 0 or k > n:
             return 0
-        return math.comb(n, k) if hasattr(math, "comb") else self._fallback_comb(n, k)
+        if hasattr(math, "comb"):
+            return self.budget.comb(n, k)
+        return self._fallback_comb(n, k)
 
     def _fallback_perm(self, n: int, k: int) -> int:
         """Implémentation de remplacement pour math.perm"""
@@ -0,0 +1,498 @@
+"""
+Sommes et produits indicés du moteur scientifique (``sum(k^2, k, 1, n)``,
+``prod(1 + 1/k^2, k, 1, 10^7)``).
+
+À la compilation, chaque appel ``sum``/``prod`` est remplacé par un appel
+à ``_series`` (voir lower_series) ; le corps est compilé à part, avec
+l'indice et les variables extérieures pour paramètres. À l'évaluation :
+
+- les formes closes usuelles (somme d'un polynôme en l'indice, suites
+  géométriques, produits de constantes) sont calculées directement, en
+  fractions exactes lorsque les coefficients sont entiers ;
+- sinon, le corps est évalué par blocs de CHUNK_SIZE indices avec NumPy
+  (mémoire bornée quel que soit le nombre de termes) ; une somme de
+  valeurs entières représentables exactement reste un entier exact ;
+- les petits intervalles, et les corps non vectorisables, sont calculés
+  terme à terme.
+"""
+
+import math
+from collections import namedtuple
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from models.evaluation_budget import BudgetExceededError
+from models.expression_parser import Node, resolve_name
+
+SERIES_FUNCTIONS = ("sum", "prod")
+
+# Fonction interne appelée par le code généré (voir lower_series)
+SERIES_HELPER = "_series"
+
+# Nombre d'indices évalués à la fois par NumPy
+CHUNK_SIZE = 1 << 16
+
+# En dessous de ce nombre de termes, le calcul se fait terme à terme (les
+# corps à valeurs entières donnent alors un résultat entier exact)
+SCALAR_TERMS = 1000
+
+# Degré maximal des polynômes reconnus comme forme close
+MAX_DEGREE = 20
+
+# Les entiers de valeur absolue inférieure sont exacts en flottant
+_EXACT_FLOAT = 2.0**53
+
+# Somme ou produit à évaluer : corps (arbre et texte), indice et noms des
+# variables extérieures passées en arguments
+SeriesSpec = namedtuple(
+    "SeriesSpec", ["kind", "body", "source", "variable", "parameters"]
+)
+
+
+def split_series(node: Node) -> Optional[Tuple[str, Node, str, Node, Node]]:
+    """
+    Décompose un appel ``sum``/``prod``.
+
+    Args:
+        node: Un nœud de l'arbre
+
+    Returns:
+        (fonction, corps, indice, début, fin), ou None si le nœud n'est pas
+        une somme ou un produit
+    """
+    if node[0] != "call" or node[1] not in SERIES_FUNCTIONS:
+        return None
+    arguments = node[2]
+    if len(arguments) != 4 or arguments[1][0] != "name" or "." in arguments[1][1]:
+        raise ValueError(f"Syntaxe attendue: {node[1]}(expression, indice, début, fin)")
+    return node[1], arguments[0], arguments[1][1], arguments[2], arguments[3]
+
+
+def format_expression(node: Node) -> str:
+    """Texte (entièrement parenthésé) d'un arbre, relisible par parse()."""
+    tag = node[0]
+    if tag == "num":
+        return repr(node[1])
+    if tag == "name":
+        return node[1]
+    if tag == "neg":
+        return f"(-{format_expression(node[1])})"
+    if tag == "call":
+        arguments = ", ".join(format_expression(argument) for argument in node[2])
+        return f"{node[1]}({arguments})"
+    return f"({format_expression(node[1])} {tag} {format_expression(node[2])})"
+
+
+def _variable_names(node: Node) -> FrozenSet[str]:
+    """Noms simples (non pointés) utilisés comme valeurs, hors indices liés."""
+    tag = node[0]
+    if tag == "num":
+        return frozenset()
+    if tag == "name":
+        return frozenset() if "." in node[1] else frozenset([node[1]])
+    series = split_series(node) if tag == "call" else None
+    if series:
+        _, body, variable, lower, upper = series
+        names = _variable_names(body) - {variable}
+        return names | _variable_names(lower) | _variable_names(upper)
+    children = node[2] if tag == "call" else node[1:]
+    return frozenset().union(*(_variable_names(child) for child in children))
+
+
+def lower_series(
+    node: Node, variables: FrozenSet[str], namespace: Dict[str, Any]
+) -> Tuple[Node, Tuple[SeriesSpec, ...]]:
+    """
+    Remplace les sommes et produits par des appels à ``_series``.
+
+    ``sum(corps, k, a, b)`` devient ``_series(i, a, b, x, y...)`` (à
+    émettre avec ``to_source(..., helpers={SERIES_HELPER})``), où ``i``
+    est l'indice de sa description dans le tuple retourné et ``x, y...``
+    les variables extérieures utilisées par le corps.
+
+    Args:
+        node: L'arbre produit par parse()
+        variables: Noms fournis à l'évaluation
+        namespace: Constantes et fonctions disponibles
+
+    Returns:
+        L'arbre réécrit et la description de chaque somme ou produit
+    """
+    specs: List[SeriesSpec] = []
+
+    def lower(node: Node) -> Node:
+        tag = node[0]
+        if tag in ("num", "name"):
+            return node
+        if tag == "neg":
+            return ("neg", lower(node[1]))
+        if tag != "call":
+            return (tag, lower(node[1]), lower(node[2]))
+        if node[1] == SERIES_HELPER:
+            raise NameError(f"Nom inconnu: '{SERIES_HELPER}'")
+        series = split_series(node)
+        if series is None:
+            return ("call", node[1], tuple(lower(argument) for argument in node[2]))
+        kind, body, variable, start, stop = series
+        # Les variables masquent les constantes de même nom
+        parameters = tuple(
+            sorted(
+                name
+                for name in _variable_names(body) - {variable}
+                if name in variables or name not in namespace
+            )
+        )
+        specs.append(
+            SeriesSpec(kind, body, format_expression(body), variable, parameters)
+        )
+        arguments = (("num", len(specs) - 1), lower(start), lower(stop))
+        arguments += tuple(("name", name) for name in parameters)
+        return ("call", SERIES_HELPER, arguments)
+
+    return lower(node), tuple(specs)
+
+
+def _bound(value: Any, kind: str) -> int:
+    """Borne entière (int, flottant ou mpf de valeur entière)."""
+    try:
+        integer = int(value)
+    except (TypeError, ValueError, OverflowError):
+        integer = None
+    if integer is None or integer != value or isinstance(value, bool):
+        raise ValueError(f"Les bornes de {kind} doivent être des entiers")
+    return integer
+
+
+def _is_constant(value: Any) -> bool:
+    return isinstance(value, (int, float, complex, Fraction)) and not isinstance(
+        value, bool
+    )
+
+
+def _exact(value: Any) -> Any:
+    """Entiers en fractions, pour des calculs de coefficients exacts."""
+    return Fraction(value) if isinstance(value, int) else value
+
+
+def _polynomial(node: Node, variable: str, resolve: Callable) -> Optional[List]:
+    """Coefficients (degré croissant) si le corps est un polynôme en l'indice."""
+    tag = node[0]
+    if tag == "num":
+        return [_exact(node[1])] if _is_constant(node[1]) else None
+    if tag == "name":
+        if node[1] == variable:
+            return [Fraction(0), Fraction(1)]
+        value = resolve(node[1])
+        return [_exact(value)] if _is_constant(value) else None
+    if tag == "neg":
+        operand = _polynomial(node[1], variable, resolve)
+        return None if operand is None else [-c for c in operand]
+    if tag not in ("+", "-", "*", "/", "**"):
+        return None
+    left = _polynomial(node[1], variable, resolve)
+    right = _polynomial(node[2], variable, resolve)
+    if left is None or right is None:
+        return None
+    if tag in ("+", "-"):
+        sign = 1 if tag == "+" else -1
+        size = max(len(left), len(right))
+        left += [0] * (size - len(left))
+        right += [0] * (size - len(right))
+        return [a + sign * b for a, b in zip(left, right)]
+    if tag == "*":
+        return _multiply(left, right)
+    if len(right) != 1:
+        return None
+    if tag == "/":
+        return [c / right[0] for c in left] if right[0] != 0 else None
+    exponent = right[0]
+    if not isinstance(exponent, (Fraction, float)) or exponent != int(exponent):
+        return None
+    exponent = int(exponent)
+    if not 0 <= exponent * (len(left) - 1) <= MAX_DEGREE:
+        return None
+    result = [Fraction(1)]
+    for _ in range(exponent):
+        result = _multiply(result, left)
+    return result
+
+
+def _multiply(left: List, right: List) -> Optional[List]:
+    if len(left) + len(right) - 2 > MAX_DEGREE:
+        return None
+    result = [0] * (len(left) + len(right) - 1)
+    for i, a in enumerate(left):
+        for j, b in enumerate(right):
+            result[i + j] += a * b
+    return result
+
+
+@lru_cache(maxsize=None)
+def _faulhaber(degree: int) -> Tuple[Fraction, ...]:
+    """Coefficients du polynôme F tel que F(n) = 1^d + 2^d + ... + n^d."""
+    # Nombres de Bernoulli (convention B1 = +1/2)
+    bernoulli = [Fraction(1)]
+    for m in range(1, degree + 1):
+        total = sum(math.comb(m + 1, j) * bernoulli[j] for j in range(m))
+        bernoulli.append(-total / (m + 1))
+    if degree >= 1:
+        bernoulli[1] = Fraction(1, 2)
+    coefficients = [Fraction(0)] * (degree + 2)
+    for j in range(degree + 1):
+        coefficients[degree + 1 - j] = (
+            math.comb(degree + 1, j) * bernoulli[j] / (degree + 1)
+        )
+    return tuple(coefficients)
+
+
+def _power_sum(degree: int, n: int, power: Callable) -> Fraction:
+    """Somme des puissances 1^d + ... + n^d (prolongée aux n négatifs)."""
+    return sum(
+        c * power(n, j) for j, c in enumerate(_faulhaber(degree)) if c
+    ) or Fraction(0)
+
+
+def _fraction_power(value: Any, exponent: int, power: Callable) -> Any:
+    """Puissance entière, exacte et bornée par le budget pour les fractions."""
+    if isinstance(value, Fraction):
+        if exponent < 0:
+            value, exponent = 1 / value, -exponent
+        return Fraction(
+            power(value.numerator, exponent), power(value.denominator, exponent)
+        )
+    return power(value, exponent)
+
+
+def _geometric(node: Node, variable: str, resolve: Callable) -> Optional[Tuple]:
+    """(c, r, a, b) si le corps vaut ``c * r^(a*k + b)``."""
+    tag = node[0]
+    if tag == "neg":
+        term = _geometric(node[1], variable, resolve)
+        return None if term is None else (-term[0],) + term[1:]
+    if tag == "**":
+        base = _polynomial(node[1], variable, resolve)
+        exponent = _polynomial(node[2], variable, resolve)
+        if base is None or exponent is None or len(base) != 1 or len(exponent) != 2:
+            return None
+        return Fraction(1), base[0], exponent[1], exponent[0]
+    if tag in ("*", "/"):
+        for term_node, factor_node in ((node[1], node[2]), (node[2], node[1])):
+            factor = _polynomial(factor_node, variable, resolve)
+            if factor is None or len(factor) != 1:
+                continue
+            term = _geometric(term_node, variable, resolve)
+            if term is None:
+                continue
+            if tag == "*":
+                return (term[0] * factor[0],) + term[1:]
+            if term_node is node[1] and factor[0] != 0:
+                return (term[0] / factor[0],) + term[1:]
+    return None
+
+
+def _integer(value: Any) -> Optional[int]:
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return None
+
+
+def closed_form(
+    spec: SeriesSpec,
+    lower: int,
+    upper: int,
+    resolve: Callable[[str], Any],
+    power: Callable[[Any, Any], Any],
+    exact_only: bool = False,
+) -> Optional[Any]:
+    """
+    Calcule une somme ou un produit par une forme close, si elle existe.
+
+    Formes reconnues : somme d'un polynôme en l'indice (arithmétique,
+    sommes de puissances), somme et produit de ``c * r^(a*k + b)``
+    (géométrique) et produit d'une constante.
+
+    Args:
+        spec: La somme ou le produit
+        lower: Premier indice
+        upper: Dernier indice
+        resolve: Valeur d'un nom du corps (variable extérieure, constante)
+        power: Puissance bornée (EvaluationBudget.power)
+        exact_only: Si True, seules les formes exactes (rationnelles) sont
+            retenues (calcul en haute précision)
+
+    Returns:
+        Le résultat (int exact, float ou complex), ou None
+    """
+    count = upper - lower + 1
+    polynomial = _polynomial(spec.body, spec.variable, resolve)
+    try:
+        if polynomial is not None and (spec.kind == "sum" or len(polynomial) == 1):
+            if spec.kind == "prod":
+                result = _fraction_power(polynomial[0], count, power)
+            else:
+                result = sum(
+                    c * (_power_sum(d, upper, power) - _power_sum(d, lower - 1, power))
+                    for d, c in enumerate(polynomial)
+                    if c
+                )
+            return _result(result, exact_only)
+        geometric = _geometric(spec.body, spec.variable, resolve)
+        if geometric is None:
+            return None
+        c, r, a, b = geometric
+        if _integer(a) is None or _integer(b) is None:
+            return None
+        a, b = _integer(a), _integer(b)
+        if spec.kind == "prod":
+            # Somme des exposants a*k + b sur l'intervalle
+            exponent = a * (lower + upper) * count // 2 + b * count
+            result = _fraction_power(c, count, power) * _fraction_power(
+                r, exponent, power
+            )
+            return _result(result, exact_only)
+        q = _fraction_power(r, a, power)
+        if q == 1:
+            result = c * _fraction_power(r, b, power) * count
+        else:
+            first = _fraction_power(q, lower, power)
+            result = (
+                c
+                * _fraction_power(r, b, power)
+                * first
+                * (_fraction_power(q, count, power) - 1)
+                / (q - 1)
+            )
+        return _result(result, exact_only)
+    except BudgetExceededError:
+        raise
+    except (ArithmeticError, ValueError):
+        # Débordement, 0 à une puissance négative... : calcul terme à terme
+        return None
+
+
+def _result(value: Any, exact_only: bool) -> Optional[Any]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, Fraction):
+        return int(value) if value.denominator == 1 else float(value)
+    if exact_only:
+        return None
+    return value
+
+
+def _vectorized(
+    kind: str, function: Callable, lower: int, upper: int, arguments, budget
+) -> Any:
+    """Évalue le corps par blocs de CHUNK_SIZE indices avec NumPy."""
+    exact = kind == "sum"
+    total = 0 if kind == "sum" else 1
+    for start in range(lower, upper + 1, CHUNK_SIZE):
+        budget.check_time()
+        indices = np.arange(start, min(start + CHUNK_SIZE, upper + 1), dtype=float)
+        with np.errstate(all="ignore"):
+            # inf ou nan : le résultat est jugé peu fiable par l'appelant
+            values = np.broadcast_to(function(indices, *arguments), indices.shape)
+        if values.dtype == object:
+            raise TypeError("Corps non vectorisable")
+        if kind == "prod":
+            total *= values.prod()
+            continue
+        chunk = values.sum()
+        if exact and values.dtype.kind == "f":
+            # Valeurs entières et sommes partielles exactes en flottant
+            exact = bool(
+                np.abs(values).sum() < _EXACT_FLOAT
+                and np.array_equal(values, np.trunc(values))
+            )
+        else:
+            exact = False
+        if exact:
+            total += int(chunk)
+        else:
+            total = total + chunk
+    if isinstance(total, np.generic):
+        total = total.item()
+    return total
+
+
+def _term_by_term(
+    kind: str, function: Callable, lower: int, upper: int, arguments, budget
+) -> Any:
+    """Évalue le corps indice par indice (entiers exacts, tableaux, jets...)."""
+    total = function(lower, *arguments)
+    for k in range(lower + 1, upper + 1):
+        if not k & 1023:
+            budget.check_time()
+        term = function(k, *arguments)
+        total = total + term if kind == "sum" else total * term
+    return total
+
+
+def evaluate_series(
+    spec: SeriesSpec,
+    lower: Any,
+    upper: Any,
+    arguments: Tuple[Any, ...],
+    compile_body: Callable[[str], Callable],
+    namespace: Dict[str, Any],
+    budget,
+    backend: str = "scalar",
+) -> Any:
+    """
+    Calcule une somme ou un produit (appel ``_series`` du code généré).
+
+    Args:
+        spec: La somme ou le produit
+        lower: Premier indice
+        upper: Dernier indice (inclus)
+        arguments: Valeurs des variables extérieures (spec.parameters)
+        compile_body: Compile le corps pour une implémentation ("scalar",
+            "vector"...) en fonction ``f(indice, *arguments)``
+        namespace: Espace de noms de l'évaluation en cours
+        budget: EvaluationBudget de l'évaluation
+        backend: Implémentation de l'évaluation en cours
+
+    Returns:
+        La somme ou le produit
+    """
+    lower, upper = _bound(lower, spec.kind), _bound(upper, spec.kind)
+    if upper < lower:
+        return 0 if spec.kind == "sum" else 1
+    values = dict(zip(spec.parameters, arguments))
+
+    def resolve(name: str) -> Any:
+        if name in values:
+            return values[name]
+        try:
+            return resolve_name(name, namespace)
+        except (NameError, AttributeError):
+            return None
+
+    # Une forme close n'utilise que des constantes : valable pour toute
+    # implémentation, mais calculée en flottants sauf si elle est exacte
+    result = closed_form(
+        spec, lower, upper, resolve, budget.power, exact_only=backend == "precise"
+    )
+    if result is not None:
+        return result
+
+    scalar_arguments = all(_is_constant(value) for value in arguments)
+    if backend in ("scalar", "vector") and scalar_arguments:
+        if upper - lower >= SCALAR_TERMS:
+            try:
+                return _vectorized(
+                    spec.kind, compile_body("vector"), lower, upper, arguments, budget
+                )
+            except BudgetExceededError:
+                raise
+            except (TypeError, ValueError, AttributeError):
+                # Corps non vectorisable (unités, fonction sans ufunc...)
+                pass
+    return _term_by_term(
+        spec.kind, compile_body(backend), lower, upper, arguments, budget
+    )
@@ -0,0 +1,265 @@
+"""
+Grandeurs avec unités pour le moteur scientifique (``5 km + 300 m``,
+``2 h * 90 km/h to km``).
+
+Les unités proviennent de ConversionModel.CONVERSION_FACTORS. Une
+grandeur est stockée dans les unités SI de base avec ses dimensions sous
+forme d'un petit vecteur d'entiers (longueur, masse, temps) : vérifier la
+compatibilité des unités revient à comparer deux tuples, et les changements
+d'échelle sont déjà appliqués à la lecture des unités.
+
+Les températures (conversion affine, et non un simple facteur) restent
+réservées à ConversionModel.
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from models.conversion_model import ConversionModel
+
+Dimensions = Tuple[int, int, int]
+
+DIMENSIONLESS: Dimensions = (0, 0, 0)
+
+# Unité SI de base de chaque composante des dimensions
+BASE_UNITS = ("m", "kg", "s")
+
+# Dimensions de chaque catégorie et facteur de son unité de référence vers le SI
+CATEGORY_DIMENSIONS: Dict[str, Tuple[Dimensions, float]] = {
+    "Longueur": ((1, 0, 0), 1.0),
+    "Masse": ((0, 1, 0), 1.0),
+    "Volume": ((3, 0, 0), 0.001),  # litre -> m³
+    "Temps": ((0, 0, 1), 1.0),
+}
+
+# Exposants Unicode (m², m³) et point médian (kg·m) réécrits en opérateurs
+_UNIT_SYMBOLS = {"²": "^2", "³": "^3", "·": "*"}
+
+# Nombre suivi d'un nom ("5 km", "1.5e3 m", "2L") : candidat à une grandeur
+_QUANTITY_RE = re.compile(
+    r"(?<![\w.])(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\s*([A-Za-z_]\w*)"
+)
+
+# expression to|in unités (le dernier mot-clé l'emporte : "3 ft in in")
+_CONVERSION_RE = re.compile(r"^(.*\S)\s+(?:to|in)\s+([A-Za-z(].*)$", re.S)
+
+
+def format_dimensions(dimensions: Dimensions) -> str:
+    """
+    Représente des dimensions avec les unités SI de base (``m/s^2``).
+
+    Args:
+        dimensions: Exposants (longueur, masse, temps)
+
+    Returns:
+        Le texte de l'unité ("" si la grandeur est sans dimension)
+    """
+    numerator, denominator = [], []
+    for unit, exponent in zip(BASE_UNITS, dimensions):
+        if exponent:
+            parts = numerator if exponent > 0 else denominator
+            power = abs(exponent)
+            parts.append(unit if power == 1 else f"{unit}^{power}")
+    text = "·".join(numerator) or ("1" if denominator else "")
+    if denominator:
+        text += "/" + "/".join(denominator)
+    return text
+
+
+class Quantity:
+    """
+    Valeur numérique associée à des dimensions physiques.
+
+    Args:
+        value: Valeur exprimée dans les unités SI de base
+        dimensions: Exposants (longueur, masse, temps)
+        unit: Unité d'affichage (texte et facteur vers le SI), fixée par
+            une conversion ``to``/``in``
+    """
+
+    __slots__ = ("value", "dimensions", "unit")
+
+    def __init__(
+        self,
+        value: Any,
+        dimensions: Dimensions,
+        unit: Optional[Tuple[str, float]] = None,
+    ):
+        self.value = value
+        self.dimensions = dimensions
+        self.unit = unit
+
+    @staticmethod
+    def _make(value: Any, dimensions: Dimensions) -> Any:
+        # Une grandeur sans dimension redevient un simple nombre
+        if dimensions == DIMENSIONLESS:
+            return value
+        return Quantity(value, dimensions)
+
+    def _check(self, other: Any, operation: str) -> Any:
+        dimensions = other.dimensions if isinstance(other, Quantity) else DIMENSIONLESS
+        if dimensions != self.dimensions:
+            raise ValueError(
+                f"Unités incompatibles pour '{operation}': "
+                f"{format_dimensions(self.dimensions) or '1'} et "
+                f"{format_dimensions(dimensions) or '1'}"
+            )
+        return other.value
+
+    def __add__(self, other):
+        return Quantity(self.value + self._check(other, "+"), self.dimensions)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Quantity(self.value - self._check(other, "-"), self.dimensions)
+
+    def __rsub__(self, other):
+        return Quantity(self._check(other, "-") - self.value, self.dimensions)
+
+    def __mul__(self, other):
+        if isinstance(other, Quantity):
+            dimensions = tuple(a + b for a, b in zip(self.dimensions, other.dimensions))
+            return self._make(self.value * other.value, dimensions)
+        return Quantity(self.value * other, self.dimensions)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Quantity):
+            dimensions = tuple(a - b for a, b in zip(self.dimensions, other.dimensions))
+            return self._make(self.value / other.value, dimensions)
+        return Quantity(self.value / other, self.dimensions)
+
+    def __rtruediv__(self, other):
+        dimensions = tuple(-a for a in self.dimensions)
+        return Quantity(other / self.value, dimensions)
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Quantity):
+            raise ValueError("Un exposant ne peut pas avoir d'unité")
+        dimensions = tuple(a * exponent for a in self.dimensions)
+        if any(d != int(d) for d in dimensions):
+            raise ValueError(
+                f"Puissance {exponent} de {format_dimensions(self.dimensions)} "
+                "sans unité entière"
+            )
+        dimensions = tuple(int(d) for d in dimensions)
+        return self._make(self.value**exponent, dimensions)
+
+    def __rpow__(self, base):
+        raise ValueError("Un exposant ne peut pas avoir d'unité")
+
+    def __neg__(self):
+        return Quantity(-self.value, self.dimensions, self.unit)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return Quantity(abs(self.value), self.dimensions, self.unit)
+
+    def __eq__(self, other):
+        if not isinstance(other, Quantity):
+            return NotImplemented
+        return self.value == other.value and self.dimensions == other.dimensions
+
+    __hash__ = None
+
+    def to(self, unit: "Quantity", label: str) -> "Quantity":
+        """
+        Exprime la grandeur dans une autre unité (pour l'affichage).
+
+        Args:
+            unit: L'unité cible, évaluée comme une grandeur (``km/h``)
+            label: Texte de l'unité cible
+
+        Returns:
+            La même grandeur, affichée dans l'unité cible
+        """
+        if not isinstance(unit, Quantity):
+            unit = Quantity(unit, DIMENSIONLESS)
+        self._check(unit, "to")
+        return Quantity(self.value, self.dimensions, (label, unit.value))
+
+    def magnitude(self) -> Any:
+        """Retourne la valeur dans l'unité d'affichage (SI par défaut)."""
+        if self.unit is None:
+            return self.value
+        return self.value / self.unit[1]
+
+    def __str__(self):
+        label = self.unit[0] if self.unit else format_dimensions(self.dimensions)
+        return f"{self.magnitude()} {label}"
+
+    def __repr__(self):
+        return f"Quantity({self.value!r}, {self.dimensions!r})"
+
+
+def _build_units() -> Dict[str, Quantity]:
+    units = {}
+    for category, factors in ConversionModel.CONVERSION_FACTORS.items():
+        if category not in CATEGORY_DIMENSIONS:
+            continue
+        dimensions, scale = CATEGORY_DIMENSIONS[category]
+        for name, factor in factors.items():
+            # m³, ft³ : obtenus par puissance de m et ft
+            if name.isidentifier():
+                value = factor * scale
+                units[name] = Quantity(value, dimensions, (name, value))
+    return units
+
+
+# Unités utilisables dans les expressions, indexées par leur symbole
+UNITS = _build_units()
+
+
+def normalize_units(expression: str) -> str:
+    """Réécrit les symboles d'unités (``m³`` -> ``m^3``, ``kg·m`` -> ``kg*m``)."""
+    for symbol, operator in _UNIT_SYMBOLS.items():
+        expression = expression.replace(symbol, operator)
+    return expression
+
+
+def has_quantities(expression: str) -> bool:
+    """
+    Indique si une expression écrit une grandeur (nombre suivi d'une unité).
+
+    Seules ces expressions (et celles qui ont un suffixe de conversion) sont
+    évaluées avec les unités : ailleurs, ``m`` ou ``s`` restent des noms
+    inconnus.
+
+    Args:
+        expression: L'expression (sans suffixe de conversion)
+
+    Returns:
+        True si un nombre y est suivi d'une unité connue
+    """
+    names = _QUANTITY_RE.findall(normalize_units(expression))
+    return any(name in UNITS for name in names)
+
+
+def split_conversion(expression: str) -> Tuple[str, Optional[str]]:
+    """
+    Sépare une expression de son suffixe de conversion ``to``/``in``.
+
+    Le suffixe n'est reconnu que s'il ne contient que des unités connues
+    (``5 in + 2 in`` reste une addition de pouces).
+
+    Args:
+        expression: L'expression, éventuellement suivie de ``to unité``
+
+    Returns:
+        L'expression à évaluer et le texte de l'unité cible (ou None)
+    """
+    match = _CONVERSION_RE.match(expression.strip())
+    if not match:
+        return expression, None
+    target = match.group(2).strip()
+    normalized = normalize_units(target)
+    names = re.findall(r"[A-Za-z_]\w*", normalized)
+    if not names or any(name not in UNITS for name in names):
+        return expression, None
+    if re.search(r"[^\w\s*/^()]", normalized):
+        return expression, None
+    return match.group(1), target
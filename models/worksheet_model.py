@@ -0,0 +1,353 @@
+"""
+Feuille de calcul de SmartCalc : variables et fonctions définies par
+l'utilisateur (``a = 3``, ``b = a**2 + 1``, ``f(x) = b*sin(x)``).
+
+Les définitions forment un graphe de dépendances acyclique. Modifier une
+définition ne recalcule que les définitions qui en dépendent, dans l'ordre
+topologique ; les autres valeurs restent en cache. Chaque définition est
+compilée une fois (ScientificModel.compile) puis rappelée avec les valeurs
+de ses dépendances.
+"""
+
+import functools
+import keyword
+import re
+from collections import deque, namedtuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from models.evaluation_budget import BudgetExceededError
+from models.expression_parser import Node, parse
+from models.scientific_model import ScientificModel
+from models.series import split_series
+
+# nom = expression, ou nom(paramètres) = expression
+_DEFINITION_RE = re.compile(r"^\s*([A-Za-z]\w*)\s*(?:\(([^)]*)\))?\s*=(.+)$", re.S)
+
+# Définition analysée : paramètres (None pour une variable) et noms libres
+Definition = namedtuple(
+    "Definition", ["name", "parameters", "expression", "dependencies"]
+)
+
+
+def free_names(node: Node) -> Set[str]:
+    """
+    Retourne les noms (variables et fonctions) utilisés par un arbre.
+
+    Pour un nom pointé (``math.pi``), seul le premier composant est retenu.
+    L'indice d'une somme ou d'un produit (``sum(k^2, k, 1, n)``) n'est
+    pas un nom libre.
+
+    Args:
+        node: L'arbre produit par parse()
+
+    Returns:
+        L'ensemble des noms référencés
+    """
+    names = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        tag = node[0]
+        if tag == "num":
+            continue
+        if tag == "name":
+            names.add(node[1].partition(".")[0])
+        elif tag == "call":
+            series = split_series(node)
+            if series:
+                # L'indice d'une somme ou d'un produit est lié au corps
+                _, body, variable, lower, upper = series
+                names |= free_names(body) - {variable}
+                stack.extend((lower, upper))
+                continue
+            names.add(node[1].partition(".")[0])
+            stack.extend(node[2])
+        else:
+            stack.extend(node[1:])
+    return names
+
+
+def _check_identifier(name: str) -> str:
+    if not name.isidentifier() or keyword.iskeyword(name) or name[0] == "_":
+        raise ValueError(f"Nom invalide: '{name}'")
+    return name
+
+
+class WorksheetModel:
+    """
+    Feuille de définitions avec recalcul incrémental.
+
+    Args:
+        evaluator: Moteur scientifique utilisé pour compiler les définitions
+            (son mode d'angle et son registre s'appliquent)
+
+    Attributes:
+        recomputations: Nombre total de définitions recalculées
+    """
+
+    def __init__(self, evaluator: Optional[ScientificModel] = None):
+        self.evaluator = evaluator or ScientificModel()
+        self._definitions: Dict[str, Definition] = {}
+        # Arcs inverses : nom -> définitions qui l'utilisent
+        self._dependents: Dict[str, Set[str]] = {}
+        # Fonctions compilées (avec leurs dépendances locales), valeurs et
+        # erreurs des définitions
+        self._compiled: Dict[str, Any] = {}
+        self._values: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        # Mode d'angle et version du registre des fonctions compilées
+        self._compiled_for = None
+        self.recomputations = 0
+
+    @staticmethod
+    def parse_definition(text: str) -> Definition:
+        """
+        Analyse une ligne de définition.
+
+        Args:
+            text: ``nom = expression`` ou ``nom(x, y) = expression``
+
+        Returns:
+            La définition (nom, paramètres, expression, dépendances)
+        """
+        match = _DEFINITION_RE.match(text)
+        if not match:
+            raise ValueError(f"Définition invalide: '{text.strip()}'")
+        name, parameters, expression = match.groups()
+        _check_identifier(name)
+        if parameters is not None:
+            parameters = tuple(
+                _check_identifier(parameter.strip())
+                for parameter in parameters.split(",")
+                if parameter.strip()
+            )
+            if len(set(parameters)) != len(parameters):
+                raise ValueError(f"Paramètres en double dans '{name}'")
+        expression = expression.strip()
+        try:
+            tree = parse(expression)
+        except SyntaxError as e:
+            raise ValueError(f"Expression invalide pour '{name}': {e}")
+        dependencies = free_names(tree) - set(parameters or ())
+        return Definition(name, parameters, expression, frozenset(dependencies))
+
+    def define(self, text: str) -> List[str]:
+        """
+        Ajoute ou remplace une définition et recalcule ce qui en dépend.
+
+        Args:
+            text: ``nom = expression`` ou ``nom(x, y) = expression``
+
+        Returns:
+            Les noms recalculés, dans l'ordre du recalcul
+        """
+        definition = self.parse_definition(text)
+        name = definition.name
+        cycle = self._find_cycle(name, definition.dependencies)
+        if cycle:
+            raise ValueError(f"Dépendance circulaire: {' -> '.join(cycle)}")
+
+        previous = self._definitions.get(name)
+        if previous is not None:
+            for dependency in previous.dependencies:
+                self._dependents[dependency].discard(name)
+        for dependency in definition.dependencies:
+            self._dependents.setdefault(dependency, set()).add(name)
+        self._definitions[name] = definition
+        self._compiled.pop(name, None)
+        return self._recompute([name])
+
+    def define_many(self, lines: Iterable[str]) -> List[str]:
+        """
+        Ajoute plusieurs définitions (une par ligne, lignes vides ignorées).
+
+        Args:
+            lines: Les définitions, dans n'importe quel ordre
+
+        Returns:
+            Les noms recalculés
+        """
+        recomputed = []
+        for line in lines:
+            if line.strip():
+                recomputed.extend(self.define(line))
+        return recomputed
+
+    def remove(self, name: str) -> List[str]:
+        """
+        Supprime une définition ; ses dépendants passent en erreur.
+
+        Args:
+            name: Le nom à supprimer
+
+        Returns:
+            Les noms recalculés
+        """
+        definition = self._definitions.pop(name)
+        for dependency in definition.dependencies:
+            self._dependents[dependency].discard(name)
+        self._compiled.pop(name, None)
+        self._values.pop(name, None)
+        self._errors.pop(name, None)
+        return self._recompute(self._dependents.get(name, ()))
+
+    def recalculate(self) -> List[str]:
+        """Recalcule toutes les définitions (ex. après un changement de mode)."""
+        self._compiled.clear()
+        return self._recompute(self._definitions)
+
+    def get(self, name: str) -> Any:
+        """
+        Retourne la valeur en cache d'une définition.
+
+        Args:
+            name: Nom de la variable ou de la fonction
+
+        Returns:
+            La valeur (une fonction appelable pour ``f(x) = ...``)
+        """
+        if name in self._errors:
+            raise ValueError(self._errors[name])
+        if name not in self._values:
+            raise KeyError(name)
+        return self._values[name]
+
+    def values(self) -> Dict[str, Any]:
+        """Retourne les valeurs des variables (hors fonctions et erreurs)."""
+        return {
+            name: value
+            for name, value in self._values.items()
+            if self._definitions[name].parameters is None
+        }
+
+    def errors(self) -> Dict[str, str]:
+        """Retourne les messages d'erreur des définitions non calculables."""
+        return dict(self._errors)
+
+    def definitions(self) -> List[str]:
+        """Retourne les définitions sous forme de texte, dans l'ordre topologique."""
+        lines = []
+        for name in self._topological_order(self._definitions):
+            definition = self._definitions[name]
+            head = name
+            if definition.parameters is not None:
+                head = f"{name}({', '.join(definition.parameters)})"
+            lines.append(f"{head} = {definition.expression}")
+        return lines
+
+    def dependents(self, name: str) -> Set[str]:
+        """
+        Retourne toutes les définitions affectées par un changement de ``name``.
+
+        Args:
+            name: Le nom modifié
+
+        Returns:
+            Les dépendants directs et indirects
+        """
+        affected = set()
+        queue = deque(self._dependents.get(name, ()))
+        while queue:
+            dependent = queue.popleft()
+            if dependent not in affected:
+                affected.add(dependent)
+                queue.extend(self._dependents.get(dependent, ()))
+        return affected
+
+    def _find_cycle(
+        self, name: str, dependencies: Iterable[str]
+    ) -> Optional[List[str]]:
+        """Cherche un chemin des dépendances vers ``name`` (parcours itératif)."""
+        parents: Dict[str, Optional[str]] = {}
+        stack: List[Tuple[str, Optional[str]]] = [(d, None) for d in dependencies]
+        while stack:
+            current, parent = stack.pop()
+            if current in parents:
+                continue
+            parents[current] = parent
+            if current == name:
+                path = [name]
+                while parent is not None:
+                    path.append(parent)
+                    parent = parents[parent]
+                return [name] + path[::-1]
+            definition = self._definitions.get(current)
+            if definition is not None:
+                stack.extend((d, current) for d in definition.dependencies)
+        return None
+
+    def _topological_order(self, names: Iterable[str]) -> List[str]:
+        """Ordonne des définitions pour que chacune suive ses dépendances (Kahn)."""
+        names = set(names)
+        pending = {
+            name: len(self._definitions[name].dependencies & names) for name in names
+        }
+        queue = deque(sorted(name for name, count in pending.items() if count == 0))
+        order = []
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for dependent in self._dependents.get(name, ()):
+                if dependent in pending:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        queue.append(dependent)
+        return order
+
+    def _recompute(self, changed: Iterable[str]) -> List[str]:
+        """Recalcule les définitions modifiées et leurs dépendants, en ordre."""
+        compiled_for = (self.evaluator.angle_mode, self.evaluator.registry.version)
+        if compiled_for != self._compiled_for:
+            # Les fonctions compilées figent le mode d'angle : tout recalculer
+            self._compiled.clear()
+            self._compiled_for = compiled_for
+            changed = self._definitions
+
+        affected = {name for name in changed if name in self._definitions}
+        for name in list(affected):
+            affected |= self.dependents(name)
+
+        order = self._topological_order(affected)
+        for name in order:
+            self._evaluate(self._definitions[name])
+        self.recomputations += len(order)
+        return order
+
+    def _evaluate(self, definition: Definition):
+        """Calcule une définition à partir des valeurs de ses dépendances."""
+        name = definition.name
+        self._values.pop(name, None)
+        self._errors.pop(name, None)
+
+        # Seules les dépendances définies dans la feuille sont passées en
+        # arguments ; les autres noms sont résolus dans le registre
+        local = sorted(definition.dependencies & self._definitions.keys())
+        for dependency in local:
+            if dependency in self._errors:
+                self._errors[name] = f"Dépend de '{dependency}' (en erreur)"
+                return
+
+        try:
+            # Recompilée si l'ensemble des dépendances définies a changé
+            compiled = self._compiled.get(name)
+            if compiled is None or compiled[0] != local:
+                parameters = definition.parameters or ()
+                function = self.evaluator.compile(
+                    definition.expression, local + list(parameters)
+                )
+                self._compiled[name] = (local, function)
+            else:
+                function = compiled[1]
+            arguments = [self._values[dependency] for dependency in local]
+            if definition.parameters is None:
+                previous = self.evaluator.budget.start()
+                try:
+                    self._values[name] = function(*arguments)
+                finally:
+                    self.evaluator.budget.stop(previous)
+            else:
+                self._values[name] = functools.partial(function, *arguments)
+        except BudgetExceededError as e:
+            self._errors[name] = str(e)
+        except Exception as e:
+            self._errors[name] = f"Erreur d'évaluation: {str(e)}"
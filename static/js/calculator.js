@@ -1,10 +1,21 @@
 // ==================== CALCULATRICE STANDARD ====================
 
+// Actions envoyées au plus par requête (MAX_ACTIONS côté serveur)
+const MAX_ACTIONS_PER_REQUEST = 256;
+// Délai avant de renvoyer les frappes après une coupure réseau
+const RETRY_DELAY_MS = 1000;
+
 class StandardCalculator {
     constructor() {
         this.currentValue = '0';
         this.expression = '';
+        this.runningValue = null;
         this.isWaitingForOperand = true;
+
+        // Frappes en attente d'envoi : tant qu'une requête est en cours (ou
+        // que le réseau est coupé), elles sont regroupées dans la suivante
+        this.pendingActions = [];
+        this.requestInFlight = false;
         
         this.initializeElements();
         this.attachEventListeners();
@@ -96,29 +107,56 @@ class StandardCalculator {
         }
     }
 
-    async performCalculation(action, value = '') {
+    performCalculation(action, value = '') {
+        this.pendingActions.push(value ? `${action}:${value}` : action);
+        this.flushActions();
+    }
+
+    async flushActions() {
+        if (this.requestInFlight || this.pendingActions.length === 0) return;
+
+        const actions = this.pendingActions.splice(0, MAX_ACTIONS_PER_REQUEST);
+        this.requestInFlight = true;
+
+        let response;
         try {
-            const response = await AppUtils.apiCall('/api/calculate', {
+            response = await fetch('/api/calculate', {
                 method: 'POST',
-                body: JSON.stringify({
-                    action: action,
-                    value: value
-                })
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ actions: actions })
             });
+        } catch (error) {
+            // Coupure réseau : les frappes sont renvoyées avec les suivantes
+            this.pendingActions = actions.concat(this.pendingActions);
+            this.requestInFlight = false;
+            setTimeout(() => this.flushActions(), RETRY_DELAY_MS);
+            return;
+        }
 
-            if (response.success) {
-                this.currentValue = response.current_value;
-                this.expression = response.expression;
-                this.updateDisplay();
-                
-                // Si c'est un calcul complet, ajouter à l'historique
-                if (action === 'equals' && response.current_value !== 'Error') {
-                    this.addToHistory(this.expression, this.currentValue);
-                }
+        try {
+            const data = await response.json();
+            // L'état est renvoyé même si une action a échoué
+            this.currentValue = data.current_value;
+            this.expression = data.expression;
+            this.runningValue = data.running_value;
+            this.updateDisplay();
+
+            if (!data.success) {
+                AppUtils.showAlert(data.error || 'Erreur de calcul');
             }
+
+            // Un calcul complet par "=" du lot
+            (data.calculations || []).forEach(calculation => {
+                if (calculation.result !== 'Error') {
+                    this.addToHistory(calculation.expression, calculation.result);
+                }
+            });
         } catch (error) {
             this.currentValue = 'Error';
             this.updateDisplay();
+        } finally {
+            this.requestInFlight = false;
+            this.flushActions();
         }
     }
 
@@ -166,7 +204,11 @@ class StandardCalculator {
         }
         
         if (this.expressionDisplay) {
-            this.expressionDisplay.textContent = this.expression;
+            // Résultat courant affiché en direct pendant la saisie
+            const live = this.expression && this.runningValue !== null && this.runningValue !== undefined
+                ? ` = ${this.runningValue}`
+                : '';
+            this.expressionDisplay.textContent = this.expression + live;
         }
     }
 
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asgi_app  # noqa: E402
+
+
+def _call(method, path, body=b"", headers=(), query=b"", body_chunks=None):
+    """Envoie une requête à l'application ASGI, sans serveur."""
+    chunks = list(body_chunks) if body_chunks is not None else [body]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks
+    ]
+    messages[-1]["more_body"] = False
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    asyncio.run(asgi_app.app(scope, receive, send))
+    start = sent[0]
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return start["status"], headers, body
+
+
+def _post_json(path, data, session=None):
+    headers = [("Content-Type", "application/json")]
+    if session:
+        headers.append(("X-Session-ID", session))
+    status, headers, body = _call("POST", path, json.dumps(data).encode(), headers)
+    return status, headers["x-session-id"], json.loads(body)
+
+
+def test_asgi_routes_share_api_logic():
+    """La variante ASGI répond comme l'application Flask, session comprise"""
+    status, session, data = _post_json(
+        "/api/calculate", {"actions": ["number:6", "operator:*", "number:7", "equals"]}
+    )
+    assert status == 200 and data["current_value"] == "42"
+
+    calculate = "/api/scientific/calculate"
+    status, other, data = _post_json(calculate, {"expression": "2^10"})
+    assert status == 200 and data["result"] == 1024.0
+    assert other != session
+
+    # Le mode d'angle reste propre à la session qui l'a choisi
+    _post_json("/api/scientific/angle-mode", {"mode": "RAD"}, session)
+    _, _, data = _post_json(calculate, {"expression": "sin(pi/2)"}, session)
+    assert data["result"] == 1.0
+    _, _, data = _post_json(calculate, {"expression": "sin(90)"}, other)
+    assert data["result"] == 1.0
+
+    batch = {"expressions": ["1+1", "1/0"]}
+    status, _, data = _post_json("/api/scientific/batch", batch)
+    assert status == 200 and data["results"][0] == {"result": 2.0}
+    assert "error" in data["results"][1]
+
+    status, _, body = _call("POST", "/api/convert", b"not json")
+    assert status == 400 and json.loads(body)["success"] is False
+
+
+def test_asgi_stream_reads_chunked_body():
+    """Le flux de conversion lit un corps envoyé en plusieurs morceaux"""
+    status, headers, body = _call(
+        "POST",
+        "/api/convert/stream",
+        query=b"from_unit=km&to_unit=m&category=Longueur",
+        body_chunks=[b"1\n2", b"\n3\n", b"oops\n"],
+    )
+    assert status == 200 and headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert [line.get("result") for line in lines[:3]] == [1000.0, 2000.0, 3000.0]
+    assert "error" in lines[3]
+
+    session = headers["x-session-id"]
+    history = asgi_app.api.sessions.get(session)[1].conversion.history
+    assert (history[-1]["count"], history[-1]["errors"]) == (3, 1)
+
+    status, _, _ = _call(
+        "POST", "/api/convert/stream", query=b"from_unit=km&to_unit=kg&category=Masse"
+    )
+    assert status == 400
+
+
+def test_asgi_health_and_unknown_routes():
+    """Santé et unités sur la boucle d'événements ; 404 et 405 sinon"""
+    status, _, body = _call("GET", "/health")
+    assert status == 200 and json.loads(body)["status"] == "healthy"
+    status, headers, body = _call("GET", "/api/convert/units/Masse")
+    assert "kg" in json.loads(body)["units"]
+    etag = headers["etag"]
+    revalidated = _call(
+        "GET", "/api/convert/units/Masse", headers=[("If-None-Match", etag)]
+    )
+    assert revalidated[0] == 304 and revalidated[2] == b""
+    assert _call("GET", "/nowhere")[0] == 404
+    assert _call("GET", "/api/calculate")[0] == 405
+
+    status, headers, body = _call("GET", "/metrics")
+    assert status == 200 and headers["content-type"].startswith("text/plain")
+    route = 'route="/api/convert/units/<category>",method="GET",status="304"'
+    assert f"smartcalc_requests_total{{{route}}}" in body.decode()
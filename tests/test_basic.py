@@ -38,6 +38,19 @@ def test_imports():
         pytest.fail(f"Erreur d'importation : {e}")
 
 
+def test_apply_action_dispatch():
+    """Teste l'application des actions du clavier par leur nom"""
+    from models.calculator_model import CalculatorModel
+
+    calc = CalculatorModel()
+    for action, value in [("number", "7"), ("operator", "+"), ("number", "2")]:
+        calc.apply_action(action, value)
+    calc.apply_action("equals")
+    assert calc.get_state()["current_value"] == "9"
+    with pytest.raises(ValueError):
+        calc.apply_action("undo")
+
+
 def test_basic_arithmetic():
     """Teste les opérations arithmétiques de base"""
     from models.calculator_model import CalculatorModel
@@ -76,6 +89,33 @@ def test_basic_arithmetic():
     assert calc.current_value == "5.0"
 
 
+def test_running_value():
+    """Teste le résultat courant mis à jour à chaque touche"""
+    from models.calculator_model import CalculatorModel
+
+    calc = CalculatorModel()
+    calc.append_number("2")
+    calc.add_operator("+")
+    assert calc.running_value == "2"
+    calc.append_number("3")
+    calc.add_operator("×")
+    calc.append_number("4")
+    assert calc.running_value == "14"
+
+    # Remplacer l'opérateur en attente respecte la nouvelle priorité
+    calc.clear()
+    for key in ("8", "-", "2", "+"):
+        if key in "+-":
+            calc.add_operator(key)
+        else:
+            calc.append_number(key)
+    calc.add_operator("÷")
+    calc.append_number("2")
+    assert calc.running_value == "7.0"
+    calc.calculate()
+    assert calc.current_value == "7.0"
+
+
 def test_scientific_functions():
     """Teste les fonctions scientifiques de base"""
     from models.scientific_model import ScientificCalculatorModel
@@ -91,6 +131,42 @@ def test_scientific_functions():
     assert math.isclose(sci.evaluate_expression("2**3"), 8.0, rel_tol=1e-9, abs_tol=0.0)
 
 
+def test_compiled_expression_cache():
+    """Teste le cache LRU des expressions compilées"""
+    from models.scientific_model import ScientificModel
+
+    sci = ScientificModel(cache_size=2)
+
+    assert sci.evaluate_expression("x * 2", {"x": 3}) == 6.0
+    assert sci.evaluate_expression("x*2", {"x": 5}) == 10.0
+    stats = sci.get_cache_stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+
+    sci.evaluate_expression("1 + 1")
+    sci.evaluate_expression("2 + 2")
+    stats = sci.get_cache_stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1
+
+
+def test_array_evaluation():
+    """Teste l'évaluation vectorisée sur des tableaux NumPy"""
+    import numpy as np
+    from models.scientific_model import ScientificModel
+
+    sci = ScientificModel()
+    x = np.array([0.0, 30.0, 90.0])
+
+    y = sci.evaluate_expression("sin(x) * 2", {"x": x})
+    assert np.allclose(y, [0.0, 1.0, 2.0])
+    assert len(sci.get_history()) == 1
+
+    # Une expression constante est diffusée à la forme des variables
+    assert sci.evaluate_array("sqrt(4)", {"x": x}).shape == (3,)
+
+    sci.set_angle_mode("RAD")
+    assert np.allclose(sci.evaluate_array("asin(x)", {"x": [0, 1]}), [0, math.pi / 2])
+
+
 # Ce test sera ignoré car il nécessite une interface graphique
 @pytest.mark.skip(reason="Nécessite une interface graphique")
 def test_gui_components():
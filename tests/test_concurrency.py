@@ -0,0 +1,128 @@
+import math
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.scientific_model import ScientificModel  # noqa: E402
+
+THREADS = 8
+
+
+@pytest.fixture
+def frequent_switches():
+    """Force des changements de thread fréquents pour provoquer les courses."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _run(workers):
+    errors = []
+
+    def guard(worker):
+        try:
+            worker()
+        except Exception as e:  # pragma: no cover - rapporté par l'assertion
+            errors.append(e)
+
+    threads = [threading.Thread(target=guard, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_angle_mode_is_fixed_for_each_evaluation(frequent_switches):
+    """Un changement de mode concurrent ne mélange jamais deux modes"""
+    sci = ScientificModel(cache_size=16, result_cache_size=8)
+    expected = {1.0, math.sin(90)}
+    stop = threading.Event()
+
+    def toggle():
+        while not stop.is_set():
+            sci.set_angle_mode("RAD")
+            sci.set_angle_mode("DEG")
+
+    def evaluate(offset):
+        def worker():
+            for k in range(300):
+                # Expressions distinctes : compilées et pliées sous contention
+                result = sci.evaluate_expression(f"sin(90) + {k + offset}*x", {"x": 0})
+                assert min(abs(result - value) for value in expected) < 1e-12
+
+        return worker
+
+    toggler = threading.Thread(target=toggle)
+    toggler.start()
+    try:
+        _run([evaluate(1000 * i) for i in range(THREADS)])
+    finally:
+        stop.set()
+        toggler.join()
+
+    # Aucune entrée du cache n'a été compilée dans un autre mode que sa clé
+    sci.set_angle_mode("DEG")
+    for k in range(0, 300, 7):
+        assert sci.evaluate_expression(f"sin(90) + {k}*x", {"x": 0}) == 1.0
+    stats = sci.get_cache_stats()
+    assert stats["size"] <= stats["capacity"]
+    assert sci.get_result_cache_stats()["size"] <= 8
+
+
+def test_api_under_concurrent_clients(frequent_switches):
+    """L'API reste cohérente sous des requêtes simultanées"""
+    pytest.importorskip("flask")
+    import app
+
+    def scientific_client(mode, expected):
+        def worker():
+            client = app.app.test_client()
+            client.post("/api/scientific/angle-mode", json={"mode": mode})
+            for _ in range(25):
+                response = client.post(
+                    "/api/scientific/calculate", json={"expression": "sin(90)"}
+                )
+                assert response.json["result"] == pytest.approx(expected)
+
+        return worker
+
+    workers = [scientific_client("RAD", math.sin(90)) for _ in range(THREADS // 2)]
+    workers += [scientific_client("DEG", 1.0) for _ in range(THREADS // 2)]
+    _run(workers)
+
+    # Actions simultanées d'une même session : aucune frappe perdue
+    session = app.app.test_client()
+    session.post("/api/calculate", json={"action": "clear"})
+
+    def type_digits():
+        for _ in range(20):
+            session.post("/api/calculate", json={"action": "number", "value": "1"})
+
+    _run([type_digits] * THREADS)
+    response = session.post("/api/calculate", json={"action": "toggle_sign"})
+    assert response.json["current_value"] == "-" + "1" * 20 * THREADS
+
+
+def test_registry_change_during_namespace_build():
+    """Un espace construit pendant un enregistrement n'est pas mis en cache"""
+    from models.function_registry import FunctionRegistry
+
+    registry = FunctionRegistry()
+    build = registry._build
+
+    def build_then_register(angle_mode, backend):
+        namespace = build(angle_mode, backend)
+        # Enregistrement par un autre thread pendant la construction
+        registry.register("triple", lambda x: 3 * x)
+        return namespace
+
+    registry._build = build_then_register
+    assert "triple" not in registry.namespace("RAD")
+    registry._build = build
+    assert registry.namespace("RAD")["triple"](2) == 6
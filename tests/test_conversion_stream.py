@@ -0,0 +1,68 @@
+import itertools
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.conversion_model import ConversionModel  # noqa: E402
+from web import conversion_stream  # noqa: E402
+
+
+def test_convert_many_matches_convert():
+    """La conversion vectorisée donne les mêmes valeurs, sans historique"""
+    model = ConversionModel()
+    values = [0.1 * k for k in range(100)]
+    for units in [("mi", "km", "Longueur"), ("F", "K", "Température")]:
+        expected = [model.convert(value, *units) for value in values]
+        model.clear_history()
+        assert model.convert_many(values, *units).tolist() == expected
+        assert model.get_conversion_history() == []
+    with pytest.raises(ValueError):
+        model.convert_many([1.0], "km", "kg", "Longueur")
+
+
+def test_stream_reads_input_one_chunk_at_a_time(monkeypatch):
+    """Le flux ne lit que le bloc en cours, quelle que soit la taille de l'entrée"""
+    monkeypatch.setattr(conversion_stream, "CHUNK_ROWS", 100)
+    consumed = itertools.count()
+    lines = (f"{next(consumed)}\n" for _ in itertools.repeat(None))  # infini
+    summary = conversion_stream.StreamSummary()
+    chunks = conversion_stream.convert_ndjson(
+        ConversionModel(), lines, ("km", "m", "Longueur"), summary=summary
+    )
+
+    first = next(chunks).splitlines()
+    assert json.loads(first[2]) == {"value": 2.0, "result": 2000.0}
+    next(chunks)
+    assert next(consumed) <= 2 * 100 + 1
+    assert (summary.converted, summary.errors) == (200, 0)
+
+
+def test_stream_endpoint_summarizes_history():
+    """L'API convertit un CSV en flux et n'ajoute qu'un résumé à l'historique"""
+    pytest.importorskip("flask")
+    import app
+
+    client = app.app.test_client()
+    body = "id,value\n" + "".join(f"{k},{k}\n" for k in range(10000)) + "x,?\n"
+    response = client.post(
+        "/api/convert/stream?from_unit=kg&to_unit=g&category=Masse",
+        data=body.encode(),
+        content_type="text/csv",
+    )
+    rows = response.get_data(as_text=True).splitlines()
+    assert rows[0] == "id,value,result,error" and rows[2] == "1,1,1000.0,"
+    assert len(rows) == 10002 and rows[-1].startswith("x,?,,Ligne 10002")
+
+    session = response.headers[app.SESSION_HEADER]
+    history = app.sessions.get(session)[1].conversion.get_conversion_history()
+    assert history[-1]["bulk"] and history[-1]["count"] == 10000
+    assert history[-1]["errors"] == 1
+
+    response = client.post(
+        "/api/convert/stream?from_unit=kg&to_unit=m&category=Masse", data=b"1\n"
+    )
+    assert response.status_code == 400
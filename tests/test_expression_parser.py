@@ -0,0 +1,57 @@
+import sys
+import os
+import math
+
+import pytest  # type: ignore[reportMissingImports]
+
+# Ajouter le répertoire parent au chemin Python pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.expression_parser import evaluate_expression, parse  # noqa: E402
+
+
+def test_precedence_and_associativity():
+    """Teste la précédence des opérateurs et l'associativité de la puissance"""
+    assert evaluate_expression("2+3×4") == 14
+    assert evaluate_expression("2^3^2") == 512
+    assert evaluate_expression("-2**2") == -4
+    assert evaluate_expression("2**-1") == 0.5
+    assert evaluate_expression("15÷3") == 5.0
+
+
+def test_implicit_multiplication_and_calls():
+    """Teste la multiplication implicite et les appels de fonction"""
+    namespace = {"pi": math.pi, "sqrt": math.sqrt, "max": max, "math": math}
+    assert evaluate_expression("2pi", namespace) == 2 * math.pi
+    assert evaluate_expression("3(1+2)", namespace) == 9
+    assert evaluate_expression("max(1, sqrt(16))", namespace) == 4.0
+    assert evaluate_expression("math.pi", namespace) == math.pi
+
+
+def test_rejects_non_arithmetic_input():
+    """Teste le rejet des entrées que eval accepterait"""
+    for expression in [
+        "().__class__",
+        "a[0]",
+        "x.__class__",
+        "1 if 1 else 2",
+        "(" * 500,
+    ]:
+        with pytest.raises((SyntaxError, NameError)):
+            evaluate_expression(expression, {"x": 1})
+
+
+def test_long_chains_and_powers_stay_bounded():
+    """Teste les longues chaînes et les tours de puissances sans budget"""
+    assert evaluate_expression("+".join(["1"] * 200)) == 200
+    with pytest.raises(SyntaxError, match="trop longue"):
+        parse("+".join(["1"] * 3000))
+    with pytest.raises(OverflowError):
+        evaluate_expression("2^2^2^2^2^2")
+    assert evaluate_expression("2^2^2^2^2") == 2**65536
+
+
+def test_tree_shape():
+    """Teste la forme compacte de l'arbre produit"""
+    assert parse("1+x") == ("+", ("num", 1), ("name", "x"))
+    assert parse("sin(x)") == ("call", "sin", (("name", "x"),))
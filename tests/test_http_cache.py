@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from web.http_cache import ResponseCache, etag_matches  # noqa: E402
+
+
+def test_response_cache_builds_once():
+    """Un corps est produit une fois ; If-None-Match reconnaît son ETag"""
+    builds = []
+    cache = ResponseCache(max_entries=1)
+
+    def build():
+        builds.append(1)
+        return b"contenu"
+
+    first = cache.get("a", build)
+    assert cache.get("a", build) is first and len(builds) == 1
+    # Cache plein : la réponse est produite sans être gardée
+    cache.get("b", build)
+    cache.get("b", build)
+    assert len(builds) == 3 and cache.get_stats()["entries"] == 1
+
+    assert etag_matches(f'"{first.etag}"', first.etag)
+    assert etag_matches(f'"autre", W/"{first.etag}"', first.etag)
+    assert etag_matches("*", first.etag)
+    assert not etag_matches('"autre"', first.etag)
+    assert not etag_matches(None, first.etag)
+
+
+def test_pages_and_units_revalidate_with_304():
+    """Même ETag d'une requête à l'autre, puis 304 à la revalidation"""
+    pytest.importorskip("flask")
+    import app
+
+    client = app.app.test_client()
+    for path in ["/", "/scientific", "/converter", "/api/convert/units/Masse"]:
+        response = client.get(path)
+        etag = response.headers["ETag"]
+        assert response.status_code == 200 and "Cache-Control" in response.headers
+        assert "Set-Cookie" not in response.headers
+        assert client.get(path).headers["ETag"] == etag
+
+        revalidated = client.get(path, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304 and revalidated.data == b""
+
+    assert "kg" in client.get("/api/convert/units/Masse").get_json()["units"]
+    assert client.get("/api/convert/units/Inconnue").get_json()["units"] == []
+    assert b"Longueur" in client.get("/converter").data
+
+    stats = app.api.page_cache.get_stats()
+    assert stats["entries"] == 3 and stats["hits"] >= 6
@@ -0,0 +1,83 @@
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from web.metrics import MetricFamily, Metrics  # noqa: E402
+
+
+def _sample(text, name, **labels):
+    """Valeur d'un échantillon du texte de /metrics (étiquettes dans l'ordre)."""
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = re.escape(name + ("{" + pairs + "}" if pairs else "")) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_histogram_is_cumulative():
+    """Les effectifs des bornes sont cumulés ; la somme et le total suivent"""
+    metrics = Metrics(buckets=(0.01, 0.1))
+    for duration in (0.005, 0.05, 0.05, 3.0):
+        metrics.observe_request("/r", "POST", 200, duration, "op")
+    metrics.count_error("h", "ValueError")
+    text = metrics.render(
+        [MetricFamily("extra", "gauge", "Jauge.", [({"name": 'a"b'}, 1)])]
+    )
+
+    name = "smartcalc_request_duration_seconds"
+    assert _sample(text, f"{name}_bucket", route="/r", operation="op", le="0.01") == 1
+    assert _sample(text, f"{name}_bucket", route="/r", operation="op", le="0.1") == 3
+    assert _sample(text, f"{name}_bucket", route="/r", operation="op", le="+Inf") == 4
+    assert _sample(text, f"{name}_count", route="/r", operation="op") == 4
+    assert _sample(text, f"{name}_sum", route="/r", operation="op") == pytest.approx(
+        3.105
+    )
+    assert _sample(text, "smartcalc_errors_total", handler="h", type="ValueError") == 1
+    assert 'extra{name="a\\"b"} 1' in text
+
+    disabled = Metrics(enabled=False)
+    disabled.observe_request("/r", "GET", 200, 0.1)
+    assert "smartcalc_requests_total{" not in disabled.render()
+
+
+def test_metrics_endpoint():
+    """Requêtes par opération, erreurs par type, historiques et caches"""
+    pytest.importorskip("flask")
+    import app
+
+    client = app.app.test_client()
+    client.post("/api/calculate", json={"action": "number", "value": "4"})
+    client.post("/api/calculate", json={"action": "nope"})
+    client.post("/api/scientific/function", json={"function": "sqrt", "value": 9})
+    client.post("/api/scientific/calculate", json={"expression": "2 * 21"})
+    client.post("/api/scientific/calculate", json={"expression": "2 * 21"})
+    response = client.post("/api/scientific/calculate", json={"expression": "2 +"})
+    session = response.headers[app.SESSION_HEADER]
+
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    count = "smartcalc_request_duration_seconds_count"
+    assert _sample(text, count, route="/api/calculate", operation="number") >= 1
+    assert _sample(text, count, route="/api/calculate", operation="other") >= 1
+    assert _sample(text, count, route="/api/scientific/function", operation="sqrt")
+    assert _sample(
+        text,
+        "smartcalc_requests_total",
+        route="/api/scientific/calculate",
+        method="POST",
+        status="400",
+    )
+    errors = "smartcalc_errors_total"
+    assert _sample(text, errors, handler="scientific_calculate", type="ValueError")
+    assert _sample(text, "smartcalc_history_entries", model="scientific") >= 2
+    hits = _sample(text, "smartcalc_cache_hits_total", cache="results")
+    assert hits >= 1
+
+    # Les compteurs d'une session fermée restent dans les totaux
+    app.sessions.discard(session)
+    text = client.get("/metrics").get_data(as_text=True)
+    assert _sample(text, "smartcalc_cache_hits_total", cache="results") >= hits
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.scientific_model import ScientificModel  # noqa: E402
+from web.offload import (  # noqa: E402
+    OffloadPool,
+    OffloadTimeoutError,
+    is_heavy_expression,
+    is_heavy_function,
+)
+
+
+def test_heavy_operations_are_recognized():
+    """Séries, factorielles et haute précision poussée sont déportées"""
+    assert is_heavy_expression("sum(k^2, k, 1, n)")
+    assert is_heavy_expression("factorial(5000) + math.factorial(3)")
+    assert not is_heavy_expression("5! + comb(5, 2) + x.sum(1) + my_prod(2)")
+    assert is_heavy_expression("pi", digits=200)
+    assert not is_heavy_expression("sin(x) * 2 + summit", digits=15)
+    assert is_heavy_function("factorial", 5000)
+    assert not is_heavy_function("factorial", 10)
+    assert not is_heavy_function("sqrt", 10**6)
+
+
+def test_timeout_kills_and_replaces_worker():
+    """Un calcul trop long tue son processus, aussitôt remplacé"""
+    sci = ScientificModel()
+    sci.set_angle_mode("RAD")
+    pool = OffloadPool(workers=1, timeout=0.3)
+    try:
+        with pytest.raises(OffloadTimeoutError):
+            pool.evaluate_expression(sci, "sum(sin(k) * k, k, 1, 10^8)")
+        assert pool.evaluate_expression(sci, "sum(k, k, 1, 100)") == 5050
+        assert pool.factorial(sci, 1200) == ScientificModel().factorial(1200)
+        # Les opérations légères restent dans le thread appelant
+        assert pool.evaluate_expression(sci, "sin(pi/2)") == 1.0
+        stats = pool.get_stats()
+    finally:
+        pool.shutdown()
+    assert (stats["timeouts"], stats["kills"]) == (1, 1)
+    assert (stats["offloaded"], stats["completed"], stats["inline"]) == (3, 2, 1)
+    assert stats["idle"] == 1 and stats["pending"] == 0
+    assert [entry["result"] for entry in sci.get_history()] == [5050, 1.0]
+
+
+def test_diagnostics_endpoint():
+    """L'API expose l'état des pools de calcul"""
+    pytest.importorskip("flask")
+    import app
+    from web import api
+
+    data = app.app.test_client().get("/api/diagnostics").get_json()
+    assert data["success"] is True
+    assert {"workers", "queued", "max_queue", "kills"} <= set(data["offload"])
+    assert data["batch"]["limit"] == api.BATCH_SIZE_LIMIT
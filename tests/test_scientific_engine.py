@@ -0,0 +1,413 @@
+import sys
+import os
+import math
+
+import pytest  # type: ignore[reportMissingImports]
+
+# Ajouter le répertoire parent au chemin Python pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.scientific_model import ScientificModel  # noqa: E402
+
+
+def test_constant_folding_respects_angle_mode():
+    """Teste le précalcul des constantes selon le mode d'angle"""
+    sci = ScientificModel()
+    report = sci.explain("sin(30) * x + sqrt(2) * sqrt(2)", ["x"])
+    assert report["optimized_nodes"] < report["nodes"]
+    assert math.isclose(sci.evaluate_expression("sin(30) * x", {"x": 2}), 1.0)
+
+    sci.set_angle_mode("RAD")
+    assert math.isclose(
+        sci.evaluate_expression("sin(30) * x", {"x": 2}), 2 * math.sin(30)
+    )
+
+
+def test_common_subexpressions_are_shared():
+    """Teste la mutualisation des sous-expressions répétées"""
+    sci = ScientificModel()
+    report = sci.explain("sin(x)*x + sin(x)*x**2", ["x"])
+    assert report["common_subexpressions"] == ["sin(x)"]
+    assert math.isclose(
+        sci.evaluate_expression("sin(x)*x + sin(x)*x**2", {"x": 90}), 90 + 90**2
+    )
+
+
+def test_variables_shadow_constants():
+    """Teste qu'une variable masque une constante lors du précalcul"""
+    sci = ScientificModel()
+    assert sci.evaluate_expression("pi * 2", {"pi": 3}) == 6.0
+    assert math.isclose(sci.evaluate_expression("pi * 2"), 2 * math.pi)
+
+
+def test_variables_must_be_numbers():
+    """Teste le refus des variables non numériques"""
+    sci = ScientificModel()
+    for value in ("9" * 1000, None, {"a": 1}, True, [1, "2"], [[1, 2]]):
+        with pytest.raises(ValueError, match="non numérique"):
+            sci.evaluate_expression("x * 1000000", {"x": value})
+    assert sci.history == []
+    assert "error" in sci.evaluate_batch([("x", {"x": None})])[0]
+    assert list(sci.evaluate_expression("x * 2", {"x": [1, 2.5]})) == [2.0, 5.0]
+
+
+def test_folding_keeps_runtime_errors():
+    """Teste que les erreurs restent levées à l'évaluation"""
+    sci = ScientificModel()
+    with pytest.raises(ValueError):
+        sci.evaluate_expression("1/0")
+    with pytest.raises(ValueError):
+        sci.evaluate_expression("x.__class__", {"x": 1})
+
+
+def test_folding_skips_integers_too_long_for_literals():
+    """Teste qu'un entier précalculé trop long n'est pas écrit en littéral"""
+    sci = ScientificModel()
+    assert sci.evaluate_expression("10**5000") == 10**5000
+    assert sci.evaluate_expression("10**5000 // 10**4999 + x", {"x": 1}) == 11
+    assert sci.explain("10**5000")["optimized_nodes"] == 3
+
+
+def test_compile_returns_reusable_function():
+    """Teste la compilation d'une expression en fonction réutilisable"""
+    sci = ScientificModel()
+    function = sci.compile("sin(x) * y + 1", ["x", "y"])
+    assert math.isclose(function(90, 2), 3.0)
+    assert math.isclose(function(y=4, x=30), 3.0)
+
+    # Le mode d'angle est figé à la compilation
+    sci.set_angle_mode("RAD")
+    assert math.isclose(function(90, 2), 3.0)
+
+    with pytest.raises(ValueError):
+        sci.compile("x + 1", ["__class__"])
+
+
+def test_budgets_abort_pathological_inputs():
+    """Teste l'arrêt propre des calculs qui dépassent les budgets"""
+    from models.calculator_model import CalculatorModel
+    from models.evaluation_budget import BudgetExceededError, EvaluationBudget
+
+    sci = ScientificModel(budget=EvaluationBudget(max_nodes=50))
+    for expression in ["9**9**9", "factorial(10**6)", "math.factorial(10**6)"]:
+        with pytest.raises(BudgetExceededError):
+            sci.evaluate_expression(expression)
+    with pytest.raises(BudgetExceededError):
+        sci.evaluate_expression("+".join(["x"] * 100), {"x": 1})
+
+    stats = sci.budget.get_stats()["violations"]
+    assert stats["exponent"] == 1 and stats["int_bits"] == 2 and stats["nodes"] == 1
+    assert sci.evaluate_expression("2**10") == 1024.0
+
+    calc = CalculatorModel()
+    calc.append_number("9")
+    calc.add_operator("^")
+    calc.append_number("999999")
+    calc.calculate()
+    assert calc.current_value == "Error"
+    assert calc.budget.violations["exponent"] == 1
+
+
+def test_registry_functions_reach_every_path():
+    """Teste qu'une fonction ajoutée au registre est utilisable partout"""
+    import numpy as np
+    from models.calculator_model import CalculatorModel
+    from models.function_registry import FunctionRegistry
+
+    registry = FunctionRegistry()
+    registry.register("sin", math.sin, np.sin, angle="input")
+    registry.register_constant("pi", math.pi)
+    sci = ScientificModel(registry=registry)
+    assert math.isclose(sci.evaluate_expression("sin(90)"), 1.0)
+
+    registry.register("double", lambda x: 2 * x, lambda x: np.multiply(x, 2))
+    assert sci.evaluate_expression("double(21)") == 42.0
+    assert np.allclose(sci.evaluate_array("double(x)", {"x": [1, 2]}), [2, 4])
+    assert sci.apply_function("double", 4) == 8
+
+    calc = CalculatorModel(registry=registry)
+    calc.expression = "double(3)+"
+    calc.append_number("1")
+    calc.calculate()
+    assert calc.current_value == "7"
+
+    # Changement de mode : espaces de noms préconstruits du nouveau mode
+    sci.set_angle_mode("RAD")
+    assert math.isclose(sci.evaluate_expression("sin(pi/2)"), 1.0)
+
+
+def test_precision_escalation():
+    """Teste la bascule en haute précision des résultats peu fiables"""
+    from models.scientific_model import ScientificModel
+
+    sci = ScientificModel()
+
+    # Rapide et en flottants lorsque le résultat est fiable
+    assert sci.evaluate_expression("2 * 3.5") == 7.0
+    assert sci.get_cache_stats()["precision_escalations"] == 0
+
+    # Annulation catastrophique et débordement
+    assert sci.evaluate_expression("(1e16 + 1) - 1e16") == 1
+    assert sci.format_result(sci.evaluate_expression("exp(1000)"), 5) == "1.9701e+434"
+    assert sci.get_cache_stats()["precision_escalations"] == 2
+
+    # Les grands entiers restent exacts
+    assert sci.evaluate_expression("factorial(25)") == 15511210043330985984000000
+
+    # Un zéro exact n'est pas une annulation ; une annulation n'est pas
+    # conservée pour les valeurs suivantes des variables
+    assert sci.evaluate_expression("x - y", {"x": 3.0, "y": 3.0}) == 0
+    assert sci.evaluate_expression("cos(x) - 1", {"x": 0.0}) == 0
+    assert sci.get_cache_stats()["precision_escalations"] == 2
+    sci.evaluate_expression("(x + 1) - y", {"x": 1e16, "y": 1e16})
+    assert sci.get_cache_stats()["precision_escalations"] == 3
+    assert sci.evaluate_expression("(x + 1) - y", {"x": 2.0, "y": 1.0}) == 2
+    assert sci.get_cache_stats()["precision_escalations"] == 3
+
+    # Dans l'ordre inverse, un premier appel sans annulation ne désactive
+    # pas le contrôle pour les valeurs suivantes (ni pour un modèle dérivé)
+    sci = ScientificModel()
+    assert sci.evaluate_expression("(x + 1) - y", {"x": 2.0, "y": 1.0}) == 2
+    for model, big in ((sci, 1e16), (sci.fork(), 2e16)):
+        assert model.evaluate_expression("(x + 1) - y", {"x": big, "y": big}) == 1
+        assert model.get_cache_stats()["precision_escalations"] == 1
+
+    # Nombre de chiffres demandé
+    third = sci.format_result(sci.evaluate_expression("1/3", digits=30), 30)
+    assert third == "0." + "3" * 30
+    assert sci.format_result(sci.evaluate_precise("sin(30)"), 20) == "0.5"
+
+
+def test_format_result_for_json():
+    """Teste la mise en forme des tableaux et le refus des non-nombres"""
+    sci = ScientificModel()
+    import numpy as np
+
+    result = sci.evaluate_expression("x * 2", {"x": np.array([[1, 2], [3, 4]])})
+    assert sci.format_result(result) == [[2.0, 4.0], [6.0, 8.0]]
+    sci.set_complex_mode(True)
+    result = sci.evaluate_expression("sqrt(x)", {"x": [-4, 4]})
+    assert sci.format_result(result) == ["2j", "(2+0j)"]
+
+    with pytest.raises(ValueError, match="pas un nombre"):
+        sci.evaluate_expression("sin")
+    with pytest.raises(ValueError, match="pas un nombre"):
+        sci.format_result(math.sin)
+
+
+def test_error_messages_and_array_warnings(recwarn):
+    """Teste les messages d'erreur et l'absence d'avertissements NumPy"""
+    sci = ScientificModel()
+    for digits in (None, 30):
+        with pytest.raises(ValueError, match="Division par zéro"):
+            sci.evaluate_expression("x / 0", {"x": 1.0}, digits)
+    assert sci.evaluate_batch([("1/0", None)], 30) == [
+        {"error": "Erreur d'évaluation: Division par zéro"}
+    ]
+
+    result = sci.evaluate_expression("1/x + log(x)", {"x": [0.0, -1.0, 1.0]})
+    assert math.isnan(result[0]) and result[2] == 1.0
+    with pytest.raises(ValueError, match="Division par zéro"):
+        sci.evaluate_expression("sum(1/(k - 5), k, 0, 5000)")
+    assert not [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
+
+
+def test_automatic_differentiation():
+    """Teste les dérivées par différentiation automatique"""
+    import numpy as np
+    from models.scientific_model import ScientificModel
+
+    sci = ScientificModel()
+    sci.set_angle_mode("RAD")
+
+    assert sci.differentiate("x**3 + 2*x", 2) == pytest.approx(14)
+    assert sci.differentiate("x**3 + 2*x", 2, order=3) == pytest.approx(6)
+    assert sci.differentiate("exp(2*t)", 0, variable="t", order=4) == pytest.approx(16)
+    assert sci.differentiate("ln(x) * sqrt(x)", 4) == pytest.approx(
+        0.25 * 2 + math.log(4) / 4
+    )
+    assert sci.differentiate("x**x", 2) == pytest.approx(4 + 4 * math.log(2))
+
+    # Sur un tableau de points, en une seule évaluation
+    x = np.linspace(-1, 1, 5)
+    assert np.allclose(sci.differentiate("sin(x)", x), np.cos(x))
+    assert np.allclose(sci.differentiate("7", x), 0)
+
+    # Le mode d'angle s'applique à la dérivée
+    sci.set_angle_mode("DEG")
+    assert sci.differentiate("sin(x)", 0) == pytest.approx(math.pi / 180)
+
+    # Réutilisable, par exemple pour la méthode de Newton
+    f = sci.compile("x**2 - 2", ["x"])
+    df = sci.derivative_function("x**2 - 2")
+    root = 1.0
+    for _ in range(6):
+        root -= f(root) / df(root)
+    assert root == pytest.approx(math.sqrt(2))
+
+
+def test_unit_arithmetic():
+    """Teste les grandeurs avec unités et la conversion to/in"""
+    from models.units import Quantity
+
+    sci = ScientificModel()
+
+    assert sci.evaluate_expression("5 km + 300 m") == Quantity(5300.0, (1, 0, 0))
+    assert str(sci.evaluate_expression("2 h * 90 km/h to km")) == "180.0 km"
+    assert str(sci.evaluate_expression("72 km/h in m/s")) == "20.0 m/s"
+    assert sci.evaluate_expression("1 gal to L").magnitude() == pytest.approx(3.78541)
+
+    # "in" désigne aussi le pouce ; le dernier mot-clé sert à la conversion
+    assert sci.evaluate_expression("3 ft in in").magnitude() == pytest.approx(36)
+    assert sci.evaluate_expression("1 in to cm").magnitude() == pytest.approx(2.54)
+
+    # Les dimensions s'annulent : le résultat redevient un nombre
+    assert sci.evaluate_expression("2 L / (1 m^3)") == pytest.approx(0.002)
+    assert sci.evaluate_expression("(1 h) / (1 min)") == pytest.approx(60)
+
+    with pytest.raises(ValueError, match="incompatibles"):
+        sci.evaluate_expression("5 km + 3 s")
+    with pytest.raises(ValueError, match="incompatibles"):
+        sci.evaluate_expression("3 m to s")
+
+    # Hors grandeurs, un symbole d'unité reste un nom inconnu
+    for expression in ("m", "2 * s", "x * g"):
+        with pytest.raises(ValueError, match="not defined"):
+            sci.evaluate_expression(expression, {"x": 2})
+
+
+def test_complex_mode():
+    """Teste le mode complexe (cmath et tableaux NumPy complexes)"""
+    import numpy as np
+
+    sci = ScientificModel()
+    sci.set_angle_mode("RAD")
+
+    # Hors mode complexe, le chemin réel est inchangé
+    with pytest.raises(ValueError):
+        sci.evaluate_expression("sqrt(-1)")
+
+    sci.set_complex_mode(True)
+    assert sci.evaluate_expression("sqrt(-1)") == 1j
+    assert sci.evaluate_expression("ln(-1)") == pytest.approx(math.pi * 1j)
+    assert sci.evaluate_expression("(3 + 4i) * conj(3 + 4j)") == 25.0
+    assert sci.evaluate_expression("abs(3 + 4i)") == 5.0
+
+    # Impédance d'un circuit RL série : Z = R + jωL
+    z = sci.evaluate_expression("R + 2*pi*f*L*j", {"R": 50, "f": 50, "L": 0.1})
+    assert z == pytest.approx(50 + 31.41592653589793j)
+    sci.set_angle_mode("DEG")
+    assert sci.evaluate_expression("arg(1 + i)") == pytest.approx(45)
+    sine = sci.apply_function("sin", 30)
+    assert type(sine) is float and sine == sci.evaluate_expression("sin(30)")
+    assert sci.apply_function("sqrt", -4) == 2j
+
+    roots = sci.evaluate_expression("sqrt(x)", {"x": np.array([-4.0, 4.0])})
+    assert roots.dtype == complex
+    assert np.allclose(roots, [2j, 2])
+    assert sci.compile("sqrt(x)", ["x"])(-9) == 3j
+
+    sci.set_complex_mode(False)
+    with pytest.raises(ValueError):
+        sci.evaluate_expression("sqrt(-1)")
+
+
+def test_sum_and_product():
+    """Teste sum/prod : formes closes exactes et évaluation par blocs"""
+    sci = ScientificModel()
+    sci.set_angle_mode("RAD")
+
+    # Formes closes : sommes de puissances et suites géométriques, exactes
+    assert sci.evaluate_expression("sum(k, k, 1, 100)") == 5050
+    assert sci.evaluate_expression("sum(k^2, k, 1, 10^7)") == 333333383333335000000
+    assert sci.evaluate_expression("sum(2^k, k, 0, 100)") == 2**101 - 1
+    assert sci.evaluate_expression("prod(3, k, 1, 50)") == 3**50
+    assert sci.evaluate_expression("sum(x^k, k, 0, 10)", {"x": 2}) == 2047
+    assert sci.evaluate_expression("sum(k, k, 5, 1)") == 0
+
+    # Pas de forme close : évaluation vectorisée par blocs
+    assert sci.evaluate_expression("sum(1/k^2, k, 1, 10^6)") == pytest.approx(
+        math.pi**2 / 6, abs=1e-5
+    )
+    assert sci.evaluate_expression("prod(1 + 1/k^2, k, 1, 10^5)") == pytest.approx(
+        math.sinh(math.pi) / math.pi, rel=1e-4
+    )
+    # Petits intervalles : termes entiers exacts
+    assert sci.evaluate_expression("prod(k, k, 1, 25)") == math.factorial(25)
+
+    # Sommes imbriquées, variables extérieures et fonctions compilées
+    assert sci.evaluate_expression("sum(sum(j, j, 1, k), k, 1, 10)") == 220
+    assert sci.compile("sum(k*x, k, 1, 4)", ["x"])(3) == 30
+
+    with pytest.raises(ValueError, match="entiers"):
+        sci.evaluate_expression("sum(k, k, 1.5, 3)")
+
+
+def test_cache_snapshot(tmp_path):
+    """Teste la sauvegarde et le rechargement du cache d'expressions compilées"""
+    path = str(tmp_path / "expressions.bin")
+    sci = ScientificModel()
+    sci.evaluate_expression("sin(30) + x", {"x": 1})
+    sci.evaluate_expression("sum(k^2, k, 1, n)", {"n": 10})
+    assert sci.save_cache(path) == 2
+
+    warm = ScientificModel()
+    assert warm.load_cache(path) == 2
+    assert warm.evaluate_expression("sin(30)+x", {"x": 1}) == pytest.approx(1.5)
+    assert warm.evaluate_expression("sum(k^2, k, 1, n)", {"n": 10}) == 385
+    assert warm.get_cache_stats()["misses"] == 0
+
+    # Fichier corrompu, tronqué ou absent : ignoré
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-1] + bytes([data[-1] ^ 1]))
+    assert ScientificModel().load_cache(path) == 0
+    with open(path, "wb") as f:
+        f.write(data[:20])
+    assert ScientificModel().load_cache(path) == 0
+    assert ScientificModel().load_cache(str(tmp_path / "absent.bin")) == 0
+
+
+def test_result_memoization():
+    """Teste la mémoïsation des résultats (clé, invalidation, durée de vie)"""
+    from models.function_registry import FunctionRegistry
+
+    sci = ScientificModel(result_cache_size=2)
+    assert sci.evaluate_expression("sin(x) + 1", {"x": 30}) == pytest.approx(1.5)
+    assert sci.evaluate_expression("sin(x)+1", {"x": 30}) == pytest.approx(1.5)
+    stats = sci.get_result_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert len(sci.get_history()) == 2
+
+    # Le mode d'angle et le registre font partie de la clé
+    sci.set_angle_mode("RAD")
+    assert sci.evaluate_expression("sin(x) + 1", {"x": 30}) == pytest.approx(
+        math.sin(30) + 1
+    )
+    registry = FunctionRegistry()
+    registry.register("f", lambda x: x + 1)
+    sci = ScientificModel(registry=registry)
+    assert sci.evaluate_expression("f(1)") == 2
+    registry.register("f", lambda x: x + 2)
+    assert sci.evaluate_expression("f(1)") == 3
+
+    # Durée de vie écoulée : le résultat est recalculé
+    sci = ScientificModel(result_ttl=0)
+    sci.evaluate_expression("1 + 1")
+    sci.evaluate_expression("1 + 1")
+    assert sci.get_result_cache_stats()["expirations"] == 1
+
+
+def test_batch_evaluation():
+    """Teste l'évaluation par lots (erreurs par élément, compilation partagée)"""
+    sci = ScientificModel()
+    items = [("x^2 + 1", {"x": x}) for x in range(50)]
+    items += [("1/0", None), ("sqrt(16)", {})]
+    results = sci.evaluate_batch(items)
+
+    assert [item["result"] for item in results[:3]] == [1.0, 2.0, 5.0]
+    assert "error" in results[50] and results[51] == {"result": 4.0}
+    stats = sci.get_cache_stats()
+    assert stats["misses"] == 3 and stats["hits"] >= 49
+    assert sci.get_history() == []
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.scientific_model import ScientificModel  # noqa: E402
+from web.batch import BatchEvaluator, parse_batch  # noqa: E402
+
+
+def test_parse_batch_merges_variables_and_enforces_limit():
+    """Les variables d'un élément complètent les variables communes"""
+    items = parse_batch(
+        {
+            "expressions": ["x", {"expression": "x + y", "variables": {"x": 2}}],
+            "variables": {"x": 1, "y": 3},
+        }
+    )
+    assert items == [("x", {"x": 1, "y": 3}), ("x + y", {"x": 2, "y": 3})]
+    with pytest.raises(ValueError, match="trop grand"):
+        parse_batch({"expressions": ["1"] * 3}, max_size=2)
+    with pytest.raises(ValueError):
+        parse_batch({"expressions": [42]})
+
+
+def test_parallel_batch_matches_sequential():
+    """Un lot réparti entre processus donne les résultats du modèle, dans l'ordre"""
+    sci = ScientificModel()
+    sci.set_angle_mode("RAD")
+    items = [("sin(x) * x", {"x": x}) for x in range(40)] + [("ln(0 - 1)", {})]
+    evaluator = BatchEvaluator(workers=2, min_parallel=8)
+    try:
+        results, workers = evaluator.evaluate(sci, items)
+    finally:
+        evaluator.shutdown()
+    assert workers == 2
+    assert results == sci.evaluate_batch(items)
+    assert "error" in results[-1]
+
+
+def test_batch_endpoint():
+    """L'API renvoie un résultat ou une erreur par expression, et la durée"""
+    pytest.importorskip("flask")
+    import app
+    from web import api
+
+    client = app.app.test_client()
+    response = client.post(
+        "/api/scientific/batch",
+        json={
+            "expressions": ["x * 2", "sqrt(x", "x + y"],
+            "variables": {"x": 3, "y": 1},
+        },
+    )
+    data = response.json
+    assert data["success"] and data["count"] == 3 and data["errors"] == 1
+    assert data["results"][0] == {"result": 6.0} and data["results"][2]["result"] == 4
+    assert data["elapsed_ms"] >= 0 and data["limit"] == api.BATCH_SIZE_LIMIT
+
+    too_many = {"expressions": ["1"] * (api.BATCH_SIZE_LIMIT + 1)}
+    response = client.post("/api/scientific/batch", json=too_many)
+    assert response.status_code == 400
+
+
+def test_keystroke_batch():
+    """Une suite d'actions appliquée en une requête donne l'état final"""
+    pytest.importorskip("flask")
+    import app
+
+    client = app.app.test_client()
+    response = client.post(
+        "/api/calculate",
+        json={
+            "actions": ["number:1", "number:2", "operator:×", "number:3", "equals"],
+            "intermediate": True,
+        },
+    )
+    data = response.json
+    assert data["current_value"] == "36" and data["applied"] == 5
+    assert data["calculations"] == [{"expression": "12×3", "result": "36"}]
+    assert [state["running_value"] for state in data["states"]][-2:] == ["36", "36"]
+
+    # Action inconnue : les actions précédentes restent appliquées
+    response = client.post(
+        "/api/calculate", json={"actions": ["clear", "number:4", "undo", "number:5"]}
+    )
+    assert response.status_code == 400
+    assert (response.json["applied"], response.json["current_value"]) == (2, "4")
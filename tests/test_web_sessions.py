@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from web.sessions import SessionStore  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_idle_expiry():
+    """Les sessions sont bornées en nombre et expirent après inactivité"""
+    clock = FakeClock()
+    store = SessionStore(dict, max_sessions=2, idle_ttl=10, clock=clock)
+
+    first, models = store.get()
+    assert store.get(first) == (first, models)
+    second, _ = store.get()
+    store.get(first)  # first devient la plus récemment utilisée
+    third, _ = store.get()
+    assert len(store) == 2
+    assert store.get_stats()["evicted"] == 1
+
+    # second a été évincée : son identifiant ouvre une nouvelle session
+    assert store.get(second)[1] is not models
+    clock.now = 20
+    stats = store.get_stats()
+    assert (stats["size"], stats["expired"]) == (0, 2)
+
+    # Identifiant mal formé : remplacé par un identifiant aléatoire
+    session_id, _ = store.get("../x")
+    assert session_id != "../x" and len(session_id) >= 16
+
+
+def test_flask_sessions_are_isolated():
+    """Deux clients de l'API ne partagent ni mode d'angle ni valeur courante"""
+    pytest.importorskip("flask")
+    import app
+
+    alice, bob = app.app.test_client(), app.app.test_client()
+    alice.post("/api/scientific/angle-mode", json={"mode": "RAD"})
+    response = alice.post("/api/scientific/calculate", json={"expression": "sin(90)"})
+    assert response.json["result"] == pytest.approx(0.8939966636)
+    response = bob.post("/api/scientific/calculate", json={"expression": "sin(90)"})
+    assert response.json["result"] == pytest.approx(1.0)
+
+    alice.post("/api/calculate", json={"action": "number", "value": "7"})
+    response = bob.post("/api/calculate", json={"action": "number", "value": "5"})
+    assert response.json["current_value"] == "5"
+
+
+def test_huge_integer_result_keeps_session_usable():
+    """Un entier trop long pour le JSON est envoyé en notation scientifique"""
+    pytest.importorskip("flask")
+    import app
+
+    client = app.app.test_client()
+    big = {"expression": "x**5000", "variables": {"x": 10}}
+    response = client.post("/api/scientific/calculate", json=big)
+    assert response.status_code == 200
+    assert response.json["result"] == "1.0e+5000"
+
+    # L'entier reste dans l'historique sans bloquer les appels suivants
+    response = client.post("/api/scientific/calculate", json={"expression": "1+1"})
+    assert response.status_code == 200 and response.json["result"] == 2.0
+    assert response.json["history"][-2]["result"] == "1.0e+5000"
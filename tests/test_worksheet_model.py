@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models.worksheet_model import WorksheetModel  # noqa: E402
+
+
+def test_incremental_recomputation():
+    """Seules les définitions dépendant d'une variable modifiée sont recalculées"""
+    sheet = WorksheetModel()
+    sheet.define_many(
+        ["a = 3", "b = a**2 + 1", "f(x) = b*sin(x)", "c = f(90)", "d = 7"]
+    )
+    assert sheet.values() == {"a": 3, "b": 10, "c": 10.0, "d": 7}
+
+    assert sheet.define("a = 2") == ["a", "b", "f", "c"]
+    assert sheet.get("c") == 5.0
+    assert sheet.get("f")(30) == pytest.approx(2.5)
+
+
+def test_forward_references_cycles_and_removal():
+    """Références en avant, cycles refusés et suppression d'une définition"""
+    sheet = WorksheetModel()
+    sheet.define("y = z + 1")
+    assert "y" in sheet.errors()
+    sheet.define("z = 1")
+    assert sheet.get("y") == 2
+
+    with pytest.raises(ValueError, match="circulaire"):
+        sheet.define("z = y")
+    assert sheet.get("z") == 1
+
+    sheet.remove("z")
+    with pytest.raises(ValueError):
+        sheet.get("y")
+
+
+def test_angle_mode_change_recomputes_everything():
+    """Un changement de mode d'angle invalide les définitions compilées"""
+    sheet = WorksheetModel()
+    sheet.define("s = sin(90)")
+    assert sheet.get("s") == pytest.approx(1.0)
+    sheet.evaluator.set_angle_mode("RAD")
+    sheet.recalculate()
+    assert sheet.get("s") == pytest.approx(0.8939966636)
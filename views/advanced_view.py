@@ -28,7 +28,9 @@ class AdvancedView(QWidget):
     calculate_clicked = pyqtSignal(str, dict)  # expression, variables
     plot_clicked = pyqtSignal(str, tuple, tuple)  # expr, x_range, y_range
     solve_clicked = pyqtSignal(str, str)  # equation, variable
-    differentiate_clicked = pyqtSignal(str, str, int)  # expr, var, order
+    differentiate_clicked = pyqtSignal(
+        str, str, int, object
+    )  # expr, var, order, point|None
     # Utiliser 'object' pour permettre None (intégrale indéfinie)
     integrate_clicked = pyqtSignal(
         str, str, object, object
@@ -187,6 +189,10 @@ class AdvancedView(QWidget):
         # Ordre de dérivation
         self.deriv_order = QLineEdit("1")
 
+        # Point de dérivation (vide : dérivée symbolique)
+        self.deriv_point = QLineEdit()
+        self.deriv_point.setPlaceholderText("Optionnel (ex: 1.5)")
+
         # Bouton de calcul
         self.deriv_button = QPushButton("Calculer la dérivée")
         self.deriv_button.clicked.connect(self.on_derivative_clicked)
@@ -200,6 +206,7 @@ class AdvancedView(QWidget):
         form.addRow(self.LABEL_EXPRESSION, self.deriv_expression)
         form.addRow(self.LABEL_VARIABLE, self.deriv_var)
         form.addRow("Ordre:", self.deriv_order)
+        form.addRow("Point:", self.deriv_point)
 
         # Ajout des composants au layout
         layout.addLayout(form)
@@ -384,11 +391,14 @@ class AdvancedView(QWidget):
             if order < 1:
                 raise ValueError("L'ordre doit être un entier positif")
 
-            self.differentiate_clicked.emit(expression, variable, order)
+            point_text = self.deriv_point.text().strip()
+            point = float(point_text) if point_text else None
+
+            self.differentiate_clicked.emit(expression, variable, order, point)
 
         except ValueError as e:
             QMessageBox.warning(
-                self, "Erreur", f"Ordre de dérivation invalide: {str(e)}"
+                self, "Erreur", f"Ordre ou point de dérivation invalide: {str(e)}"
             )
 
     def on_integral_clicked(self):
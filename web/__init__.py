@@ -0,0 +1,6 @@
+"""
+Infrastructure de l'application web de SmartCalc (sessions des clients).
+
+Les routes restent définies dans app.py ; ce package regroupe ce qui ne
+relève ni des modèles de calcul ni des vues.
+"""
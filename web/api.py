@@ -0,0 +1,647 @@
+"""
+Logique des routes de l'API web, indépendante du serveur.
+
+app.py (Flask, WSGI) et asgi_app.py (ASGI, asynchrone) exposent les mêmes
+routes sur le même état : chacun lit la requête et la session à sa façon,
+puis appelle ces fonctions, qui retournent le corps JSON de la réponse et
+son code HTTP.
+
+Modèle de concurrence (serveur multithread ou pool de threads ASGI) :
+
+- le moteur scientifique fige ses modes au début de chaque évaluation et
+  protège ses caches partagés : il est utilisable depuis plusieurs threads ;
+- les historiques ne reçoivent que des ajouts (list.append, atomique) ;
+- la calculatrice de base est une machine à états : ses actions sont
+  sérialisées par le verrou de la session.
+"""
+
+import functools
+import io
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Mapping, Tuple
+
+from models.calculator_model import CalculatorModel
+from models.conversion_model import ConversionModel
+from models.scientific_model import ScientificModel
+from web.batch import MAX_BATCH_SIZE, BatchEvaluator, parse_batch
+from web.conversion_stream import (
+    FORMATS,
+    StreamSummary,
+    convert_csv,
+    convert_ndjson,
+    detect_format,
+)
+from web.http_cache import CachedBody, ResponseCache
+from web.metrics import MetricFamily, Metrics
+from web.offload import OffloadBusyError, OffloadPool
+from web.sessions import SessionStore
+
+# Moteur scientifique de référence : chaque session en dérive un modèle
+# qui partage ses caches (expressions compilées, résultats)
+scientific_model = ScientificModel()
+# Catalogue des unités (lecture seule, commun à toutes les sessions)
+conversion_model = ConversionModel()
+
+# Modèles propres à chaque client (valeur courante, mode d'angle, historique)
+SessionModels = namedtuple(
+    "SessionModels", ["calculator", "scientific", "conversion", "lock"]
+)
+
+# Nombre d'entrées d'historique conservées par session
+MAX_HISTORY = 100
+
+# Nombre maximal d'actions de la calculatrice de base par requête
+MAX_ACTIONS = 256
+
+
+# Métriques de /metrics (SMARTCALC_METRICS=0 : aucune mesure)
+metrics = Metrics(enabled=os.environ.get("SMARTCALC_METRICS", "1") != "0")
+
+# Compteurs des caches scientifiques, propres à chaque modèle : ceux des
+# sessions fermées sont reportés ici pour que les totaux ne baissent pas
+_closed_cache_counts = {"compiled": [0, 0], "results": [0, 0]}
+
+
+def _create_session_models() -> SessionModels:
+    return SessionModels(
+        CalculatorModel(), scientific_model.fork(), ConversionModel(), threading.Lock()
+    )
+
+
+def _cache_counts(model: ScientificModel) -> Dict[str, Tuple[int, int]]:
+    return {
+        "compiled": (model.cache_hits, model.cache_misses),
+        "results": (model.result_hits, model.result_misses),
+    }
+
+
+def _close_session(models: SessionModels):
+    for cache, (hits, misses) in _cache_counts(models.scientific).items():
+        _closed_cache_counts[cache][0] += hits
+        _closed_cache_counts[cache][1] += misses
+
+
+sessions = SessionStore(
+    _create_session_models,
+    max_sessions=int(os.environ.get("SMARTCALC_MAX_SESSIONS", 0)) or None,
+    idle_ttl=float(os.environ.get("SMARTCALC_SESSION_TTL", 0)) or None,
+    on_close=_close_session,
+)
+
+# Lots de l'API scientifique : taille maximale et processus de calcul
+# utilisés pour les grands lots (0 : évaluation dans le thread de la requête)
+BATCH_SIZE_LIMIT = int(os.environ.get("SMARTCALC_MAX_BATCH", 0)) or MAX_BATCH_SIZE
+batch_evaluator = BatchEvaluator(
+    workers=int(os.environ.get("SMARTCALC_BATCH_WORKERS", 0)),
+    min_parallel=int(os.environ.get("SMARTCALC_BATCH_PARALLEL_MIN", 0)) or None,
+)
+
+# Calculs lourds (grandes factorielles, séries, haute précision) : processus
+# avec échéance ferme (0 : évaluation dans le thread de la requête)
+offload_pool = OffloadPool(
+    workers=int(os.environ.get("SMARTCALC_OFFLOAD_WORKERS", 0)),
+    timeout=float(os.environ.get("SMARTCALC_OFFLOAD_TIMEOUT", 0)) or None,
+    max_queue=(
+        int(os.environ["SMARTCALC_OFFLOAD_QUEUE"])
+        if os.environ.get("SMARTCALC_OFFLOAD_QUEUE")
+        else None
+    ),
+)
+
+# Cache d'expressions compilées persistant (démarrage à chaud) : le fichier
+# est relu au démarrage et réécrit à l'arrêt du processus
+EXPRESSION_CACHE_FILE = os.environ.get("SMARTCALC_EXPRESSION_CACHE")
+
+
+def load_expression_cache():
+    """Recharge le cache d'expressions compilées (SMARTCALC_EXPRESSION_CACHE)."""
+    if EXPRESSION_CACHE_FILE:
+        scientific_model.load_cache(EXPRESSION_CACHE_FILE)
+
+
+def save_expression_cache():
+    """Sauvegarde le cache d'expressions compilées (SMARTCALC_EXPRESSION_CACHE)."""
+    if EXPRESSION_CACHE_FILE:
+        try:
+            scientific_model.save_cache(EXPRESSION_CACHE_FILE)
+        except OSError:
+            # Système de fichiers en lecture seule (Vercel) : cache non sauvegardé
+            pass
+
+
+def end_request(models: SessionModels):
+    """Borne les historiques d'une session à la fin d'une requête."""
+    del models.scientific.history[:-MAX_HISTORY]
+    del models.conversion.history[:-MAX_HISTORY]
+
+
+Reply = Tuple[Dict[str, Any], int]
+
+
+def _json_route(handler: Callable[..., Any]) -> Callable[..., Reply]:
+    """Retourne (corps, 200), ou une erreur 400 (503 si le serveur est saturé)."""
+
+    @functools.wraps(handler)
+    def route(*args, **kwargs) -> Reply:
+        try:
+            reply = handler(*args, **kwargs)
+        except OffloadBusyError as e:
+            metrics.count_error(handler.__name__, type(e).__name__)
+            return {"success": False, "error": str(e)}, 503
+        except Exception as e:
+            metrics.count_error(handler.__name__, type(e).__name__)
+            return {"success": False, "error": str(e)}, 400
+        return reply if isinstance(reply, tuple) else (reply, 200)
+
+    return route
+
+
+def _payload(data: Any) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise ValueError("Corps de requête JSON attendu")
+    return data
+
+
+def _digits(data: Dict[str, Any]):
+    # Nombre de chiffres significatifs (calcul en haute précision)
+    digits = data.get("digits")
+    return None if digits is None else int(digits)
+
+
+# === Calculatrice de base ===
+
+
+def parse_actions(actions: Any) -> list:
+    """
+    Lit une suite d'actions de la calculatrice de base.
+
+    Chaque action est une chaîne ``"nom"`` ou ``"nom:valeur"``
+    (``"number:7"``, ``"operator:+"``), ou un objet
+    ``{"action": ..., "value": ...}``.
+
+    Returns:
+        Les couples (action, valeur)
+    """
+    if not isinstance(actions, list):
+        raise ValueError("'actions' doit être une liste")
+    if len(actions) > MAX_ACTIONS:
+        raise ValueError(f"Trop d'actions: {len(actions)} (maximum {MAX_ACTIONS})")
+    parsed = []
+    for item in actions:
+        if isinstance(item, dict):
+            parsed.append((item.get("action"), item.get("value", "")))
+        elif isinstance(item, str):
+            action, _, value = item.partition(":")
+            parsed.append((action, value))
+        else:
+            raise ValueError(f"Action mal formée: {item!r}")
+    return parsed
+
+
+@_json_route
+def calculate(models: SessionModels, data: Any):
+    """
+    Calculs de base.
+
+    Reçoit une action (``{"action": "number", "value": "7"}``) ou une suite
+    ordonnée d'actions appliquées en une seule requête (``{"actions":
+    ["number:1", "operator:+", "number:2", "equals"]}``) ; avec
+    ``"intermediate": true``, l'état après chaque action est aussi renvoyé.
+    """
+    data = _payload(data)
+    calculator_model = models.calculator
+    batch = "actions" in data
+    if batch:
+        actions = parse_actions(data["actions"])
+    else:
+        actions = [(data.get("action"), data.get("value", ""))]
+    intermediate = bool(data.get("intermediate"))
+
+    states, calculations, error = [], [], None
+    applied = 0
+    with models.lock:
+        for action, value in actions:
+            if action == "equals":
+                # Expression complète, avant que "=" ne l'efface
+                typed = calculator_model.expression
+                if not calculator_model.waiting_for_operand:
+                    typed += calculator_model.current_value
+            try:
+                calculator_model.apply_action(action, value)
+            except Exception as e:
+                metrics.count_error("calculate", type(e).__name__)
+                error = str(e)
+                break
+            applied += 1
+            if action == "equals" and typed:
+                calculations.append(
+                    {"expression": typed, "result": calculator_model.current_value}
+                )
+            if intermediate:
+                states.append(calculator_model.get_state())
+        response = dict(calculator_model.get_state(), success=error is None)
+
+    if batch:
+        # Actions appliquées (les suivantes sont ignorées après une erreur)
+        response["applied"] = applied
+        response["calculations"] = calculations
+        if intermediate:
+            response["states"] = states
+    if error is not None:
+        response["error"] = error
+        return response, 400
+    return response
+
+
+# === Calculatrice scientifique ===
+
+
+@_json_route
+def scientific_calculate(models: SessionModels, data: Any):
+    """Calculs scientifiques."""
+    data = _payload(data)
+    scientific_model = models.scientific
+    expression = data.get("expression", "")
+    variables = data.get("variables", {})
+    digits = _digits(data)
+
+    # Expressions lourdes évaluées hors du thread, avec échéance ferme
+    result = offload_pool.evaluate_expression(
+        scientific_model, expression, variables, digits
+    )
+
+    # Les résultats en haute précision sont transmis sous forme de texte
+    history = [
+        dict(entry, result=scientific_model.format_result(entry["result"], digits))
+        for entry in scientific_model.get_history()[-10:]  # Derniers 10 calculs
+    ]
+    return {
+        "success": True,
+        "result": scientific_model.format_result(result, digits),
+        "history": history,
+    }
+
+
+@_json_route
+def scientific_batch(models: SessionModels, data: Any):
+    """Évaluation d'une liste d'expressions en une seule requête."""
+    scientific_model = models.scientific
+    items = parse_batch(data, BATCH_SIZE_LIMIT)
+    digits = _digits(data)
+
+    start = time.perf_counter()
+    results, workers = batch_evaluator.evaluate(scientific_model, items, digits)
+    elapsed = time.perf_counter() - start
+
+    for item in results:
+        if "result" in item:
+            item["result"] = scientific_model.format_result(item["result"], digits)
+    return {
+        "success": True,
+        "results": results,
+        "count": len(results),
+        "errors": sum("error" in item for item in results),
+        "limit": BATCH_SIZE_LIMIT,
+        "workers": workers,
+        "elapsed_ms": elapsed * 1e3,
+    }
+
+
+@_json_route
+def scientific_function(models: SessionModels, data: Any):
+    """Fonctions scientifiques spéciales."""
+    data = _payload(data)
+    scientific_model = models.scientific
+    function = data.get("function")
+    value = data.get("value")
+
+    result = None
+
+    if function == "factorial":
+        result = offload_pool.factorial(scientific_model, int(value))
+    elif function:
+        # Toute fonction du registre (sin, sqrt, log... ou ajoutée à l'exécution)
+        result = scientific_model.apply_function(function, float(value))
+
+    # Un résultat complexe (mode complexe) est transmis sous forme de texte
+    return {"success": True, "result": scientific_model.format_result(result)}
+
+
+@_json_route
+def set_angle_mode(models: SessionModels, data: Any):
+    """Changement du mode d'angle."""
+    data = _payload(data)
+    models.scientific.set_angle_mode(data.get("mode", "DEG"))
+    return {"success": True, "mode": models.scientific.angle_mode}
+
+
+@_json_route
+def set_complex_mode(models: SessionModels, data: Any):
+    """Activation du calcul sur les nombres complexes."""
+    data = _payload(data)
+    models.scientific.set_complex_mode(bool(data.get("enabled", False)))
+    return {"success": True, "enabled": models.scientific.complex_mode}
+
+
+@_json_route
+def scientific_cache_stats(models: SessionModels):
+    """Statistiques des caches du moteur scientifique."""
+    return {
+        "success": True,
+        "compiled": models.scientific.get_cache_stats(),
+        "results": models.scientific.get_result_cache_stats(),
+    }
+
+
+# === Convertisseur ===
+
+
+@_json_route
+def convert(models: SessionModels, data: Any):
+    """Conversion d'unités."""
+    data = _payload(data)
+    conversion_model = models.conversion
+    value = float(data.get("value", 0))
+    from_unit = data.get("from_unit")
+    to_unit = data.get("to_unit")
+    category = data.get("category")
+
+    result = conversion_model.convert(value, from_unit, to_unit, category)
+
+    return {
+        "success": True,
+        "result": result,
+        # Dernières 5 conversions
+        "history": conversion_model.get_conversion_history()[-5:],
+    }
+
+
+def open_conversion_stream(
+    models: SessionModels,
+    args: Mapping[str, str],
+    content_type: str,
+    body: BinaryIO,
+) -> Tuple[Iterator[str], str]:
+    """
+    Prépare une conversion en flux (voir conversion_stream).
+
+    Le premier bloc (en-tête CSV compris) est produit avant de répondre :
+    des unités ou un en-tête invalides donnent encore une erreur 400.
+
+    Args:
+        models: Modèles de la session
+        args: Paramètres de la requête (from_unit, to_unit, category,
+            format, column)
+        content_type: Type MIME du corps
+        body: Le corps de la requête, lu à mesure que le flux avance
+
+    Returns:
+        Les blocs de la réponse et leur type MIME
+
+    Raises:
+        ValueError: Si les paramètres ou l'en-tête sont invalides
+    """
+    conversion_model = models.conversion
+    units = (args.get("from_unit"), args.get("to_unit"), args.get("category"))
+    conversion_model.check_units(*units)
+    stream_format = detect_format(args.get("format"), content_type)
+    convert_rows = convert_csv if stream_format == "csv" else convert_ndjson
+
+    lines = io.TextIOWrapper(body, encoding="utf-8", newline="")
+    summary = StreamSummary()
+    chunks = convert_rows(
+        conversion_model, lines, units, args.get("column", "value"), summary
+    )
+    first = next(chunks, "")
+
+    def generate():
+        try:
+            yield first
+            yield from chunks
+        finally:
+            # Un résumé dans l'historique, plutôt qu'une entrée par valeur
+            conversion_model.record_bulk(
+                summary.converted, *units, errors=summary.errors
+            )
+
+    return generate(), FORMATS[stream_format]
+
+
+# Listes d'unités sérialisées une fois (CONVERSION_FACTORS est figé) et
+# pages HTML rendues une fois (voir app.py)
+units_cache = ResponseCache()
+page_cache = ResponseCache()
+
+
+def convert_units(category: str) -> CachedBody:
+    """
+    Unités d'une catégorie, en JSON, avec leur ETag.
+
+    Une catégorie inconnue donne une liste vide ; toutes partagent la même
+    entrée du cache, qui reste donc borné par le nombre de catégories.
+    """
+    if category not in conversion_model.CONVERSION_FACTORS:
+        category = None
+
+    def build() -> bytes:
+        units = conversion_model.get_units_for_category(category)
+        body = {"success": True, "units": units}
+        return json.dumps(body, separators=(",", ":")).encode()
+
+    return units_cache.get(category, build)
+
+
+# === Historique et supervision ===
+
+
+@_json_route
+def clear_history(models: SessionModels, data: Any):
+    """Effacement de l'historique."""
+    data = _payload(data)
+    model_type = data.get("type", "scientific")
+
+    if model_type == "scientific":
+        models.scientific.clear_history()
+    elif model_type == "conversion":
+        models.conversion.clear_history()
+
+    return {"success": True, "message": "Historique effacé"}
+
+
+def health() -> Reply:
+    """Point de santé (Vercel, répartiteurs de charge)."""
+    return {"status": "healthy", "message": "SmartCalc API is running"}, 200
+
+
+def diagnostics() -> Reply:
+    """Pools de calcul (processus, file d'attente, processus tués) et sessions."""
+    return {
+        "success": True,
+        "offload": offload_pool.get_stats(),
+        "batch": {
+            "workers": batch_evaluator.workers,
+            "min_parallel": batch_evaluator.min_parallel,
+            "limit": BATCH_SIZE_LIMIT,
+        },
+        "sessions": sessions.get_stats(),
+        "http_cache": {
+            "pages": page_cache.get_stats(),
+            "units": units_cache.get_stats(),
+        },
+    }, 200
+
+
+def sessions_stats() -> Reply:
+    """Taille du magasin de sessions et évictions."""
+    return {"success": True, "sessions": sessions.get_stats()}, 200
+
+
+# === Métriques ===
+
+
+def operation_label(route: str, data: Any) -> str:
+    """
+    Opération d'une requête, pour les histogrammes de durée.
+
+    Seules les actions et fonctions connues donnent leur nom (les autres
+    valent "other") : le nombre de séries reste borné quoi que les clients
+    envoient.
+
+    Args:
+        route: Gabarit de la route
+        data: Le corps JSON de la requête
+
+    Returns:
+        L'action de la calculatrice ("batch" pour une suite d'actions), la
+        fonction spéciale, ou "" pour les autres routes
+    """
+    if not isinstance(data, dict):
+        return ""
+    if route == "/api/calculate":
+        if "actions" in data:
+            return "batch"
+        action = data.get("action")
+        known = isinstance(action, str) and action in CalculatorModel.ACTIONS
+        return action if known else "other"
+    if route == "/api/scientific/function":
+        function = data.get("function")
+        known = isinstance(function, str) and (
+            function == "factorial" or function in _function_names()
+        )
+        return function if known else "other"
+    return ""
+
+
+_registry_names = (None, frozenset())
+
+
+def _function_names() -> frozenset:
+    global _registry_names
+    registry = scientific_model.registry
+    version, names = _registry_names
+    if version != registry.version:
+        names = frozenset(registry.names())
+        _registry_names = (registry.version, names)
+    return names
+
+
+def _collect() -> list:
+    """Métriques relevées au moment de la collecte."""
+    live = sessions.values()
+    history = {
+        "scientific": sum(len(models.scientific.history) for models in live),
+        "conversion": sum(len(models.conversion.history) for models in live),
+    }
+    caches = {cache: list(counts) for cache, counts in _closed_cache_counts.items()}
+    for model in [scientific_model] + [models.scientific for models in live]:
+        for cache, (hits, misses) in _cache_counts(model).items():
+            caches[cache][0] += hits
+            caches[cache][1] += misses
+    for cache, response_cache in [("pages", page_cache), ("units", units_cache)]:
+        stats = response_cache.get_stats()
+        caches[cache] = [stats["hits"], stats["misses"]]
+    entries = {
+        "compiled": scientific_model.get_cache_stats()["size"],
+        "results": scientific_model.get_result_cache_stats()["size"],
+        "pages": page_cache.get_stats()["entries"],
+        "units": units_cache.get_stats()["entries"],
+    }
+    session_stats = sessions.get_stats()
+    offload = offload_pool.get_stats()
+
+    def by_cache(values):
+        return [({"cache": cache}, value) for cache, value in values.items()]
+
+    return [
+        MetricFamily(
+            "smartcalc_history_entries",
+            "gauge",
+            "Entrées d'historique des sessions vivantes, par modèle.",
+            [({"model": model}, size) for model, size in history.items()],
+        ),
+        MetricFamily(
+            "smartcalc_cache_hits_total",
+            "counter",
+            "Succès des caches.",
+            by_cache({cache: counts[0] for cache, counts in caches.items()}),
+        ),
+        MetricFamily(
+            "smartcalc_cache_misses_total",
+            "counter",
+            "Échecs des caches.",
+            by_cache({cache: counts[1] for cache, counts in caches.items()}),
+        ),
+        MetricFamily(
+            "smartcalc_cache_hit_ratio",
+            "gauge",
+            "Part des succès depuis le démarrage, par cache.",
+            by_cache(
+                {
+                    cache: hits / (hits + misses) if hits + misses else 0.0
+                    for cache, (hits, misses) in caches.items()
+                }
+            ),
+        ),
+        MetricFamily(
+            "smartcalc_cache_entries",
+            "gauge",
+            "Entrées gardées, par cache.",
+            by_cache(entries),
+        ),
+        MetricFamily(
+            "smartcalc_sessions",
+            "gauge",
+            "Sessions vivantes.",
+            [({}, session_stats["size"])],
+        ),
+        MetricFamily(
+            "smartcalc_sessions_closed_total",
+            "counter",
+            "Sessions évincées (LRU) ou expirées.",
+            [
+                ({"reason": "evicted"}, session_stats["evicted"]),
+                ({"reason": "expired"}, session_stats["expired"]),
+            ],
+        ),
+        MetricFamily(
+            "smartcalc_offload_pending",
+            "gauge",
+            "Calculs lourds en cours ou en attente d'un processus.",
+            [({}, offload["pending"])],
+        ),
+        MetricFamily(
+            "smartcalc_offload_kills_total",
+            "counter",
+            "Processus de calcul tués (échéance dépassée).",
+            [({}, offload["kills"])],
+        ),
+    ]
+
+
+def metrics_text() -> str:
+    """Texte de /metrics (format d'exposition de Prometheus)."""
+    return metrics.render(_collect())
@@ -0,0 +1,172 @@
+"""
+Évaluation par lots de l'API scientifique (``/api/scientific/batch``).
+
+Un lot est évalué par le modèle de la session : tous ses éléments
+partagent le cache d'expressions compilées et les mêmes modes. Au-delà de
+``min_parallel`` éléments, et si des processus de calcul sont configurés,
+le lot est découpé en tranches évaluées en parallèle par un
+ProcessPoolExecutor (les évaluations sont limitées par le GIL : des
+threads n'y gagneraient rien). Chaque processus garde son moteur, et donc
+ses caches, d'un lot à l'autre.
+"""
+
+import math
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.scientific_model import ScientificModel
+
+# Nombre maximal d'expressions par lot
+MAX_BATCH_SIZE = 1000
+
+# Taille de lot à partir de laquelle les processus de calcul sont utilisés
+MIN_PARALLEL_ITEMS = 256
+
+# Tranches par processus (équilibre la charge entre expressions inégales)
+SLICES_PER_WORKER = 4
+
+# Moteur d'un processus de calcul, créé à sa première tranche
+_worker_model: Optional[ScientificModel] = None
+
+
+def parse_batch(data: Any, max_size: int = MAX_BATCH_SIZE) -> List[Tuple[str, Dict]]:
+    """
+    Valide le corps d'une requête de lot.
+
+    Chaque élément de ``expressions`` est une expression, ou un objet
+    ``{"expression": ..., "variables": {...}}`` dont les variables
+    complètent (et remplacent) les variables communes ``variables``.
+
+    Args:
+        data: Le corps JSON de la requête
+        max_size: Nombre maximal d'expressions
+
+    Returns:
+        Les couples (expression, variables)
+
+    Raises:
+        ValueError: Si le lot est mal formé ou trop grand
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Corps de requête JSON attendu")
+    expressions = data.get("expressions")
+    shared = data.get("variables") or {}
+    if not isinstance(expressions, list):
+        raise ValueError("'expressions' doit être une liste")
+    if not isinstance(shared, dict):
+        raise ValueError("'variables' doit être un objet")
+    if len(expressions) > max_size:
+        raise ValueError(
+            f"Lot trop grand: {len(expressions)} expressions (maximum {max_size})"
+        )
+
+    items = []
+    for index, item in enumerate(expressions):
+        if isinstance(item, dict):
+            expression = item.get("expression")
+            variables = item.get("variables") or {}
+            if not isinstance(variables, dict):
+                raise ValueError(f"Élément {index}: 'variables' doit être un objet")
+            variables = dict(shared, **variables)
+        else:
+            expression, variables = item, shared
+        if not isinstance(expression, str):
+            raise ValueError(f"Élément {index}: expression attendue")
+        items.append((expression, variables))
+    return items
+
+
+def _evaluate_slice(modes: tuple, fingerprint: str, items: list, digits):
+    """Évalue une tranche de lot dans un processus de calcul."""
+    global _worker_model
+    if _worker_model is None:
+        _worker_model = ScientificModel()
+    model = _worker_model
+    # Fonctions ajoutées à l'exécution dans le processus principal : absentes ici
+    if model.registry.fingerprint() != fingerprint:
+        raise RuntimeError("Registre de fonctions différent du processus principal")
+    angle_mode, complex_mode, model.precision_digits = modes
+    model.set_angle_mode(angle_mode)
+    model.set_complex_mode(complex_mode)
+    return model.evaluate_batch(items, digits)
+
+
+class BatchEvaluator:
+    """
+    Évalue les lots, dans le thread de la requête ou en parallèle.
+
+    Args:
+        workers: Nombre de processus de calcul (0 : pas de parallélisme)
+        min_parallel: Taille de lot à partir de laquelle les processus
+            sont utilisés
+    """
+
+    def __init__(self, workers: int = 0, min_parallel: Optional[int] = None):
+        self.workers = workers
+        self.min_parallel = min_parallel or MIN_PARALLEL_ITEMS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def evaluate(
+        self,
+        model: ScientificModel,
+        items: List[Tuple[str, Dict]],
+        digits: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Évalue un lot avec les modes du modèle.
+
+        Si les processus de calcul sont indisponibles (registre modifié à
+        l'exécution, processus interrompu, résultat non transférable), le
+        lot est évalué par le modèle lui-même.
+
+        Args:
+            model: Le modèle de la session
+            items: Couples (expression, variables), voir parse_batch
+            digits: Chiffres significatifs demandés (haute précision)
+
+        Returns:
+            Les résultats (voir ScientificModel.evaluate_batch) et le nombre
+            de processus utilisés (0 si le lot a été évalué sur place)
+        """
+        if self.workers and len(items) >= self.min_parallel:
+            try:
+                return self._evaluate_parallel(model, items, digits), self.workers
+            except (OSError, RuntimeError, pickle.PickleError):
+                self.shutdown()
+        return model.evaluate_batch(items, digits), 0
+
+    def _evaluate_parallel(self, model, items, digits) -> List[Dict[str, Any]]:
+        modes = (model.angle_mode, model.complex_mode, model.precision_digits)
+        fingerprint = model.registry.fingerprint()
+        size = math.ceil(len(items) / (self.workers * SLICES_PER_WORKER))
+        slices = [items[start : start + size] for start in range(0, len(items), size)]
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_evaluate_slice, modes, fingerprint, part, digits)
+            for part in slices
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # "spawn" : un fork du serveur multithread pourrait hériter de
+                # verrous pris par d'autres threads
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def shutdown(self):
+        """Arrête les processus de calcul (recréés au prochain lot parallèle)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,214 @@
+"""
+Conversion d'unités en flux (``/api/convert/stream``).
+
+Le corps de la requête (NDJSON ou CSV) est lu ligne à ligne et converti
+par blocs de ``CHUNK_ROWS`` lignes avec ConversionModel.convert_many ;
+chaque bloc converti est renvoyé aussitôt. La mémoire utilisée ne dépend
+que de la taille d'un bloc, quelle que soit la taille de l'export.
+
+Formats acceptés :
+
+- NDJSON : une valeur par ligne (``12.5``), ou un objet dont le champ
+  ``column`` (par défaut ``value``) porte la valeur ; la ligne renvoyée
+  reprend l'objet et y ajoute ``result`` ;
+- CSV : une ligne d'en-tête, puis les lignes ; la colonne ``column`` porte
+  la valeur (la première colonne si elle est seule) ; les colonnes
+  ``result`` et ``error`` sont ajoutées.
+
+Une ligne invalide produit une erreur sur sa ligne, sans interrompre le flux.
+"""
+
+import csv
+import io
+import json
+import math
+from typing import Iterable, Iterator, List, Optional
+
+from models.conversion_model import ConversionModel
+
+# Lignes converties ensemble (une opération vectorisée par bloc)
+CHUNK_ROWS = 4096
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def detect_format(requested: Optional[str], content_type: Optional[str]) -> str:
+    """
+    Détermine le format d'un flux : paramètre explicite, sinon type MIME.
+
+    Args:
+        requested: Format demandé ("ndjson", "csv") ou None
+        content_type: Type MIME du corps de la requête
+
+    Returns:
+        "ndjson" ou "csv"
+
+    Raises:
+        ValueError: Si le format demandé n'est pas pris en charge
+    """
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(f"Format non pris en charge: '{requested}'")
+        return requested
+    if content_type and "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+
+class StreamSummary:
+    """Compteurs d'une conversion en flux (lignes converties et rejetées)."""
+
+    def __init__(self):
+        self.converted = 0
+        self.errors = 0
+
+
+def _chunks(rows: Iterable) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_value(value) -> float:
+    # bool est un int pour Python, mais pas une mesure
+    if isinstance(value, bool):
+        raise ValueError("Valeur numérique attendue")
+    result = float(value)
+    if not math.isfinite(result):
+        raise ValueError("Valeur non finie")
+    return result
+
+
+def _convert_chunk(model, values: List[float], units: tuple) -> List[float]:
+    """Convertit les valeurs valides d'un bloc (None pour les lignes rejetées)."""
+    valid = [value for value in values if value is not None]
+    converted = iter(model.convert_many(valid, *units).tolist())
+    return [None if value is None else next(converted) for value in values]
+
+
+def convert_ndjson(
+    model: ConversionModel,
+    lines: Iterable[str],
+    units: tuple,
+    column: str = "value",
+    summary: Optional[StreamSummary] = None,
+) -> Iterator[str]:
+    """
+    Convertit un flux NDJSON, bloc par bloc.
+
+    Args:
+        model: Le modèle de conversion
+        lines: Les lignes du corps de la requête (lues à la demande)
+        units: (unité source, unité cible, catégorie)
+        column: Champ des objets qui porte la valeur
+        summary: Compteurs mis à jour au fil du flux
+
+    Returns:
+        Les blocs de lignes NDJSON converties
+    """
+    summary = summary or StreamSummary()
+    numbered = ((number, line) for number, line in enumerate(lines, 1) if line.strip())
+    for chunk in _chunks(numbered):
+        rows, values, errors = [], [], []
+        for number, line in chunk:
+            row, error, value = None, None, None
+            try:
+                row = json.loads(line)
+                value = _parse_value(row[column] if isinstance(row, dict) else row)
+            except (ValueError, TypeError, KeyError) as e:
+                error = f"Ligne {number}: {e}"
+            rows.append(row)
+            values.append(value)
+            errors.append(error)
+
+        output = []
+        for row, value, result, error in zip(
+            rows, values, _convert_chunk(model, values, units), errors
+        ):
+            if error is not None or not math.isfinite(result):
+                summary.errors += 1
+                output.append({"error": error or "Résultat non fini"})
+                continue
+            summary.converted += 1
+            if isinstance(row, dict):
+                output.append(dict(row, result=result))
+            else:
+                output.append({"value": value, "result": result})
+        yield "".join(json.dumps(item) + "\n" for item in output)
+
+
+def convert_csv(
+    model: ConversionModel,
+    lines: Iterable[str],
+    units: tuple,
+    column: str = "value",
+    summary: Optional[StreamSummary] = None,
+) -> Iterator[str]:
+    """
+    Convertit un flux CSV (avec ligne d'en-tête), bloc par bloc.
+
+    Args:
+        model: Le modèle de conversion
+        lines: Les lignes du corps de la requête (lues à la demande)
+        units: (unité source, unité cible, catégorie)
+        column: Colonne qui porte la valeur
+        summary: Compteurs mis à jour au fil du flux
+
+    Returns:
+        Les blocs de lignes CSV converties (en-tête en premier)
+
+    Raises:
+        ValueError: Si l'en-tête ne contient pas la colonne des valeurs
+    """
+    summary = summary or StreamSummary()
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header:
+        return
+    if column in header:
+        index = header.index(column)
+    elif len(header) == 1:
+        index = 0
+    else:
+        raise ValueError(f"Colonne '{column}' absente de l'en-tête")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header + ["result", "error"])
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    # Numéro de ligne lu à mesure que le lecteur avance
+    numbered = ((reader.line_num, row) for row in reader)
+    for chunk in _chunks(numbered):
+        rows, values, errors = [], [], []
+        for number, row in chunk:
+            value, error = None, None
+            try:
+                value = _parse_value(row[index])
+            except (ValueError, IndexError) as e:
+                error = f"Ligne {number}: {e}"
+            rows.append(row)
+            values.append(value)
+            errors.append(error)
+
+        for row, result, error in zip(
+            rows, _convert_chunk(model, values, units), errors
+        ):
+            if error is None and not math.isfinite(result):
+                error = "Résultat non fini"
+            if error is not None:
+                summary.errors += 1
+                writer.writerow(row + ["", error])
+            else:
+                summary.converted += 1
+                writer.writerow(row + [repr(result), ""])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,115 @@
+"""
+Réponses en lecture seule mises en mémoire avec leur ETag.
+
+Les pages HTML et les listes d'unités ne changent pas pendant la vie du
+processus (seulement d'un déploiement à l'autre) : leur corps est produit
+une fois, avec une ETag forte (empreinte du contenu). Un client qui
+présente cette ETag (``If-None-Match``) reçoit 304 sans corps.
+"""
+
+import hashlib
+import threading
+from collections import namedtuple
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Pages : gardées par le navigateur mais revalidées à chaque visite (les
+# scripts et les styles qu'elles chargent ne sont pas versionnés)
+PAGE_CACHE_CONTROL = "no-cache"
+
+# Données figées jusqu'au prochain déploiement (unités d'une catégorie)
+DATA_CACHE_CONTROL = "public, max-age=3600"
+
+# Corps d'une réponse et son ETag (sans guillemets)
+CachedBody = namedtuple("CachedBody", ["body", "etag"])
+
+
+def make_etag(body: bytes) -> str:
+    """Retourne l'ETag forte d'un corps de réponse (empreinte SHA-256)."""
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indique si un en-tête If-None-Match désigne une ETag.
+
+    La comparaison est faible, comme le prévoit RFC 9110 pour
+    If-None-Match : ``W/"..."`` désigne la même ressource que ``"..."``.
+
+    Args:
+        if_none_match: Valeur de l'en-tête (ou None)
+        etag: ETag de la réponse, sans guillemets
+
+    Returns:
+        True si la réponse peut être remplacée par 304
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Corps de réponses produits une fois, avec leur ETag.
+
+    Args:
+        max_entries: Nombre maximal de réponses gardées ; au-delà, les
+            nouvelles réponses sont produites sans être gardées
+    """
+
+    MAX_ENTRIES = 256
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._entries: Dict[Hashable, CachedBody] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], bytes]) -> CachedBody:
+        """
+        Retourne la réponse d'une clé, produite par build au premier appel.
+
+        Args:
+            key: Clé de la réponse (route, paramètres)
+            build: Produit le corps de la réponse
+
+        Returns:
+            Le corps et son ETag
+        """
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+        # Hors du verrou : deux premiers appels simultanés produisent le
+        # même corps, sans bloquer les autres clés
+        body = build()
+        cached = CachedBody(body, make_etag(body))
+        with self._lock:
+            if len(self._entries) < self.max_entries:
+                cached = self._entries.setdefault(key, cached)
+        return cached
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne le nombre de réponses gardées, de hits et de misses."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        """Oublie les réponses gardées (elles seront produites à nouveau)."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,199 @@
+"""
+Métriques de l'API au format texte de Prometheus (``/metrics``).
+
+Les requêtes sont comptées par route, méthode et code HTTP ; leur durée
+alimente un histogramme par route et par opération (action de la
+calculatrice, fonction spéciale). Les erreurs sont comptées par
+traitement et par type d'exception. Une observation coûte une recherche
+dichotomique et quelques additions sous un verrou : l'instrumentation
+peut rester active en production (voir benchmarks/bench_metrics.py).
+"""
+
+import bisect
+import math
+import threading
+from collections import namedtuple
+from typing import Dict, Iterable, List, Tuple
+
+# Bornes des histogrammes de durée, en secondes
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Famille de métriques produite au moment de la collecte : nom, type
+# (counter, gauge), description et échantillons (étiquettes, valeur)
+MetricFamily = namedtuple("MetricFamily", ["name", "type", "help", "samples"])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def format_family(family: MetricFamily) -> List[str]:
+    """Met une famille de métriques au format texte de Prometheus."""
+    lines = [
+        f"# HELP {family.name} {family.help}",
+        f"# TYPE {family.name} {family.type}",
+    ]
+    for labels, value in family.samples:
+        lines.append(f"{family.name}{_labels(labels)} {_value(value)}")
+    return lines
+
+
+class Metrics:
+    """
+    Compteurs de requêtes, histogrammes de durée et compteurs d'erreurs.
+
+    Args:
+        buckets: Bornes des histogrammes de durée, en secondes
+        enabled: False pour ne rien enregistrer
+    """
+
+    PREFIX = "smartcalc"
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS, enabled=True):
+        self.buckets = tuple(sorted(buckets))
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # (route, méthode, code) -> nombre de requêtes
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        # (route, opération) -> effectifs par borne (+Inf en dernier), somme
+        self._latency: Dict[Tuple[str, str], list] = {}
+        # (traitement, type d'exception) -> nombre d'erreurs
+        self._errors: Dict[Tuple[str, str], int] = {}
+
+    def observe_request(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        duration: float,
+        operation: str = "",
+    ):
+        """
+        Enregistre une requête traitée.
+
+        Args:
+            route: Gabarit de la route (``/api/convert/units/<category>``),
+                pas le chemin reçu, pour borner le nombre de séries
+            method: Méthode HTTP
+            status: Code HTTP de la réponse
+            duration: Durée du traitement, en secondes
+            operation: Action ou fonction demandée ("" si sans objet)
+        """
+        if not self.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, duration)
+        request_key = (route, method, str(status))
+        latency_key = (route, operation)
+        with self._lock:
+            self._requests[request_key] = self._requests.get(request_key, 0) + 1
+            histogram = self._latency.get(latency_key)
+            if histogram is None:
+                histogram = [0] * (len(self.buckets) + 1) + [0.0]
+                self._latency[latency_key] = histogram
+            histogram[index] += 1
+            histogram[-1] += duration
+
+    def count_error(self, handler: str, error_type: str):
+        """Compte une erreur d'un traitement, par type d'exception."""
+        if not self.enabled:
+            return
+        key = (handler, error_type)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def _histogram_lines(self, latency: list) -> List[str]:
+        name = f"{self.PREFIX}_request_duration_seconds"
+        lines = [
+            f"# HELP {name} Durée des requêtes, par route et par opération.",
+            f"# TYPE {name} histogram",
+        ]
+        bounds = [_value(float(bound)) for bound in self.buckets + (math.inf,)]
+        for (route, operation), counts in latency:
+            labels = {"route": route, "operation": operation}
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket = _labels(dict(labels, le=bound))
+                lines.append(f"{name}_bucket{bucket} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_value(counts[-1])}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return lines
+
+    def render(self, collected: Iterable[MetricFamily] = ()) -> str:
+        """
+        Produit le texte de ``/metrics``.
+
+        Args:
+            collected: Métriques relevées au moment de la collecte (tailles
+                des historiques, caches...)
+
+        Returns:
+            Le texte au format d'exposition de Prometheus
+        """
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latency = sorted(
+                (key, list(counts)) for key, counts in self._latency.items()
+            )
+            errors = sorted(self._errors.items())
+
+        lines = format_family(
+            MetricFamily(
+                f"{self.PREFIX}_requests_total",
+                "counter",
+                "Requêtes traitées, par route, méthode et code HTTP.",
+                [
+                    ({"route": route, "method": method, "status": status}, count)
+                    for (route, method, status), count in requests
+                ],
+            )
+        )
+        lines.extend(self._histogram_lines(latency))
+        lines.extend(
+            format_family(
+                MetricFamily(
+                    f"{self.PREFIX}_errors_total",
+                    "counter",
+                    "Erreurs, par traitement et type d'exception.",
+                    [
+                        ({"handler": handler, "type": error_type}, count)
+                        for (handler, error_type), count in errors
+                    ],
+                )
+            )
+        )
+        for family in collected:
+            lines.extend(format_family(family))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,327 @@
+"""
+Calculs lourds de l'API déportés dans des processus, avec échéance ferme.
+
+Les budgets d'évaluation (voir EvaluationBudget) arrêtent une évaluation
+entre deux opérations, mais pas au milieu d'une opération longue (grande
+factorielle, somme de millions de termes, haute précision) : elle occupe
+alors le thread de la requête jusqu'au bout. Les opérations jugées
+lourdes (voir is_heavy_expression et is_heavy_function) sont confiées à un
+pool de processus démarrés à l'avance ; un processus qui dépasse
+l'échéance est tué et remplacé. Les opérations légères restent évaluées
+dans le thread de la requête.
+"""
+
+import multiprocessing
+import pickle
+import queue
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from models.evaluation_budget import BudgetExceededError
+from models.scientific_model import ScientificModel
+
+# Échéance ferme d'un calcul déporté, en secondes
+HARD_TIMEOUT = 5.0
+
+# Délai accordé à un processus pour démarrer (import de NumPy, mpmath...)
+STARTUP_TIMEOUT = 60.0
+
+# Requêtes en attente d'un processus libre, par processus
+QUEUE_PER_WORKER = 4
+
+# Arguments de factorielle à partir desquels le calcul est déporté
+MIN_HEAVY_FACTORIAL = 1000
+
+# Chiffres significatifs à partir desquels un calcul est déporté
+MIN_HEAVY_DIGITS = 50
+
+# Appels de sommes et produits indicés (series) et de factorielles (registre
+# par défaut, ou math.factorial) : coût non borné par la longueur de
+# l'expression
+_HEAVY_TOKENS = re.compile(r"(?<![\w.])(?:math\.)?(?:sum|prod|factorial)\s*\(")
+
+
+class OffloadBusyError(RuntimeError):
+    """Levée lorsque tous les processus sont occupés et la file d'attente pleine."""
+
+
+class OffloadTimeoutError(BudgetExceededError):
+    """Levée lorsqu'un calcul déporté dépasse son échéance (processus tué)."""
+
+
+class _RegistryMismatch(Exception):
+    pass
+
+
+def is_heavy_expression(expression: str, digits: Optional[int] = None) -> bool:
+    """
+    Indique si une expression doit être évaluée hors du thread de la requête.
+
+    Args:
+        expression: L'expression à évaluer
+        digits: Chiffres significatifs demandés (haute précision)
+
+    Returns:
+        True pour une haute précision poussée, une somme ou un produit
+        indicé ou une factorielle
+    """
+    if digits is not None and digits >= MIN_HEAVY_DIGITS:
+        return True
+    return _HEAVY_TOKENS.search(expression) is not None
+
+
+def is_heavy_function(function: str, value: Any) -> bool:
+    """Indique si une fonction spéciale de l'API doit être déportée."""
+    try:
+        return function == "factorial" and int(value) >= MIN_HEAVY_FACTORIAL
+    except (TypeError, ValueError):
+        return False
+
+
+# Moteur du processus de calcul (créé au démarrage du processus)
+_worker_model: Optional[ScientificModel] = None
+
+
+def _run_task(modes: tuple, fingerprint: str, operation: str, args: tuple) -> Any:
+    model = _worker_model
+    # Fonctions ajoutées à l'exécution dans le processus principal : absentes ici
+    if model.registry.fingerprint() != fingerprint:
+        raise _RegistryMismatch()
+    angle_mode, complex_mode, model.precision_digits = modes
+    model.set_angle_mode(angle_mode)
+    model.set_complex_mode(complex_mode)
+    if operation == "evaluate":
+        try:
+            return model.evaluate_expression(*args)
+        finally:
+            model.clear_history()
+    if operation == "factorial":
+        return model.factorial(*args)
+    raise ValueError(f"Opération inconnue: {operation}")
+
+
+def _worker_main(conn):
+    """Boucle d'un processus de calcul : une tâche à la fois, jusqu'à la fin."""
+    global _worker_model
+    _worker_model = ScientificModel()
+    conn.send(("ready", None))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = ("ok", _run_task(*task))
+        except _RegistryMismatch:
+            reply = ("registry", None)
+        except Exception as e:
+            reply = ("error", str(e))
+        try:
+            conn.send(reply)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            conn.send(("error", f"Résultat non transférable: {e}"))
+
+
+class _Worker:
+    """Processus de calcul et son canal."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self):
+        if not self.ready:
+            if not self.conn.poll(STARTUP_TIMEOUT):
+                raise RuntimeError("Processus de calcul non démarré")
+            self.conn.recv()
+            self.ready = True
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class OffloadPool:
+    """
+    Pool de processus pour les calculs lourds, avec échéance ferme.
+
+    Les processus sont démarrés au premier calcul déporté, puis gardés
+    (avec leurs caches) d'un calcul à l'autre.
+
+    Args:
+        workers: Nombre de processus (0 : tout est évalué sur place)
+        timeout: Échéance ferme d'un calcul, en secondes
+        max_queue: Requêtes pouvant attendre un processus libre
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        timeout: Optional[float] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.workers = workers
+        self.timeout = timeout or HARD_TIMEOUT
+        self.max_queue = workers * QUEUE_PER_WORKER if max_queue is None else max_queue
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._pending = 0
+        self.offloaded = 0
+        self.inline = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.kills = 0
+        self.rejected = 0
+        self.fallbacks = 0
+
+    def evaluate_expression(
+        self,
+        model: ScientificModel,
+        expression: str,
+        variables: Optional[Dict[str, Any]] = None,
+        digits: Optional[int] = None,
+    ) -> Any:
+        """
+        Évalue une expression avec les modes du modèle (voir
+        ScientificModel.evaluate_expression), dans un processus si elle
+        est lourde.
+
+        Raises:
+            OffloadTimeoutError: Si le calcul dépasse l'échéance
+            OffloadBusyError: Si aucun processus ne se libère à temps
+        """
+        model.validate_variables(variables)
+        array = variables and any(
+            isinstance(value, (list, tuple)) for value in variables.values()
+        )
+        if array or not (self.workers and is_heavy_expression(expression, digits)):
+            self._count("inline")
+            return model.evaluate_expression(expression, variables, digits)
+        result = self._run(model, "evaluate", (expression, variables, digits))
+        if result is _RegistryMismatch:
+            return model.evaluate_expression(expression, variables, digits)
+        model.add_history(expression, result, variables)
+        return result
+
+    def factorial(self, model: ScientificModel, n: int) -> int:
+        """Calcule une factorielle, dans un processus si elle est grande."""
+        if not (self.workers and is_heavy_function("factorial", n)):
+            self._count("inline")
+            return model.factorial(n)
+        result = self._run(model, "factorial", (n,))
+        if result is _RegistryMismatch:
+            return model.factorial(n)
+        return result
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    @staticmethod
+    def _context():
+        # "spawn" : un fork du serveur multithread pourrait hériter de verrous
+        # pris par d'autres threads
+        return multiprocessing.get_context("spawn")
+
+    def start(self):
+        """Démarre les processus manquants (sinon, au premier calcul déporté)."""
+        with self._lock:
+            missing, self._started = self.workers - self._started, self.workers
+        for _ in range(missing):
+            self._idle.put(_Worker(self._context()))
+
+    def _run(self, model: ScientificModel, operation: str, args: tuple) -> Any:
+        self.start()
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise OffloadBusyError("Serveur de calcul saturé, réessayez")
+            self._pending += 1
+        try:
+            try:
+                worker = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                self._count("rejected")
+                raise OffloadBusyError("Serveur de calcul saturé, réessayez")
+            self._count("offloaded")
+            modes = (model.angle_mode, model.complex_mode, model.precision_digits)
+            task = (modes, model.registry.fingerprint(), operation, args)
+            status, value = self._exchange(worker, task)
+        finally:
+            self._count("_pending", -1)
+
+        if status == "registry":
+            self._count("fallbacks")
+            return _RegistryMismatch
+        self._count("completed")
+        if status == "error":
+            raise ValueError(value)
+        return value
+
+    def _exchange(self, worker: _Worker, task: tuple) -> tuple:
+        """Confie une tâche à un processus (remplacé s'il ne répond pas à temps)."""
+        healthy = False
+        try:
+            worker.wait_ready()
+            worker.conn.send(task)
+            if not worker.conn.poll(self.timeout):
+                self._count("timeouts")
+                raise OffloadTimeoutError(
+                    f"Temps de calcul dépassé ({self.timeout:g} s)"
+                )
+            reply = worker.conn.recv()
+            healthy = True
+            return reply
+        except (OSError, EOFError) as e:
+            raise RuntimeError(f"Processus de calcul interrompu: {e}")
+        finally:
+            if not healthy:
+                worker.kill()
+                self._count("kills")
+                worker = _Worker(self._context())
+            self._idle.put(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne la taille du pool, la file d'attente et les compteurs.
+
+        Returns:
+            Processus, calculs en cours ou en attente, calculs déportés ou
+            évalués sur place, échéances dépassées et processus tués
+        """
+        with self._lock:
+            pending = self._pending
+            started = self._started
+        return {
+            "workers": self.workers,
+            "started": started,
+            "idle": self._idle.qsize(),
+            "pending": pending,
+            "queued": max(0, pending - self.workers),
+            "max_queue": self.max_queue,
+            "timeout": self.timeout,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "kills": self.kills,
+            "rejected": self.rejected,
+            "fallbacks": self.fallbacks,
+        }
+
+    def shutdown(self):
+        """Arrête les processus (redémarrés au prochain calcul déporté)."""
+        with self._lock:
+            self._started = 0
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.kill()
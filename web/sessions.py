@@ -0,0 +1,149 @@
+"""
+Sessions des clients de l'API web.
+
+Chaque client, identifié par un cookie ou par l'en-tête ``X-Session-ID``,
+dispose de ses propres modèles (valeur courante, mode d'angle,
+historique) : les utilisateurs simultanés ne se marchent plus dessus. Le
+nombre de sessions vivantes est borné (éviction de la moins récemment
+utilisée) et une session inactive expire après ``idle_ttl`` secondes, si
+bien que la mémoire reste bornée quel que soit le nombre de clients.
+"""
+
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SESSION_COOKIE = "smartcalc_session"
+SESSION_HEADER = "X-Session-ID"
+
+# Identifiants acceptés depuis un client (ceux de secrets.token_urlsafe)
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+def is_valid_session_id(session_id: Optional[str]) -> bool:
+    """Indique si un identifiant fourni par un client est bien formé."""
+    return bool(session_id) and _SESSION_ID_RE.match(session_id) is not None
+
+
+class SessionStore:
+    """
+    Modèles par session, avec éviction LRU et expiration après inactivité.
+
+    Args:
+        factory: Crée les modèles d'une nouvelle session
+        max_sessions: Nombre maximal de sessions vivantes
+        idle_ttl: Durée d'inactivité (secondes) au-delà de laquelle une
+            session expire
+        clock: Horloge monotone (remplaçable dans les tests)
+        on_close: Appelée avec les modèles d'une session évincée, expirée
+            ou fermée (sous le verrou du magasin : elle doit être brève)
+    """
+
+    MAX_SESSIONS = 1000
+    IDLE_TTL = 1800.0
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_sessions: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_close: Optional[Callable[[Any], None]] = None,
+    ):
+        self.factory = factory
+        self.max_sessions = max_sessions or self.MAX_SESSIONS
+        self.idle_ttl = idle_ttl or self.IDLE_TTL
+        self.clock = clock
+        self.on_close = on_close
+        # Identifiant -> [modèles, dernière utilisation], du plus ancien au
+        # plus récemment utilisé
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: Optional[str] = None) -> Tuple[str, Any]:
+        """
+        Retourne les modèles d'une session, en la créant au besoin.
+
+        Un identifiant inconnu mais bien formé (session expirée, client
+        qui choisit son identifiant) ouvre une nouvelle session sous cet
+        identifiant ; sinon, un nouvel identifiant est tiré au hasard.
+
+        Args:
+            session_id: Identifiant présenté par le client (ou None)
+
+        Returns:
+            L'identifiant de la session et ses modèles
+        """
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id) if session_id else None
+            if entry is not None:
+                entry[1] = now
+                self._sessions.move_to_end(session_id)
+                return session_id, entry[0]
+
+            if not is_valid_session_id(session_id):
+                session_id = secrets.token_urlsafe(24)
+            models = self.factory()
+            self._sessions[session_id] = [models, now]
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                _, (evicted, _) = self._sessions.popitem(last=False)
+                self._close(evicted)
+                self.evicted += 1
+            return session_id, models
+
+    def discard(self, session_id: str):
+        """Ferme une session (sans effet si elle n'existe pas)."""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._close(entry[0])
+
+    def values(self) -> List[Any]:
+        """Retourne les modèles des sessions vivantes."""
+        with self._lock:
+            return [models for models, _ in self._sessions.values()]
+
+    def _close(self, models: Any):
+        if self.on_close is not None:
+            self.on_close(models)
+
+    def _expire(self, now: float):
+        # Les sessions sont rangées par dernière utilisation : seules les
+        # plus anciennes peuvent avoir expiré
+        while self._sessions:
+            session_id, (_, last_seen) = next(iter(self._sessions.items()))
+            if now - last_seen < self.idle_ttl:
+                break
+            self._close(self._sessions.pop(session_id)[0])
+            self.expired += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne la taille du magasin et ses compteurs.
+
+        Returns:
+            Dictionnaire avec le nombre de sessions vivantes, les limites,
+            et les nombres de sessions créées, évincées (LRU) et expirées
+        """
+        with self._lock:
+            self._expire(self.clock())
+            return {
+                "size": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "created": self.created,
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }